@@ -0,0 +1,35 @@
+"""Add lease columns for multi-replica webhook workers
+
+Revision ID: 0004_webhook_delivery_leases
+Revises: 0003_model_versions_registry
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0004_webhook_delivery_leases"
+down_revision = "0003_model_versions_registry"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_deliveries",
+        sa.Column("lease_owner", sa.String(length=128), nullable=True),
+    )
+    op.add_column(
+        "webhook_deliveries",
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_deliveries", "lease_expires_at")
+    op.drop_column("webhook_deliveries", "lease_owner")
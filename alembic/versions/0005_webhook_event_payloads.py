@@ -0,0 +1,51 @@
+"""Store webhook payloads once per event and reference them from deliveries
+
+Revision ID: 0005_webhook_event_payloads
+Revises: 0004_webhook_delivery_leases
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0005_webhook_event_payloads"
+down_revision = "0004_webhook_delivery_leases"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_event_payloads",
+        sa.Column("id", sa.String(length=64), primary_key=True),
+        sa.Column("tenant_id", sa.String(length=64), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("event_type", sa.String(length=128), nullable=False),
+        sa.Column("payload_hash", sa.String(length=64), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("signature", sa.String(length=128), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint(
+            "tenant_id", "event_type", "payload_hash", name="uq_webhook_event_payload_hash"
+        ),
+    )
+    op.add_column(
+        "webhook_deliveries",
+        sa.Column(
+            "payload_id",
+            sa.String(length=64),
+            sa.ForeignKey("webhook_event_payloads.id"),
+            nullable=True,
+        ),
+    )
+    op.alter_column("webhook_deliveries", "payload", existing_type=sa.JSON(), nullable=True)
+
+
+def downgrade() -> None:
+    op.alter_column("webhook_deliveries", "payload", existing_type=sa.JSON(), nullable=False)
+    op.drop_column("webhook_deliveries", "payload_id")
+    op.drop_table("webhook_event_payloads")
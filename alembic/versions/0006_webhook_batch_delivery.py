@@ -0,0 +1,50 @@
+"""Add opt-in batch delivery settings to webhook subscriptions
+
+Revision ID: 0006_webhook_batch_delivery
+Revises: 0005_webhook_event_payloads
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0006_webhook_batch_delivery"
+down_revision = "0005_webhook_event_payloads"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("batch_enabled", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("batch_max_events", sa.Integer(), nullable=False, server_default="100"),
+    )
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("batch_max_bytes", sa.Integer(), nullable=False, server_default="1000000"),
+    )
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("batch_linger_seconds", sa.Integer(), nullable=False, server_default="5"),
+    )
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("batch_compression", sa.String(length=16), nullable=False, server_default="gzip"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_subscriptions", "batch_compression")
+    op.drop_column("webhook_subscriptions", "batch_linger_seconds")
+    op.drop_column("webhook_subscriptions", "batch_max_bytes")
+    op.drop_column("webhook_subscriptions", "batch_max_events")
+    op.drop_column("webhook_subscriptions", "batch_enabled")
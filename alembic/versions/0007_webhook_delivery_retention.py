@@ -0,0 +1,62 @@
+"""Index deliverable webhook rows and add the delivery archive table
+
+Revision ID: 0007_webhook_delivery_retention
+Revises: 0006_webhook_batch_delivery
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0007_webhook_delivery_retention"
+down_revision = "0006_webhook_batch_delivery"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+DELIVERABLE = sa.text("status IN ('pending', 'retry_scheduled')")
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_webhook_deliveries_deliverable",
+        "webhook_deliveries",
+        ["next_attempt_at"],
+        postgresql_where=DELIVERABLE,
+        sqlite_where=DELIVERABLE,
+    )
+    op.create_table(
+        "webhook_deliveries_archive",
+        sa.Column("id", sa.String(length=64), primary_key=True),
+        sa.Column("tenant_id", sa.String(length=64), nullable=False),
+        sa.Column("subscription_id", sa.String(length=64), nullable=False),
+        sa.Column("event_type", sa.String(length=128), nullable=False),
+        sa.Column("payload_id", sa.String(length=64), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("status", sa.String(length=64), nullable=False),
+        sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("idempotency_key", sa.String(length=128), nullable=False),
+        sa.Column("last_attempt_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("dead_lettered_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("delivered_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_webhook_deliveries_archive_tenant_archived",
+        "webhook_deliveries_archive",
+        ["tenant_id", "archived_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_webhook_deliveries_archive_tenant_archived", table_name="webhook_deliveries_archive"
+    )
+    op.drop_table("webhook_deliveries_archive")
+    op.drop_index("ix_webhook_deliveries_deliverable", table_name="webhook_deliveries")
@@ -0,0 +1,39 @@
+"""Add the transactional event outbox
+
+Revision ID: 0008_event_outbox
+Revises: 0007_webhook_delivery_retention
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0008_event_outbox"
+down_revision = "0007_webhook_delivery_retention"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_outbox",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("tenant_id", sa.String(length=64), nullable=True),
+        sa.Column("topic", sa.String(length=128), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("attributes", sa.JSON(), nullable=False),
+        sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_event_outbox_tenant_id", "event_outbox", ["tenant_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_outbox_tenant_id", table_name="event_outbox")
+    op.drop_table("event_outbox")
@@ -0,0 +1,34 @@
+"""Record processed event ids for consumer dedupe
+
+Revision ID: 0009_processed_events
+Revises: 0008_event_outbox
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0009_processed_events"
+down_revision = "0008_event_outbox"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "processed_events",
+        sa.Column("consumer", sa.String(length=64), primary_key=True),
+        sa.Column("event_id", sa.String(length=64), primary_key=True),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_processed_events_processed_at", "processed_events", ["processed_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_processed_events_processed_at", table_name="processed_events")
+    op.drop_table("processed_events")
@@ -0,0 +1,29 @@
+"""Record the storage codec of each document version
+
+Revision ID: 0010_document_version_encoding
+Revises: 0009_processed_events
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0010_document_version_encoding"
+down_revision = "0009_processed_events"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "document_versions", sa.Column("storage_encoding", sa.String(length=16), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("document_versions", "storage_encoding")
@@ -0,0 +1,30 @@
+"""Sign webhook payloads at send time instead of storing signatures
+
+Revision ID: 0011_drop_webhook_payload_signature
+Revises: 0010_document_version_encoding
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0011_drop_webhook_payload_signature"
+down_revision = "0010_document_version_encoding"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.drop_column("webhook_event_payloads", "signature")
+
+
+def downgrade() -> None:
+    # Stored signatures are not recoverable; rows are re-signed at send time either way.
+    op.add_column(
+        "webhook_event_payloads", sa.Column("signature", sa.String(length=128), nullable=True)
+    )
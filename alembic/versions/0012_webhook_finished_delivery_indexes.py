@@ -0,0 +1,46 @@
+"""Index finished webhook deliveries for archiving and payload pruning
+
+Revision ID: 0012_webhook_finished_delivery_indexes
+Revises: 0011_drop_webhook_payload_signature
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0012_webhook_finished_delivery_indexes"
+down_revision = "0011_drop_webhook_payload_signature"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+DELIVERED = sa.text("status = 'delivered'")
+DEAD_LETTERED = sa.text("status = 'dead_lettered'")
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_webhook_deliveries_delivered",
+        "webhook_deliveries",
+        ["delivered_at"],
+        postgresql_where=DELIVERED,
+        sqlite_where=DELIVERED,
+    )
+    op.create_index(
+        "ix_webhook_deliveries_dead_lettered",
+        "webhook_deliveries",
+        ["dead_lettered_at"],
+        postgresql_where=DEAD_LETTERED,
+        sqlite_where=DEAD_LETTERED,
+    )
+    op.create_index("ix_webhook_deliveries_payload_id", "webhook_deliveries", ["payload_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhook_deliveries_payload_id", table_name="webhook_deliveries")
+    op.drop_index("ix_webhook_deliveries_dead_lettered", table_name="webhook_deliveries")
+    op.drop_index("ix_webhook_deliveries_delivered", table_name="webhook_deliveries")
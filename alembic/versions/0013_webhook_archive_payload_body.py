@@ -0,0 +1,36 @@
+"""Keep shared payload bodies on archived webhook deliveries
+
+Revision ID: 0013_webhook_archive_payload_body
+Revises: 0012_webhook_finished_delivery_indexes
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0013_webhook_archive_payload_body"
+down_revision = "0012_webhook_finished_delivery_indexes"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_deliveries_archive", sa.Column("payload_body", sa.Text(), nullable=True)
+    )
+    # Bodies already pruned by earlier archive runs are gone; copy the ones that remain.
+    op.execute(
+        "UPDATE webhook_deliveries_archive SET payload_body = ("
+        "SELECT body FROM webhook_event_payloads "
+        "WHERE webhook_event_payloads.id = webhook_deliveries_archive.payload_id) "
+        "WHERE payload_id IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_deliveries_archive", "payload_body")
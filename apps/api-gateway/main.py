@@ -7,7 +7,10 @@ from datetime import date, datetime, timezone
 from typing import Optional
 
 from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from libs.auth.dependencies import (
@@ -19,9 +22,17 @@ from libs.auth.dependencies import (
 from libs.auth.security import create_access_token, create_refresh_token, decode_refresh_token
 from libs.auth.types import AuthUser
 from libs.common.audit import create_audit_event
+from libs.common.byte_ranges import RangeNotSatisfiableError, etag_matches, parse_range
 from libs.common.config import get_settings
-from libs.common.database import get_db, init_db
-from libs.common.events import get_event_bus
+from libs.common.database import (
+    SessionLocal,
+    dispose_async_engine,
+    get_async_db,
+    get_db,
+    init_db,
+    pool_metrics,
+)
+from libs.common.events import InMemoryEventBus, get_event_bus
 from libs.common.idempotency import (
     IdempotencyConflictError,
     get_idempotent_response,
@@ -33,6 +44,7 @@ from libs.common.metrics import InMemoryMetrics, RequestTimer
 from libs.common.models import (
     AuditEvent,
     Document,
+    DocumentVersion,
     Export,
     RefreshToken,
     ReviewTask,
@@ -42,7 +54,9 @@ from libs.common.models import (
     User,
     VehicleImportCase,
 )
+from libs.common.publish_scope import track_publishes
 from libs.common.rate_limit import InMemoryRateLimiter
+from libs.common.sql_metrics import query_metrics, track_queries
 from libs.common.storage import get_storage_provider
 from libs.common.tracing import get_trace_id, set_trace_id
 from libs.schemas.api import (
@@ -78,6 +92,9 @@ from libs.schemas.api import (
     ModelVersionResponse,
     PagedDocuments,
     RefreshTokenRequest,
+    ReviewBulkCompleteRequest,
+    ReviewBulkCompleteResponse,
+    ReviewBulkCompleteResult,
     ReviewCompleteRequest,
     ReviewTaskResponse,
     SearchResultItem,
@@ -120,8 +137,9 @@ from services.classification.service import ClassificationService
 from services.extraction.service import ExtractionService
 from services.ingestion.service import IngestionService
 from services.preprocessing.service import PreprocessingService
-from services.review.service import ReviewService
+from services.review.service import ReviewDecision, ReviewService
 from services.validation.service import ValidationService
+from services.webhooks.bridge import WebhookEventBridge
 from services.webhooks.service import WebhookService
 
 settings = get_settings()
@@ -144,6 +162,9 @@ ingestion_service = IngestionService(
     review_service,
 )
 webhook_service = WebhookService()
+if settings.webhook_bridge_inline and isinstance(event_bus, InMemoryEventBus):
+    # Single-process deployments; elsewhere `python -m services.webhooks.bridge` consumes.
+    WebhookEventBridge(webhook_service, SessionLocal, settings=settings).attach(event_bus)
 analytics_service = AnalyticsService()
 active_learning_service = ActiveLearningService()
 bigquery_pipeline = BigQueryPipeline(settings)
@@ -171,6 +192,10 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     settings.validate_runtime_constraints()
     init_db()
     yield
+    event_bus.flush()
+    webhook_service.close()
+    # Pooled async connections belong to this event loop; don't carry them past it.
+    await dispose_async_engine()
 
 
 app = FastAPI(
@@ -216,7 +241,28 @@ async def tenant_header_middleware(
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
         request.state.tenant_id = tenant_id
-    response = await call_next(request)
+    with track_queries(f"{request.method} {path}") as query_stats, track_publishes() as publishes:
+        response = await call_next(request)
+    # Aggregate per route template, not per document id; unrouted paths share one label
+    # so probes for random URLs cannot grow the metrics table.
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", None) if route is not None else None
+    query_stats.scope = f"{request.method} {route_path or '<unmatched>'}"
+    query_metrics.record(query_stats)
+    if settings.database_timing_headers_active:
+        db_time_ms = round(query_stats.db_time_ms, 2)
+        response.headers["X-DB-Statements"] = str(query_stats.statements)
+        response.headers["X-DB-Time-Ms"] = str(db_time_ms)
+        response.headers["Server-Timing"] = f"db;dur={db_time_ms}"
+    # Events published while handling the request are confirmed together, one
+    # batched round trip instead of one per publish. Only this request's messages are
+    # awaited, and requests that published nothing skip the threadpool hop.
+    if publishes.pending:
+        undelivered = await run_in_threadpool(event_bus.flush, scope=publishes)
+        if undelivered:
+            log_event(
+                logger, "event_bus_flush_incomplete", {"undelivered": undelivered, "path": path}
+            )
     metrics.record_request(
         method=request.method,
         path=request.url.path,
@@ -247,6 +293,11 @@ def metrics_snapshot() -> dict[str, object]:
         "avg_latency_ms": snapshot.avg_latency_ms,
         "p95_latency_ms": snapshot.p95_latency_ms,
         "per_route": snapshot.per_route,
+        "webhook_targets": webhook_service.target_health(),
+        "event_bus": event_bus.metrics(),
+        "storage": storage_provider.metrics(),
+        "database_pools": pool_metrics(),
+        "sql": query_metrics.snapshot(),
     }
 
 
@@ -267,21 +318,31 @@ def _ensure_user_membership(db: Session, token_request: TokenRequest) -> None:
         )
         db.add(user)
 
-    for role_name in token_request.roles:
-        role_stmt = select(Role).where(Role.name == role_name)
-        role = db.execute(role_stmt).scalar_one_or_none()
-        if not role:
-            role = Role(id=f"role_{role_name}", name=role_name)
-            db.add(role)
-            db.flush()
-
-        member_stmt = select(TenantMembership).where(
-            TenantMembership.tenant_id == token_request.tenant_ids[0],
-            TenantMembership.user_id == token_request.user_id,
-            TenantMembership.role_id == role.id,
-        )
-        membership = db.execute(member_stmt).scalar_one_or_none()
-        if not membership:
+    # Two lookups for all requested roles instead of two per role.
+    roles_by_name = {
+        role.name: role
+        for role in db.execute(select(Role).where(Role.name.in_(token_request.roles))).scalars()
+    }
+    member_role_ids = set(
+        db.execute(
+            select(TenantMembership.role_id).where(
+                TenantMembership.tenant_id == token_request.tenant_ids[0],
+                TenantMembership.user_id == token_request.user_id,
+            )
+        ).scalars()
+    )
+    new_roles = [
+        Role(id=f"role_{role_name}", name=role_name)
+        for role_name in dict.fromkeys(token_request.roles)
+        if role_name not in roles_by_name
+    ]
+    if new_roles:
+        db.add_all(new_roles)
+        db.flush()
+        roles_by_name.update((role.name, role) for role in new_roles)
+
+    for role in roles_by_name.values():
+        if role.id not in member_role_ids:
             db.add(
                 TenantMembership(
                     id=f"mbr_{token_request.user_id}_{role.name}",
@@ -435,8 +496,8 @@ def ingest_document(
 
 
 @app.get("/api/v1/documents", response_model=PagedDocuments)
-def list_documents(
-    db: Session = Depends(get_db),
+async def list_documents(
+    db: AsyncSession = Depends(get_async_db),
     context: TenantContext = Depends(get_tenant_context),
     _: AuthUser = Depends(get_current_user),
     page: int = Query(default=1, ge=1),
@@ -450,8 +511,8 @@ def list_documents(
         .offset(offset)
         .limit(page_size)
     )
-    documents = list(db.execute(stmt).scalars().all())
-    total = db.scalar(
+    documents = list((await db.execute(stmt)).scalars().all())
+    total = await db.scalar(
         select(func.count()).select_from(Document).where(Document.tenant_id == context.tenant_id)
     )
     return PagedDocuments(
@@ -471,30 +532,39 @@ def list_documents(
 
 
 @app.get("/api/v1/search", response_model=GlobalSearchResponse)
-def global_search(
+async def global_search(
     q: str = Query(min_length=2),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     context: TenantContext = Depends(get_tenant_context),
     _: AuthUser = Depends(get_current_user),
 ) -> GlobalSearchResponse:
     pattern = f"%{q}%"
-    documents = db.execute(
-        select(Document)
-        .where(Document.tenant_id == context.tenant_id, Document.file_name.ilike(pattern))
-        .limit(10)
+    documents = (
+        await db.execute(
+            select(Document)
+            .where(Document.tenant_id == context.tenant_id, Document.file_name.ilike(pattern))
+            .limit(10)
+        )
     ).scalars()
-    exports = db.execute(
-        select(Export)
-        .where(Export.tenant_id == context.tenant_id, Export.export_ref.ilike(pattern))
-        .limit(10)
+    exports = (
+        await db.execute(
+            select(Export)
+            .where(Export.tenant_id == context.tenant_id, Export.export_ref.ilike(pattern))
+            .limit(10)
+        )
     ).scalars()
-    vehicle_cases = db.execute(
-        select(VehicleImportCase)
-        .where(
-            VehicleImportCase.tenant_id == context.tenant_id,
-            or_(VehicleImportCase.case_ref.ilike(pattern), VehicleImportCase.vin.ilike(pattern)),
+    vehicle_cases = (
+        await db.execute(
+            select(VehicleImportCase)
+            .where(
+                VehicleImportCase.tenant_id == context.tenant_id,
+                or_(
+                    VehicleImportCase.case_ref.ilike(pattern),
+                    VehicleImportCase.vin.ilike(pattern),
+                ),
+            )
+            .limit(10)
         )
-        .limit(10)
     ).scalars()
     items = [
         SearchResultItem(entity_type="document", entity_id=item.id, label=item.file_name)
@@ -512,43 +582,119 @@ def global_search(
 
 
 @app.get("/api/v1/documents/{document_id}")
-def get_document(
+async def get_document(
     document_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     context: TenantContext = Depends(get_tenant_context),
     _: AuthUser = Depends(get_current_user),
 ) -> dict[str, str]:
     stmt = select(Document).where(
         Document.id == document_id, Document.tenant_id == context.tenant_id
     )
-    document = db.execute(stmt).scalar_one_or_none()
+    document = (await db.execute(stmt)).scalar_one_or_none()
     if not document:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="document not found")
     return {"id": document.id, "status": document.status, "file_name": document.file_name}
 
 
 @app.get("/api/v1/documents/{document_id}/signed-url", response_model=SignedUrlResponse)
-def get_document_signed_url(
+async def get_document_signed_url(
     document_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     context: TenantContext = Depends(get_tenant_context),
     _: AuthUser = Depends(require_roles("operator", "admin", "reviewer")),
 ) -> SignedUrlResponse:
-    stmt = select(Document).where(
-        Document.id == document_id, Document.tenant_id == context.tenant_id
+    stmt = (
+        select(Document, DocumentVersion.storage_encoding)
+        .join(DocumentVersion, DocumentVersion.document_id == Document.id)
+        .where(Document.id == document_id, Document.tenant_id == context.tenant_id)
+        .order_by(DocumentVersion.version_number.desc())
+        .limit(1)
     )
-    document = db.execute(stmt).scalar_one_or_none()
-    if not document:
+    row = (await db.execute(stmt)).first()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="document not found")
+    document, storage_encoding = row
+    if storage_encoding:
+        # The bucket holds framed compressed bytes, so those documents are only served
+        # decompressed by the content endpoint.
+        content_url = request.url_for("get_document_content", document_id=document.id)
+        return SignedUrlResponse(document_id=document.id, signed_url=str(content_url))
+    # Signing can call out to IAM on a cache miss, so it stays off the event loop.
+    signed_url = await run_in_threadpool(
+        storage_provider.generate_signed_url, document.storage_uri
+    )
+    return SignedUrlResponse(document_id=document.id, signed_url=signed_url)
+
+
+@app.get("/api/v1/documents/{document_id}/content", response_model=None)
+async def get_document_content(
+    document_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    context: TenantContext = Depends(get_tenant_context),
+    _: AuthUser = Depends(require_roles("operator", "admin", "reviewer")),
+) -> Response:
+    stmt = (
+        select(Document, DocumentVersion)
+        .join(DocumentVersion, DocumentVersion.document_id == Document.id)
+        .where(Document.id == document_id, Document.tenant_id == context.tenant_id)
+        .order_by(DocumentVersion.version_number.desc())
+        .limit(1)
+    )
+    row = (await db.execute(stmt)).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="document not found")
-    return SignedUrlResponse(
-        document_id=document.id,
-        signed_url=storage_provider.generate_signed_url(document.storage_uri),
+    document, version = row
+    etag = f'"{version.checksum}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "private, max-age=0"}
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    size = await run_in_threadpool(
+        storage_provider.object_size,
+        version.storage_uri,
+        checksum=version.checksum,
+        encoding=version.storage_encoding,
+    )
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if if_range is not None and if_range.strip() != etag:
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiableError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+    start, end = byte_range if byte_range else (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    # Caching and compressing providers do blocking work (a cache fill, a frame probe)
+    # before returning the iterator, so it is built in the threadpool; StreamingResponse
+    # then pulls each chunk off the event loop too.
+    chunks = await run_in_threadpool(
+        storage_provider.iter_range,
+        version.storage_uri,
+        start,
+        end,
+        checksum=version.checksum,
+        encoding=version.storage_encoding,
+    )
+    return StreamingResponse(
+        chunks,
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=document.content_type,
+        headers=headers,
     )
 
 
 @app.get("/api/v1/review/tasks", response_model=list[ReviewTaskResponse])
-def list_review_tasks(
-    db: Session = Depends(get_db),
+async def list_review_tasks(
+    db: AsyncSession = Depends(get_async_db),
     context: TenantContext = Depends(get_tenant_context),
     _: AuthUser = Depends(require_roles("reviewer", "admin")),
 ) -> list[ReviewTaskResponse]:
@@ -557,7 +703,7 @@ def list_review_tasks(
         .where(ReviewTask.tenant_id == context.tenant_id, ReviewTask.status == "open")
         .order_by(ReviewTask.created_at.asc())
     )
-    tasks = list(db.execute(stmt).scalars().all())
+    tasks = list((await db.execute(stmt)).scalars().all())
     return [
         ReviewTaskResponse(
             id=task.id,
@@ -602,10 +748,47 @@ def complete_review(
     )
 
 
-@app.get("/api/v1/audit/events", response_model=list[AuditEventResponse])
-def list_audit_events(
+@app.post("/api/v1/review/tasks:bulk-complete", response_model=ReviewBulkCompleteResponse)
+def bulk_complete_review(
+    payload: ReviewBulkCompleteRequest,
     db: Session = Depends(get_db),
     context: TenantContext = Depends(get_tenant_context),
+    _: AuthUser = Depends(require_roles("reviewer", "admin")),
+) -> ReviewBulkCompleteResponse:
+    results = review_service.complete_reviews_bulk(
+        db,
+        tenant_id=context.tenant_id,
+        actor_id=context.user.user_id,
+        decisions=[
+            ReviewDecision(
+                review_task_id=item.task_id,
+                approved=item.approved,
+                corrections=[correction.model_dump() for correction in item.corrections],
+            )
+            for item in payload.items
+        ],
+    )
+    db.commit()
+    failed = sum(1 for result in results if result.error is not None)
+    return ReviewBulkCompleteResponse(
+        completed=len(results) - failed,
+        failed=failed,
+        results=[
+            ReviewBulkCompleteResult(
+                task_id=result.review_task_id,
+                status=result.status,
+                correction_count=result.correction_count,
+                error=result.error,
+            )
+            for result in results
+        ],
+    )
+
+
+@app.get("/api/v1/audit/events", response_model=list[AuditEventResponse])
+async def list_audit_events(
+    db: AsyncSession = Depends(get_async_db),
+    context: TenantContext = Depends(get_tenant_context),
     _: AuthUser = Depends(require_roles("admin", "analyst")),
     page_size: int = Query(default=50, ge=1, le=200),
 ) -> list[AuditEventResponse]:
@@ -615,7 +798,7 @@ def list_audit_events(
         .order_by(AuditEvent.created_at.desc())
         .limit(page_size)
     )
-    events = db.execute(stmt).scalars().all()
+    events = (await db.execute(stmt)).scalars().all()
     return [
         AuditEventResponse(
             id=event.id,
@@ -1169,13 +1352,21 @@ def create_webhook_subscription(
     context: TenantContext = Depends(get_tenant_context),
     _: AuthUser = Depends(require_roles("admin")),
 ) -> dict[str, str]:
-    subscription = webhook_service.create_subscription(
-        db,
-        tenant_id=context.tenant_id,
-        actor_id=context.user.user_id,
-        target_url=str(payload.target_url),
-        event_filter=payload.event_filter,
-    )
+    try:
+        subscription = webhook_service.create_subscription(
+            db,
+            tenant_id=context.tenant_id,
+            actor_id=context.user.user_id,
+            target_url=str(payload.target_url),
+            event_filter=payload.event_filter,
+            batch_enabled=payload.batch_enabled,
+            batch_max_events=payload.batch_max_events,
+            batch_max_bytes=payload.batch_max_bytes,
+            batch_linger_seconds=payload.batch_linger_seconds,
+            batch_compression=payload.batch_compression,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     db.commit()
     return {"id": subscription.id, "status": "active"}
 
@@ -1232,6 +1423,14 @@ def run_webhook_worker(
     return WebhookWorkerRunResponse(**outcome)
 
 
+@app.get("/api/v1/webhooks/targets/health")
+def webhook_target_health(
+    _context: TenantContext = Depends(get_tenant_context),
+    _: AuthUser = Depends(require_roles("admin")),
+) -> dict[str, dict[str, object]]:
+    return webhook_service.target_health()
+
+
 @app.post("/api/v1/webhooks/dlq/replay", response_model=WebhookReplayResponse)
 def replay_webhook_dlq(
     payload: WebhookReplayRequest,
@@ -1239,12 +1438,23 @@ def replay_webhook_dlq(
     context: TenantContext = Depends(get_tenant_context),
     _: AuthUser = Depends(require_roles("admin")),
 ) -> WebhookReplayResponse:
-    requeued = webhook_service.replay_dead_lettered(
-        db,
-        tenant_id=context.tenant_id,
-        delivery_ids=payload.delivery_ids or None,
-        limit=payload.limit,
-    )
+    try:
+        progress = webhook_service.replay_dead_letter_page(
+            db,
+            tenant_id=context.tenant_id,
+            delivery_ids=payload.delivery_ids or None,
+            limit=payload.limit,
+            # The schema rejects an explicit 0; a configured default of 0 replays unpaced.
+            rate_per_second=(
+                payload.rate_per_second
+                if payload.rate_per_second is not None
+                else settings.webhook_replay_rate_per_second
+            ),
+            burst=payload.burst if payload.burst is not None else settings.webhook_replay_burst,
+            cursor=payload.cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     create_audit_event(
         db,
         tenant_id=context.tenant_id,
@@ -1252,19 +1462,33 @@ def replay_webhook_dlq(
         action="webhook.dlq.replayed",
         entity_type="webhook_delivery",
         entity_id=context.tenant_id,
-        payload={"requeued": requeued},
+        payload={
+            "requeued": progress.requeued,
+            "remaining": progress.remaining,
+            "scheduled_until": (
+                progress.scheduled_until.isoformat() if progress.scheduled_until else None
+            ),
+        },
     )
     db.commit()
-    return WebhookReplayResponse(requeued=requeued)
+    return WebhookReplayResponse(
+        requeued=progress.requeued,
+        remaining=progress.remaining,
+        next_cursor=progress.next_cursor,
+        scheduled_until=progress.scheduled_until,
+    )
 
 
 @app.get("/api/v1/analytics/overview", response_model=AnalyticsOverviewResponse)
-def analytics_overview(
-    db: Session = Depends(get_db),
+async def analytics_overview(
+    db: AsyncSession = Depends(get_async_db),
     context: TenantContext = Depends(get_tenant_context),
     _: AuthUser = Depends(require_roles("operator", "analyst", "admin")),
 ) -> AnalyticsOverviewResponse:
-    metrics = analytics_service.overview(db, tenant_id=context.tenant_id)
+    # run_sync drives the sync service on this connection without a threadpool hop.
+    metrics = await db.run_sync(
+        lambda session: analytics_service.overview(session, tenant_id=context.tenant_id)
+    )
     return AnalyticsOverviewResponse(
         total_documents=int(metrics["total_documents"]),
         open_review_tasks=int(metrics["open_review_tasks"]),
@@ -18,6 +18,27 @@ locals {
     "export.submission.updated",
     "invoice.dispute.updated"
   ]
+
+  # Pull consumers and their input topics; mirrors TOPICS in services/<stage>/worker.py.
+  # The webhook bridge (services/webhooks/bridge.py) consumes every topic.
+  event_consumers = {
+    preprocessing  = ["document.received"]
+    classification = ["document.preprocessed"]
+    extraction     = ["document.classified"]
+    validation     = ["document.extracted"]
+    review         = ["document.validated"]
+    notifications  = ["review.required", "discrepancy.detected"]
+    webhooks       = local.event_topics
+  }
+
+  consumer_subscriptions = merge([
+    for consumer, topics in local.event_consumers : {
+      for topic in topics : "${consumer}/${topic}" => {
+        consumer = consumer
+        topic    = topic
+      }
+    }
+  ]...)
 }
 
 resource "google_compute_network" "vpc" {
@@ -131,6 +152,28 @@ resource "google_pubsub_subscription" "events_subscriptions" {
   }
 }
 
+# PubSubEventSource pulls <prefix>-<topic>-<consumer>, one subscription per consumer so
+# every stage and the webhook bridge get their own copy of each message.
+resource "google_pubsub_subscription" "consumer_subscriptions" {
+  for_each = local.consumer_subscriptions
+  name     = replace("${local.name_prefix}-${each.value.topic}-${each.value.consumer}", ".", "-")
+  topic    = google_pubsub_topic.events[each.value.topic].id
+
+  ack_deadline_seconds = 60
+  # The outbox relay publishes with the tenant as ordering key.
+  enable_message_ordering = true
+
+  dead_letter_policy {
+    dead_letter_topic     = google_pubsub_topic.dlq[each.value.topic].id
+    max_delivery_attempts = 10
+  }
+
+  retry_policy {
+    minimum_backoff = "10s"
+    maximum_backoff = "600s"
+  }
+}
+
 resource "google_pubsub_subscription" "dlq_replay_subscriptions" {
   for_each = google_pubsub_topic.dlq
   name     = "${each.value.name}-replay-sub"
@@ -190,6 +233,14 @@ resource "google_cloud_run_v2_service" "api_gateway" {
         name  = "EVENT_BUS_BACKEND"
         value = "pubsub"
       }
+      env {
+        name  = "GCP_PUBSUB_TOPIC_PREFIX"
+        value = local.name_prefix
+      }
+      env {
+        name  = "EVENT_OUTBOX_ENABLED"
+        value = "true"
+      }
     }
 
     scaling {
@@ -227,6 +278,59 @@ resource "google_cloud_run_v2_job" "webhook_worker_job" {
   }
 }
 
+resource "google_cloud_run_v2_job" "outbox_relay_job" {
+  name     = "${local.name_prefix}-outbox-relay"
+  location = var.region
+
+  template {
+    template {
+      containers {
+        image = "${var.region}-docker.pkg.dev/${var.project_id}/${google_artifact_registry_repository.repo.repository_id}/outbox-relay:latest"
+        env {
+          name  = "EVENT_BUS_BACKEND"
+          value = "pubsub"
+        }
+        env {
+          name  = "GCP_PUBSUB_TOPIC_PREFIX"
+          value = local.name_prefix
+        }
+      }
+      max_retries = 3
+    }
+  }
+}
+
+resource "google_service_account" "scheduler" {
+  account_id   = "${local.name_prefix}-scheduler"
+  display_name = "NexusCargo ${var.environment} Cloud Scheduler invoker"
+}
+
+resource "google_cloud_run_v2_job_iam_member" "outbox_relay_invoker" {
+  name     = google_cloud_run_v2_job.outbox_relay_job.name
+  location = var.region
+  role     = "roles/run.invoker"
+  member   = "serviceAccount:${google_service_account.scheduler.email}"
+}
+
+# The relay job drains the outbox and exits, so it runs every minute. Without this
+# trigger, rows staged by the gateway (EVENT_OUTBOX_ENABLED=true) would never publish.
+resource "google_cloud_scheduler_job" "outbox_relay_schedule" {
+  name     = "${local.name_prefix}-outbox-relay"
+  region   = var.region
+  schedule = "* * * * *"
+
+  http_target {
+    http_method = "POST"
+    uri         = "https://run.googleapis.com/v2/projects/${var.project_id}/locations/${var.region}/jobs/${google_cloud_run_v2_job.outbox_relay_job.name}:run"
+
+    oauth_token {
+      service_account_email = google_service_account.scheduler.email
+    }
+  }
+
+  depends_on = [google_cloud_run_v2_job_iam_member.outbox_relay_invoker]
+}
+
 resource "google_monitoring_alert_policy" "error_rate" {
   display_name = "${local.name_prefix} API error rate"
   combiner     = "OR"
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from typing import Any
 from uuid import uuid4
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from libs.common.models import AuditEvent
@@ -28,3 +30,30 @@ def create_audit_event(
     )
     db.add(event)
     return event
+
+
+def create_audit_events_bulk(
+    db: Session,
+    *,
+    tenant_id: str,
+    actor_id: str,
+    action: str,
+    entity_type: str,
+    entries: list[tuple[str, dict[str, Any]]],
+) -> int:
+    if not entries:
+        return 0
+    rows = [
+        {
+            "id": f"audit_{uuid4().hex}",
+            "tenant_id": tenant_id,
+            "actor_id": actor_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "payload": payload,
+        }
+        for entity_id, payload in entries
+    ]
+    db.execute(insert(AuditEvent), rows)
+    return len(rows)
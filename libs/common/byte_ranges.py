@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from typing import Optional
+
+
+class RangeNotSatisfiableError(ValueError):
+    def __init__(self, size: int):
+        super().__init__(f"range not satisfiable for {size} bytes")
+        self.size = size
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    # Returns an inclusive (start, end) pair, or None to serve the whole object. Multiple
+    # ranges and malformed headers are ignored, which RFC 9110 permits.
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        first_value = int(first) if first.strip() else None
+        last_value = int(last) if last.strip() else None
+    except ValueError:
+        return None
+    if first_value is None:
+        if last_value is None:
+            return None
+        if last_value <= 0:
+            raise RangeNotSatisfiableError(size)
+        start, end = max(0, size - last_value), size - 1
+    else:
+        if first_value < 0 or (last_value is not None and last_value < first_value):
+            return None
+        start = first_value
+        end = size - 1 if last_value is None else min(last_value, size - 1)
+    if start >= size:
+        raise RangeNotSatisfiableError(size)
+    return start, end
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires.
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag.removeprefix("W/")
+        for candidate in header.split(",")
+    )
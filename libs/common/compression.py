@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import gzip
+import importlib
+import zlib
+from types import ModuleType
+from typing import Optional, Protocol
+
+SUPPORTED_CODECS = ("none", "gzip", "zstd")
+GZIP_WBITS = 31
+
+
+class StreamCompressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class StreamDecompressor(Protocol):
+    def decompress(self, data: bytes) -> bytes: ...
+
+
+class CompressionUnavailableError(RuntimeError):
+    pass
+
+
+def _zstd_module() -> ModuleType:
+    try:
+        return importlib.import_module("zstandard")
+    except ImportError as exc:
+        raise CompressionUnavailableError(
+            "zstd compression requires the optional 'zstandard' package"
+        ) from exc
+
+
+def codec_available(codec: str) -> bool:
+    if codec not in SUPPORTED_CODECS:
+        return False
+    if codec != "zstd":
+        return True
+    try:
+        _zstd_module()
+    except CompressionUnavailableError:
+        return False
+    return True
+
+
+def compress(data: bytes, codec: str, *, level: Optional[int] = None) -> bytes:
+    if codec == "none":
+        return data
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=level if level is not None else 6, mtime=0)
+    if codec == "zstd":
+        compressor = _zstd_module().ZstdCompressor(level=level if level is not None else 3)
+        return bytes(compressor.compress(data))
+    raise ValueError(f"unsupported compression codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "none":
+        return data
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        return bytes(_zstd_module().ZstdDecompressor().decompress(data))
+    raise ValueError(f"unsupported compression codec: {codec}")
+
+
+def stream_compressor(
+    codec: str, *, level: Optional[int] = None, dictionary: Optional[bytes] = None
+) -> StreamCompressor:
+    if codec == "gzip":
+        return zlib.compressobj(level if level is not None else 6, zlib.DEFLATED, GZIP_WBITS)
+    if codec == "zstd":
+        module = _zstd_module()
+        compressor = module.ZstdCompressor(
+            level=level if level is not None else 3,
+            dict_data=module.ZstdCompressionDict(dictionary) if dictionary else None,
+        )
+        return compressor.compressobj()  # type: ignore[no-any-return]
+    raise ValueError(f"unsupported compression codec: {codec}")
+
+
+def stream_decompressor(codec: str, *, dictionary: Optional[bytes] = None) -> StreamDecompressor:
+    if codec == "gzip":
+        return zlib.decompressobj(GZIP_WBITS)
+    if codec == "zstd":
+        module = _zstd_module()
+        decompressor = module.ZstdDecompressor(
+            dict_data=module.ZstdCompressionDict(dictionary) if dictionary else None
+        )
+        return decompressor.decompressobj()  # type: ignore[no-any-return]
+    raise ValueError(f"unsupported compression codec: {codec}")
+
+
+def train_zstd_dictionary(samples: list[bytes], *, size_bytes: int = 16 * 1024) -> bytes:
+    return bytes(_zstd_module().train_dictionary(size_bytes, samples).as_bytes())
+
+
+def zstd_dictionary_id(dictionary: bytes) -> int:
+    return int(_zstd_module().ZstdCompressionDict(dictionary).dict_id())
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Sync drivers mapped to their asyncio counterparts on the same database.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -14,6 +24,18 @@ class Settings(BaseSettings):
     app_name: str = "NexusCargo AI Platform"
     environment: str = "dev"
     database_url: str = "sqlite+pysqlite:///./nexuscargo.db"
+    database_async_url: str = ""
+    # Per engine; the gateway runs a sync and an async engine, so each Cloud Run instance
+    # opens up to 2 * (pool_size + max_overflow) connections.
+    database_pool_size: int = 5
+    database_max_overflow: int = 5
+    database_pool_timeout_seconds: float = 10.0
+    database_pool_recycle_seconds: int = 1800
+    database_pool_liveness_idle_seconds: float = 60.0
+    database_connect_timeout_seconds: int = 10
+    database_slow_query_ms: float = 250.0
+    # Unset means on in dev only: the headers expose query counts and DB time to clients.
+    database_timing_headers_enabled: Optional[bool] = None
 
     auth_issuer: str = "nexuscargo-local"
     auth_audience: str = "nexuscargo-api"
@@ -26,12 +48,52 @@ class Settings(BaseSettings):
     review_confidence_threshold: float = 0.8
 
     event_bus_backend: str = "memory"
+    event_bus_capacity: int = 10_000
+    event_bus_workers: int = 4
+    event_bus_backpressure: str = "block"
+    event_bus_block_timeout_seconds: float = 5.0
     gcp_project_id: str = ""
     gcp_pubsub_topic_prefix: str = "nexuscargo"
+    pubsub_batch_max_messages: int = 100
+    pubsub_batch_max_bytes: int = 1_000_000
+    pubsub_batch_max_latency_seconds: float = 0.01
+    pubsub_flush_timeout_seconds: float = 10.0
+    pubsub_retry_buffer_size: int = 1000
+    event_outbox_enabled: bool = False
+    pipeline_mode: str = "inline"
+    stage_queue_path: str = "/tmp/nexuscargo-stage-queue.db"
+    stage_worker_concurrency: int = 4
+    stage_worker_max_outstanding: int = 32
+    stage_worker_poll_interval_seconds: float = 1.0
+    stage_worker_visibility_timeout_seconds: float = 300.0
+    stage_worker_max_attempts: int = 5
+    event_outbox_batch_size: int = 500
+    event_outbox_poll_interval_seconds: float = 1.0
+    event_codec: str = "orjson"
+    event_compression: str = "gzip"
+    event_compression_threshold_bytes: int = 4096
+    event_dedupe_cache_size: int = 10_000
+    event_dedupe_ttl_seconds: float = 604_800.0
+    event_dedupe_purge_interval_seconds: float = 3600.0
     gcp_location: str = "australia-southeast1"
 
     storage_backend: str = "local"
     storage_local_root: str = "/tmp/nexuscargo-storage"
+    storage_chunk_size_bytes: int = 8 * 1024 * 1024
+    signed_url_expiration_seconds: int = 900
+    signed_url_min_remaining_seconds: int = 300
+    signed_url_cache_size: int = 10_000
+    storage_cache_enabled: bool = False
+    storage_cache_dir: str = "/tmp/nexuscargo-storage-cache"
+    storage_cache_max_bytes: int = 2 * 1024 * 1024 * 1024
+    storage_compression_enabled: bool = False
+    storage_compression_codec: str = "zstd"
+    storage_compression_level: int = 3
+    storage_compression_content_types: str = (
+        "application/json,text/plain,text/csv,application/xml"
+    )
+    storage_zstd_dictionary_path: str = ""
+    storage_zstd_dictionary_max_object_bytes: int = 16 * 1024
     gcs_raw_bucket: str = ""
     gcs_processed_bucket: str = ""
 
@@ -40,6 +102,24 @@ class Settings(BaseSettings):
 
     webhook_signing_secret: str = Field(default="local-webhook-signing-secret", min_length=16)
     webhook_max_retries: int = 5
+    webhook_delivery_concurrency: int = 64
+    webhook_per_host_concurrency: int = 8
+    webhook_http2_enabled: bool = True
+    webhook_circuit_failure_threshold: int = 5
+    webhook_circuit_open_seconds: float = 60.0
+    webhook_replay_rate_per_second: float = 5.0
+    webhook_replay_burst: int = 10
+    webhook_lease_seconds: int = 120
+    webhook_worker_batch_size: int = 100
+    webhook_worker_poll_interval_seconds: float = 2.0
+    webhook_worker_heartbeat_seconds: float = 30.0
+    webhook_outcome_commit_size: int = 25
+    webhook_outcome_commit_interval_seconds: float = 1.0
+    webhook_subscription_index_ttl_seconds: float = 30.0
+    webhook_bridge_batch_size: int = 500
+    webhook_bridge_inline: bool = False
+    webhook_retention_days: int = 30
+    webhook_retention_chunk_size: int = 1000
 
     ai_backend: str = "mock"
     documentai_processor_id: str = ""
@@ -72,12 +152,29 @@ class Settings(BaseSettings):
     # TODO(owner:platform-security): Wire Identity Platform JWKS endpoint and key rotation policy.
     identity_platform_jwks_url: str = ""
 
+    @property
+    def resolved_database_async_url(self) -> str:
+        if self.database_async_url:
+            return self.database_async_url
+        driver, separator, rest = self.database_url.partition("://")
+        return f"{ASYNC_DRIVERS.get(driver, driver)}{separator}{rest}"
+
+    @property
+    def database_timing_headers_active(self) -> bool:
+        if self.database_timing_headers_enabled is not None:
+            return self.database_timing_headers_enabled
+        return self.environment.lower() in {"dev", "local", "test"}
+
     def validate_runtime_constraints(self) -> None:
         non_dev = self.environment.lower() in {"staging", "prod", "production"}
         if self.require_secret_manager_in_non_dev and non_dev and not self.secret_manager_enabled:
             raise RuntimeError(
                 "secret_manager_enabled must be true in staging/prod environments"
             )
+        if self.pipeline_mode == "event_driven" and not self.event_outbox_enabled:
+            # Without the outbox, events publish before the producing transaction commits,
+            # and the next stage can run before the rows it needs are visible.
+            raise RuntimeError("pipeline_mode=event_driven requires event_outbox_enabled=true")
         if self.event_bus_backend == "pubsub" and not self.gcp_project_id:
             raise RuntimeError("gcp_project_id is required when event_bus_backend=pubsub")
         if self.ai_backend == "gcp" and (not self.gcp_project_id or not self.documentai_processor_id):
@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import argparse
+import importlib
+import signal
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from types import FrameType
+from typing import Any, Optional, Protocol
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from libs.common.config import Settings, get_settings
+from libs.common.dedupe import EventDedupeStore
+from libs.common.event_codec import EventCodec, get_event_codec
+from libs.common.events import EventBus, get_event_bus
+from libs.common.logging import configure_logging, log_event
+from libs.common.models import Document
+from libs.common.sql_metrics import query_metrics, track_queries
+from libs.common.sqlite_queue import ConsumedEvent, SQLiteEventQueue
+
+EventHandler = Callable[[ConsumedEvent], None]
+StageHandler = Callable[[Session, ConsumedEvent], None]
+SessionFactory = Callable[[], Session]
+
+
+class EventSource(Protocol):
+    def receive(self, topics: Sequence[str], max_messages: int) -> list[ConsumedEvent]: ...
+
+    def ack(self, message_ids: Sequence[str]) -> None: ...
+
+    def nack(self, message_ids: Sequence[str], *, delay_seconds: float = 0.0) -> None: ...
+
+
+class PubSubEventSource:
+    def __init__(
+        self,
+        settings: Settings,
+        stage: str,
+        *,
+        subscriber: Any = None,
+        codec: EventCodec | None = None,
+    ):
+        if not settings.gcp_project_id:
+            raise RuntimeError("gcp_project_id is required for pubsub backend")
+        if subscriber is None:
+            pubsub_module = importlib.import_module("google.cloud.pubsub_v1")
+            subscriber = pubsub_module.SubscriberClient()
+        self._subscriber = subscriber
+        self._codec = codec or get_event_codec(settings)
+        self._project_id = settings.gcp_project_id
+        self._prefix = settings.gcp_pubsub_topic_prefix
+        self._stage = stage
+        self._pull_timeout = settings.stage_worker_poll_interval_seconds
+        self._logger = configure_logging()
+
+    def receive(self, topics: Sequence[str], max_messages: int) -> list[ConsumedEvent]:
+        events: list[ConsumedEvent] = []
+        for topic in topics:
+            remaining = max_messages - len(events)
+            if remaining <= 0:
+                break
+            subscription = self._subscription_path(topic)
+            response = self._subscriber.pull(
+                request={"subscription": subscription, "max_messages": remaining},
+                timeout=self._pull_timeout,
+            )
+            for received in response.received_messages:
+                message_id = f"{subscription}|{received.ack_id}"
+                attempt = max(1, received.delivery_attempt)
+                attributes = dict(received.message.attributes)
+                try:
+                    envelope = self._codec.decode(received.message.data, attributes)
+                except Exception as exc:  # noqa: BLE001
+                    # The subscription's dead-letter policy takes it after enough nacks.
+                    log_event(
+                        self._logger,
+                        "stage_event_undecodable",
+                        {"subscription": subscription, "attempt": attempt, "error": str(exc)},
+                    )
+                    self.nack([message_id], delay_seconds=min(2**attempt, 60))
+                    continue
+                events.append(
+                    ConsumedEvent(
+                        message_id=message_id,
+                        topic=topic,
+                        payload=envelope.payload,
+                        attributes=attributes,
+                        delivery_attempt=attempt,
+                        event_id=envelope.event_id,
+                    )
+                )
+        return events
+
+    def ack(self, message_ids: Sequence[str]) -> None:
+        for subscription, ack_ids in _group_ack_ids(message_ids).items():
+            self._subscriber.acknowledge(request={"subscription": subscription, "ack_ids": ack_ids})
+
+    def nack(self, message_ids: Sequence[str], *, delay_seconds: float = 0.0) -> None:
+        for subscription, ack_ids in _group_ack_ids(message_ids).items():
+            self._subscriber.modify_ack_deadline(
+                request={
+                    "subscription": subscription,
+                    "ack_ids": ack_ids,
+                    "ack_deadline_seconds": int(delay_seconds),
+                }
+            )
+
+    def _subscription_path(self, topic: str) -> str:
+        subscription_id = f"{self._prefix}-{topic}-{self._stage}".replace(".", "-")
+        return str(self._subscriber.subscription_path(self._project_id, subscription_id))
+
+
+def receive_backoff(poll_interval: float, failures: int) -> float:
+    # Transport errors (a pull DeadlineExceeded, a locked queue file) back off instead of
+    # ending the worker loop.
+    return float(min(max(poll_interval, 0.1) * 2 ** min(failures, 10), 60.0))
+
+
+def _group_ack_ids(message_ids: Sequence[str]) -> dict[str, list[str]]:
+    grouped: dict[str, list[str]] = {}
+    for message_id in message_ids:
+        subscription, ack_id = message_id.split("|", 1)
+        grouped.setdefault(subscription, []).append(ack_id)
+    return grouped
+
+
+class StageConsumer:
+    def __init__(
+        self,
+        stage: str,
+        source: EventSource,
+        topics: Sequence[str],
+        handler: EventHandler,
+        *,
+        settings: Settings | None = None,
+        concurrency: Optional[int] = None,
+        max_outstanding: Optional[int] = None,
+        housekeeping: Optional[Callable[[], int]] = None,
+    ):
+        runtime_settings = settings or get_settings()
+        self.stage = stage
+        self._source = source
+        self._topics = list(topics)
+        self._handler = handler
+        self._concurrency = max(1, concurrency or runtime_settings.stage_worker_concurrency)
+        # Flow control: never hold more claimed messages than this, so a slow stage leaves
+        # the backlog in the queue where other replicas can take it.
+        self._max_outstanding = max(
+            self._concurrency, max_outstanding or runtime_settings.stage_worker_max_outstanding
+        )
+        self._poll_interval = runtime_settings.stage_worker_poll_interval_seconds
+        # Periodic upkeep run from the receive loop, e.g. purging expired dedupe markers.
+        self._housekeeping = housekeeping
+        self._housekeeping_interval = runtime_settings.event_dedupe_purge_interval_seconds
+        self._outstanding = 0
+        self._totals = {"received": 0, "acked": 0, "nacked": 0}
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._logger = configure_logging()
+
+    def request_stop(self) -> None:
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def install_signal_handlers(self) -> None:
+        def _handle(signum: int, _frame: Optional[FrameType]) -> None:
+            log_event(
+                self._logger, "stage_worker_stop_requested", {"stage": self.stage, "signal": signum}
+            )
+            self.request_stop()
+
+        signal.signal(signal.SIGTERM, _handle)
+        signal.signal(signal.SIGINT, _handle)
+
+    def run(self, *, drain: bool = False) -> dict[str, int]:
+        log_event(
+            self._logger,
+            "stage_worker_started",
+            {"stage": self.stage, "topics": self._topics, "concurrency": self._concurrency},
+        )
+        receive_failures = 0
+        next_housekeeping = time.monotonic()
+        with ThreadPoolExecutor(
+            max_workers=self._concurrency, thread_name_prefix=f"{self.stage}-stage"
+        ) as executor:
+            while not self._stop.is_set():
+                if self._housekeeping is not None and time.monotonic() >= next_housekeeping:
+                    self._run_housekeeping(self._housekeeping)
+                    next_housekeeping = time.monotonic() + self._housekeeping_interval
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._outstanding < self._max_outstanding or self._stop.is_set()
+                    )
+                    capacity = self._max_outstanding - self._outstanding
+                if self._stop.is_set():
+                    break
+                try:
+                    events = self._source.receive(self._topics, capacity)
+                except Exception as exc:  # noqa: BLE001
+                    receive_failures += 1
+                    log_event(
+                        self._logger,
+                        "stage_receive_failed",
+                        {"stage": self.stage, "failures": receive_failures, "error": str(exc)},
+                    )
+                    self._stop.wait(receive_backoff(self._poll_interval, receive_failures))
+                    continue
+                receive_failures = 0
+                if not events:
+                    with self._condition:
+                        if self._outstanding:
+                            self._condition.wait(self._poll_interval)
+                            continue
+                    if drain:
+                        break
+                    self._stop.wait(self._poll_interval)
+                    continue
+                with self._condition:
+                    self._outstanding += len(events)
+                    self._totals["received"] += len(events)
+                for event in events:
+                    executor.submit(self._process, event)
+        with self._condition:
+            totals = dict(self._totals)
+        log_event(self._logger, "stage_worker_stopped", {"stage": self.stage, **totals})
+        return totals
+
+    def _run_housekeeping(self, housekeeping: Callable[[], int]) -> None:
+        try:
+            purged = housekeeping()
+        except Exception as exc:  # noqa: BLE001
+            log_event(
+                self._logger, "stage_housekeeping_failed", {"stage": self.stage, "error": str(exc)}
+            )
+            return
+        log_event(
+            self._logger, "stage_housekeeping_completed", {"stage": self.stage, "purged": purged}
+        )
+
+    def _process(self, event: ConsumedEvent) -> None:
+        try:
+            self._handler(event)
+            self._source.ack([event.message_id])
+            outcome = "acked"
+        except Exception as exc:  # noqa: BLE001
+            log_event(
+                self._logger,
+                "stage_event_failed",
+                {
+                    "stage": self.stage,
+                    "topic": event.topic,
+                    "attempt": event.delivery_attempt,
+                    "error": str(exc),
+                },
+            )
+            self._source.nack(
+                [event.message_id], delay_seconds=min(2 ** event.delivery_attempt, 60)
+            )
+            outcome = "nacked"
+        with self._condition:
+            self._outstanding -= 1
+            self._totals[outcome] += 1
+            self._condition.notify_all()
+
+
+def transactional(
+    session_factory: SessionFactory,
+    handler: StageHandler,
+    *,
+    dedupe: EventDedupeStore | None = None,
+    consumer: str = "",
+) -> EventHandler:
+    def _handle(event: ConsumedEvent) -> None:
+        store = dedupe if event.event_id else None
+        db = session_factory()
+        with track_queries(f"stage:{consumer or 'default'} {event.topic}") as query_stats:
+            try:
+                if store is not None and store.seen(db, consumer, event.event_id):
+                    return
+                handler(db, event)
+                if store is not None:
+                    store.mark(db, consumer, event.event_id)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+                query_metrics.record(query_stats)
+        if store is not None:
+            store.remember(consumer, event.event_id)
+
+    return _handle
+
+
+def purge_processed_events(session_factory: SessionFactory, store: EventDedupeStore) -> int:
+    db = session_factory()
+    try:
+        purged = store.purge_expired(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return purged
+
+
+class EventNotReadyError(RuntimeError):
+    pass
+
+
+def event_document(db: Session, event: ConsumedEvent) -> Document:
+    stmt = select(Document).where(
+        Document.id == str(event.payload.get("document_id", "")),
+        Document.tenant_id == str(event.payload.get("tenant_id", "")),
+    )
+    document = db.execute(stmt).scalar_one_or_none()
+    if document is None:
+        # Not visible yet (or on a lagging replica): raising nacks the message so it is
+        # redelivered with backoff instead of being acked and dropped.
+        raise EventNotReadyError(f"document {event.payload.get('document_id')} not visible")
+    return document
+
+
+def get_event_source(
+    settings: Settings, stage: str, *, fanout_topics: Sequence[str] = ()
+) -> EventSource:
+    # Pub/Sub subscriptions are per stage already; the SQLite queue needs a named
+    # subscription for consumers that must see messages the stage workers also take.
+    if settings.event_bus_backend == "pubsub":
+        return PubSubEventSource(settings, stage)
+    if settings.event_bus_backend == "sqlite":
+        return SQLiteEventQueue(
+            settings.stage_queue_path,
+            visibility_timeout_seconds=settings.stage_worker_visibility_timeout_seconds,
+            max_attempts=settings.stage_worker_max_attempts,
+            codec=get_event_codec(settings),
+            subscription=stage if fanout_topics else "",
+            topics=fanout_topics,
+        )
+    raise RuntimeError("stage workers require event_bus_backend=pubsub or sqlite")
+
+
+def run_stage(
+    stage: str,
+    topics: Sequence[str],
+    build_handler: Callable[[EventBus], StageHandler],
+    argv: Optional[list[str]] = None,
+) -> int:
+    parser = argparse.ArgumentParser(description=f"NexusCargo {stage} stage worker")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--max-outstanding", type=int, default=None)
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="exit once no messages are waiting (Cloud Run job mode)",
+    )
+    args = parser.parse_args(argv)
+
+    from libs.common.database import SessionLocal
+
+    settings = get_settings()
+    settings.validate_runtime_constraints()
+    event_bus = get_event_bus(settings)
+    dedupe = EventDedupeStore(
+        capacity=settings.event_dedupe_cache_size,
+        ttl_seconds=settings.event_dedupe_ttl_seconds,
+    )
+    consumer = StageConsumer(
+        stage,
+        get_event_source(settings, stage),
+        topics,
+        transactional(SessionLocal, build_handler(event_bus), dedupe=dedupe, consumer=stage),
+        settings=settings,
+        concurrency=args.concurrency,
+        max_outstanding=args.max_outstanding,
+        housekeeping=lambda: purge_processed_events(SessionLocal, dedupe),
+    )
+    consumer.install_signal_handlers()
+    consumer.run(drain=args.drain)
+    event_bus.flush()
+    log_event(configure_logging(), "stage_worker_sql", {"stage": stage, **query_metrics.snapshot()})
+    return 0
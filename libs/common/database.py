@@ -1,16 +1,105 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+import threading
+from collections.abc import AsyncIterator, Generator
+from typing import Any, Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
-from libs.common.config import get_settings
+from libs.common.config import Settings, get_settings
+from libs.common.db_pool import PoolTelemetry, install_liveness_check, instrumented_pool_class
+from libs.common.logging import configure_logging
 from libs.common.models import Base
+from libs.common.sql_metrics import install_query_instrumentation
+
+# Connect timeout keyword per DBAPI driver.
+CONNECT_TIMEOUT_ARGS = {
+    "pysqlite": "timeout",
+    "aiosqlite": "timeout",
+    "psycopg": "connect_timeout",
+    "psycopg2": "connect_timeout",
+    "asyncpg": "timeout",
+}
+
+
+def _engine_options(
+    runtime_settings: Settings, url: str, base_pool: type[Pool], telemetry: PoolTelemetry
+) -> dict[str, Any]:
+    parsed = make_url(url)
+    options: dict[str, Any] = {}
+    timeout_arg = CONNECT_TIMEOUT_ARGS.get(parsed.get_driver_name())
+    if timeout_arg:
+        options["connect_args"] = {timeout_arg: runtime_settings.database_connect_timeout_seconds}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options  # in-memory SQLite needs its single-connection pool
+    options.update(
+        poolclass=instrumented_pool_class(base_pool, telemetry),
+        pool_size=runtime_settings.database_pool_size,
+        max_overflow=runtime_settings.database_max_overflow,
+        pool_timeout=runtime_settings.database_pool_timeout_seconds,
+        pool_recycle=runtime_settings.database_pool_recycle_seconds,
+        pool_use_lifo=True,  # idle connections past the hot set age out and get recycled
+    )
+    return options
+
 
 settings = get_settings()
-engine = create_engine(settings.database_url, future=True, pool_pre_ping=True)
+pool_telemetry = PoolTelemetry()
+async_pool_telemetry = PoolTelemetry()
+engine = create_engine(
+    settings.database_url,
+    future=True,
+    **_engine_options(settings, settings.database_url, QueuePool, pool_telemetry),
+)
+install_liveness_check(engine, pool_telemetry, settings.database_pool_liveness_idle_seconds)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+install_query_instrumentation(
+    engine, slow_query_ms=settings.database_slow_query_ms, logger=configure_logging()
+)
+# Objects stay usable after commit: lazy refreshes would need an await the caller can't make.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    # Built on first use: the async driver (asyncpg on Postgres) is only needed by the
+    # gateway, so workers importing this module don't have to install it.
+    global _async_engine
+    with _async_engine_lock:
+        if _async_engine is None:
+            url = settings.resolved_database_async_url
+            async_engine = create_async_engine(
+                url,
+                **_engine_options(settings, url, AsyncAdaptedQueuePool, async_pool_telemetry),
+            )
+            install_liveness_check(
+                async_engine.sync_engine,
+                async_pool_telemetry,
+                settings.database_pool_liveness_idle_seconds,
+            )
+            install_query_instrumentation(
+                async_engine.sync_engine,
+                slow_query_ms=settings.database_slow_query_ms,
+                logger=configure_logging(),
+            )
+            AsyncSessionLocal.configure(bind=async_engine)
+            _async_engine = async_engine
+        return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    if _async_engine is not None:
+        await _async_engine.dispose()
 
 
 def init_db() -> None:
@@ -23,3 +112,16 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_metrics() -> dict[str, Any]:
+    metrics = {"sync": pool_telemetry.snapshot(engine.pool)}
+    if _async_engine is not None:
+        metrics["async"] = async_pool_telemetry.snapshot(_async_engine.sync_engine.pool)
+    return metrics
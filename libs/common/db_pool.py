@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+# Upper bounds, in milliseconds, of the checkout wait histogram buckets.
+WAIT_BUCKETS_MS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 5000.0)
+
+
+class PoolTelemetry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._counters = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "liveness_checks": 0,
+            "liveness_failures": 0,
+            "invalidations": 0,
+        }
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+
+    def record_wait(self, wait_ms: float) -> None:
+        with self._lock:
+            self._buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self._counters["checkouts"] += 1
+            self._wait_total_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def increment(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def snapshot(self, pool: Pool) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            buckets = list(self._buckets)
+            wait_total_ms = self._wait_total_ms
+            wait_max_ms = self._wait_max_ms
+        labels = [f"le_{int(bound)}ms" for bound in WAIT_BUCKETS_MS] + ["gt_5000ms"]
+        checkouts = counters["checkouts"]
+        snapshot: dict[str, Any] = {
+            **counters,
+            "wait_ms": {
+                "avg": round(wait_total_ms / checkouts, 3) if checkouts else 0.0,
+                "max": round(wait_max_ms, 3),
+                "histogram": dict(zip(labels, buckets)),
+            },
+        }
+        if isinstance(pool, QueuePool):
+            snapshot.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+            )
+        return snapshot
+
+
+def instrumented_pool_class(base: type[Pool], telemetry: PoolTelemetry) -> type[Pool]:
+    # Pools rebuild themselves through self.__class__ after a disconnect, so the telemetry
+    # rides on a per-engine subclass rather than on the instance.
+    class InstrumentedPool(base):  # type: ignore[misc, valid-type]
+        def connect(self) -> Any:
+            start = time.perf_counter()
+            try:
+                connection = super().connect()
+            except PoolTimeoutError:
+                telemetry.increment("timeouts")
+                raise
+            telemetry.record_wait((time.perf_counter() - start) * 1000)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def install_liveness_check(engine: Engine, telemetry: PoolTelemetry, idle_seconds: float) -> None:
+    # Instead of pinging on every checkout, only connections that sat idle long enough for
+    # a proxy or server timeout to have dropped them are checked. A failed check raises
+    # DisconnectionError, which makes the pool discard the connection and retry.
+    @event.listens_for(engine, "checkin")
+    def _checkin(_dbapi_connection: Any, record: Any) -> None:
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection: Any, record: Any, _proxy: Any) -> None:
+        checked_in_at = record.info.get("checked_in_at")
+        if idle_seconds <= 0 or checked_in_at is None:
+            return
+        if time.monotonic() - checked_in_at < idle_seconds:
+            return
+        telemetry.increment("liveness_checks")
+        try:
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+        except Exception as exc:
+            telemetry.increment("liveness_failures")
+            raise DisconnectionError("connection failed liveness check") from exc
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(_dbapi_connection: Any, _record: Any, _exception: Any) -> None:
+        telemetry.increment("invalidations")
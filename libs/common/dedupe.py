@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from libs.common.models import ProcessedEvent
+
+Clock = Callable[[], datetime]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# Redelivered events are recognised in two tiers: a bounded in-process LRU answers
+# the common case (a retry landing on the same replica) without a query, and the
+# processed_events table covers other replicas and restarts until the TTL expires.
+class EventDedupeStore:
+    def __init__(
+        self,
+        *,
+        capacity: int = 10_000,
+        ttl_seconds: float = 604_800.0,
+        clock: Clock = _utcnow,
+    ):
+        self._capacity = max(1, capacity)
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._clock = clock
+        self._recent: OrderedDict[tuple[str, str], None] = OrderedDict()
+        self._counters = {"memory_hits": 0, "store_hits": 0, "misses": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+    def seen(self, db: Session, consumer: str, event_id: str) -> bool:
+        key = (consumer, event_id)
+        with self._lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return True
+        processed_at = db.execute(
+            select(ProcessedEvent.processed_at).where(
+                ProcessedEvent.consumer == consumer, ProcessedEvent.event_id == event_id
+            )
+        ).scalar_one_or_none()
+        if processed_at is not None and _aware(processed_at) > self._clock() - self._ttl:
+            self._remember(key)
+            with self._lock:
+                self._counters["store_hits"] += 1
+            return True
+        with self._lock:
+            self._counters["misses"] += 1
+        return False
+
+    def mark(self, db: Session, consumer: str, event_id: str) -> None:
+        # Written in the handler's transaction, so the marker commits with its effects.
+        db.merge(ProcessedEvent(consumer=consumer, event_id=event_id, processed_at=self._clock()))
+
+    def remember(self, consumer: str, event_id: str) -> None:
+        self._remember((consumer, event_id))
+
+    def purge_expired(self, db: Session) -> int:
+        result = db.execute(
+            delete(ProcessedEvent)
+            .where(ProcessedEvent.processed_at < self._clock() - self._ttl)
+            .execution_options(synchronize_session=False)
+        )
+        return int(getattr(result, "rowcount", 0) or 0)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "cached": len(self._recent), "capacity": self._capacity}
+
+    def _remember(self, key: tuple[str, str]) -> None:
+        with self._lock:
+            self._recent[key] = None
+            self._recent.move_to_end(key)
+            while len(self._recent) > self._capacity:
+                self._recent.popitem(last=False)
+                self._counters["evicted"] += 1
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
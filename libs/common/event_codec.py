@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import ModuleType
+from typing import Any, Optional
+from uuid import uuid4
+
+from libs.common.compression import compress, decompress
+from libs.common.config import Settings, get_settings
+from libs.schemas.events import ENVELOPE_SCHEMA_VERSION, EventEnvelope
+
+SUPPORTED_EVENT_CODECS = ("json", "orjson", "msgpack")
+CONTENT_TYPES = {
+    "json": "application/json",
+    "orjson": "application/json",
+    "msgpack": "application/msgpack",
+}
+
+
+@dataclass(frozen=True)
+class EncodedEvent:
+    data: bytes
+    attributes: dict[str, str]
+
+
+def new_envelope(
+    topic: str, payload: dict[str, Any], attributes: Optional[dict[str, str]] = None
+) -> EventEnvelope:
+    tenant_id = payload.get("tenant_id")
+    # Publishers are trusted, so skip validation on the hot path; decode validates.
+    return EventEnvelope.model_construct(
+        schema_version=ENVELOPE_SCHEMA_VERSION,
+        event_id=(attributes or {}).get("event_id") or uuid4().hex,
+        event_type=topic,
+        tenant_id=str(tenant_id) if tenant_id is not None else None,
+        occurred_at=datetime.now(timezone.utc),
+        payload=payload,
+    )
+
+
+def _optional_module(name: str) -> ModuleType:
+    try:
+        return importlib.import_module(name)
+    except ImportError as exc:
+        raise RuntimeError(f"event codec requires the optional '{name}' package") from exc
+
+
+class EventCodec:
+    def __init__(
+        self,
+        codec: str = "orjson",
+        *,
+        compression: str = "none",
+        compression_threshold_bytes: int = 4096,
+    ):
+        if codec not in SUPPORTED_EVENT_CODECS:
+            raise ValueError(f"unsupported event codec: {codec}")
+        self.codec = codec
+        self._compression = compression
+        self._threshold = compression_threshold_bytes
+        self._module = _optional_module(codec) if codec != "json" else json
+
+    def encode(self, envelope: EventEnvelope) -> EncodedEvent:
+        document = {
+            "schema_version": envelope.schema_version,
+            "event_id": envelope.event_id,
+            "event_type": envelope.event_type,
+            "tenant_id": envelope.tenant_id,
+            "occurred_at": envelope.occurred_at.isoformat(),
+            "payload": envelope.payload,
+        }
+        data = self._dumps(document)
+        attributes = {
+            "event_id": envelope.event_id,
+            "schema_version": str(envelope.schema_version),
+            "content_type": CONTENT_TYPES[self.codec],
+        }
+        if self._compression != "none" and len(data) >= self._threshold:
+            data = compress(data, self._compression)
+            attributes["content_encoding"] = self._compression
+        return EncodedEvent(data=data, attributes=attributes)
+
+    def decode(self, data: bytes, attributes: dict[str, str]) -> EventEnvelope:
+        encoding = attributes.get("content_encoding")
+        if encoding:
+            data = decompress(data, encoding)
+        content_type = attributes.get("content_type")
+        if content_type is None:
+            # Messages published before envelopes existed carry the bare payload.
+            payload = json.loads(data)
+            tenant_id = payload.get("tenant_id")
+            return EventEnvelope(
+                schema_version=0,
+                event_id=attributes.get("event_id") or hashlib.sha256(data).hexdigest(),
+                event_type=attributes.get("event_type", ""),
+                tenant_id=str(tenant_id) if tenant_id is not None else None,
+                occurred_at=datetime.now(timezone.utc),
+                payload=payload,
+            )
+        if content_type == CONTENT_TYPES["msgpack"]:
+            document = _optional_module("msgpack").unpackb(data, raw=False)
+        elif self.codec == "orjson":
+            document = self._module.loads(data)
+        else:
+            document = json.loads(data)
+        if document.get("schema_version", 0) > ENVELOPE_SCHEMA_VERSION:
+            raise ValueError(f"unsupported event schema version: {document['schema_version']}")
+        # Bytes off the wire are validated, so a malformed envelope fails here with a
+        # ValidationError rather than deep inside a handler.
+        return EventEnvelope.model_validate(document)
+
+    def _dumps(self, document: dict[str, Any]) -> bytes:
+        if self.codec == "json":
+            return json.dumps(document, separators=(",", ":")).encode("utf-8")
+        if self.codec == "orjson":
+            return bytes(self._module.dumps(document))
+        return bytes(self._module.packb(document, use_bin_type=True))
+
+
+def get_event_codec(settings: Settings | None = None) -> EventCodec:
+    runtime_settings = settings or get_settings()
+    return EventCodec(
+        runtime_settings.event_codec,
+        compression=runtime_settings.event_compression,
+        compression_threshold_bytes=runtime_settings.event_compression_threshold_bytes,
+    )
@@ -1,56 +1,501 @@
 from __future__ import annotations
 
+import asyncio
 import importlib
-import json
-from dataclasses import dataclass, field
+import inspect
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent import futures
+from dataclasses import dataclass, replace
 from typing import Any, Protocol
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
 
 from libs.common.config import Settings, get_settings
+from libs.common.event_codec import EventCodec, get_event_codec, new_envelope
+from libs.common.logging import configure_logging, log_event
+from libs.common.outbox import OutboxEventBus
+from libs.common.publish_scope import PublishScope, current_publish_scope
+from libs.common.sqlite_queue import SQLiteEventQueue
 
 
 class EventBus(Protocol):
     def publish(
-        self, topic: str, payload: dict[str, Any], attributes: dict[str, str] | None = None
+        self,
+        topic: str,
+        payload: dict[str, Any],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
+        ordering_key: str = "",
+    ) -> None: ...
+
+    def publish_many(
+        self,
+        topic: str,
+        payloads: list[dict[str, Any]],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
     ) -> None: ...
 
+    def flush(self, timeout: float | None = None, *, scope: PublishScope | None = None) -> int: ...
+
+    def metrics(self) -> dict[str, Any]: ...
+
+
+EventHandler = Callable[[dict[str, Any]], Any]
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest")
+ALL_TOPICS = "#"
+
+
+class EventBusFullError(RuntimeError):
+    pass
+
 
-@dataclass
 class InMemoryEventBus:
-    events: list[dict[str, Any]] = field(default_factory=list)
+    def __init__(
+        self,
+        *,
+        capacity: int = 10_000,
+        workers: int = 4,
+        backpressure: str = "block",
+        block_timeout_seconds: float = 5.0,
+    ):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"unsupported backpressure policy: {backpressure}")
+        self._capacity = max(1, capacity)
+        self._workers = max(1, workers)
+        self._backpressure = backpressure
+        self._block_timeout = block_timeout_seconds
+        # Recent events kept for inspection; the ring buffer bounds memory no matter how
+        # long the process runs.
+        self.events: deque[dict[str, Any]] = deque(maxlen=self._capacity)
+        self._queue: deque[tuple[dict[str, Any], list[EventHandler]]] = deque()
+        self._handlers: dict[str, list[EventHandler]] = {}
+        self._in_flight = 0
+        self._counters = {
+            "published": 0,
+            "dispatched": 0,
+            "dropped": 0,
+            "overflowed": 0,
+            "handler_errors": 0,
+        }
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+        self._worker_state = threading.local()
+        self._logger = configure_logging()
+
+    def subscribe(self, topic: str, handler: EventHandler) -> None:
+        with self._condition:
+            self._handlers.setdefault(topic, []).append(handler)
+            if not self._threads:
+                self._start_workers()
+
+    def unsubscribe(self, topic: str, handler: EventHandler) -> None:
+        with self._condition:
+            handlers = self._handlers.get(topic, [])
+            if handler in handlers:
+                handlers.remove(handler)
 
     def publish(
-        self, topic: str, payload: dict[str, Any], attributes: dict[str, str] | None = None
+        self,
+        topic: str,
+        payload: dict[str, Any],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
+        ordering_key: str = "",
     ) -> None:
-        self.events.append(
-            {
-                "topic": topic,
-                "payload": payload,
-                "attributes": attributes or {},
+        event_attributes = attributes or {}
+        # In-process handlers get the payload object itself; only the id is stamped so
+        # consumers can dedupe the same way they do for remote transports.
+        event = {
+            "event_id": event_attributes.get("event_id") or uuid4().hex,
+            "topic": topic,
+            "payload": payload,
+            "attributes": event_attributes,
+        }
+        with self._condition:
+            handlers = self._handlers.get(topic, []) + self._handlers.get(ALL_TOPICS, [])
+            if handlers and len(self._queue) >= self._capacity:
+                if getattr(self._worker_state, "active", False):
+                    # A handler publishing from a worker thread must not wait: if every
+                    # worker blocked here, nothing would drain the queue. The event goes
+                    # over capacity instead, and is counted.
+                    self._counters["overflowed"] += 1
+                else:
+                    self._apply_backpressure()
+            self.events.append(event)
+            self._counters["published"] += 1
+            if handlers:
+                self._queue.append((event, handlers))
+                self._condition.notify()
+
+    def publish_many(
+        self,
+        topic: str,
+        payloads: list[dict[str, Any]],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
+    ) -> None:
+        for payload in payloads:
+            self.publish(topic, payload, attributes)
+
+    def flush(self, timeout: float | None = None, *, scope: PublishScope | None = None) -> int:
+        # Events are handed to the dispatch queue as they are published; there is no
+        # transport round trip to confirm.
+        return 0
+
+    def drain(self, timeout: float | None = None) -> int:
+        with self._condition:
+            self._condition.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+            return len(self._queue) + self._in_flight
+
+    def close(self, timeout: float | None = None) -> None:
+        self.drain(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                **self._counters,
+                "queued": len(self._queue),
+                "in_flight": self._in_flight,
+                "capacity": self._capacity,
+                "backpressure": self._backpressure,
             }
-        )
+
+    def _apply_backpressure(self) -> None:
+        if self._backpressure == "drop_oldest":
+            self._queue.popleft()
+            self._counters["dropped"] += 1
+            return
+        if not self._condition.wait_for(
+            lambda: len(self._queue) < self._capacity or self._closed, self._block_timeout
+        ):
+            raise EventBusFullError(
+                f"event bus queue full ({self._capacity}) for {self._block_timeout}s"
+            )
+
+    def _start_workers(self) -> None:
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"event-bus-worker-{index}", daemon=True)
+            for index in range(self._workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self) -> None:
+        self._worker_state.active = True
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: bool(self._queue) or self._closed)
+                    if not self._queue:
+                        return
+                    event, handlers = self._queue.popleft()
+                    self._in_flight += 1
+                    self._condition.notify_all()
+                try:
+                    for handler in handlers:
+                        self._invoke(handler, event)
+                finally:
+                    with self._condition:
+                        self._in_flight -= 1
+                        self._counters["dispatched"] += 1
+                        self._condition.notify_all()
+        finally:
+            loop: asyncio.AbstractEventLoop | None = getattr(self._worker_state, "loop", None)
+            if loop is not None:
+                loop.close()
+
+    def _invoke(self, handler: EventHandler, event: dict[str, Any]) -> None:
+        try:
+            result = handler(event)
+            if inspect.isawaitable(result):
+                self._event_loop().run_until_complete(result)
+        except Exception as exc:  # noqa: BLE001
+            with self._condition:
+                self._counters["handler_errors"] += 1
+            log_event(
+                self._logger,
+                "event_handler_failed",
+                {"topic": event["topic"], "handler": repr(handler), "error": str(exc)},
+            )
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        loop: asyncio.AbstractEventLoop | None = getattr(self._worker_state, "loop", None)
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._worker_state.loop = loop
+        return loop
+
+
+@dataclass(frozen=True)
+class _OutboundMessage:
+    topic_path: str
+    data: bytes
+    attributes: dict[str, str]
+    enqueued_at: float
+    ordering_key: str = ""
+
+
+@dataclass
+class PublishMetrics:
+    published: int = 0
+    failed: int = 0
+    retried: int = 0
+    dropped: int = 0
+    lag_count: int = 0
+    lag_total_ms: float = 0.0
+    lag_max_ms: float = 0.0
+
+    def record_lag(self, lag_ms: float) -> None:
+        self.lag_count += 1
+        self.lag_total_ms += lag_ms
+        self.lag_max_ms = max(self.lag_max_ms, lag_ms)
 
 
 class GCPPubSubEventBus:
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        publisher: Any = None,
+        codec: EventCodec | None = None,
+        message_ordering: bool = False,
+    ):
         if not settings.gcp_project_id:
             raise RuntimeError("gcp_project_id is required for pubsub backend")
-        pubsub_module = importlib.import_module("google.cloud.pubsub_v1")
-        self._publisher = pubsub_module.PublisherClient()
+        if publisher is None:
+            pubsub_module = importlib.import_module("google.cloud.pubsub_v1")
+            # The client library batches in the background; publish() only enqueues.
+            publisher = pubsub_module.PublisherClient(
+                batch_settings=pubsub_module.types.BatchSettings(
+                    max_messages=settings.pubsub_batch_max_messages,
+                    max_bytes=settings.pubsub_batch_max_bytes,
+                    max_latency=settings.pubsub_batch_max_latency_seconds,
+                ),
+                publisher_options=pubsub_module.types.PublisherOptions(
+                    enable_message_ordering=message_ordering
+                ),
+            )
+        self._publisher = publisher
+        # Ordering keys are only sent by an ordering-enabled publisher; the client rejects
+        # them otherwise.
+        self._message_ordering = message_ordering
+        self._codec = codec or get_event_codec(settings)
         self._project_id = settings.gcp_project_id
         self._prefix = settings.gcp_pubsub_topic_prefix
+        self._flush_timeout = settings.pubsub_flush_timeout_seconds
+        self._pending: dict[futures.Future[Any], _OutboundMessage] = {}
+        self._retry_buffer: deque[_OutboundMessage] = deque()
+        self._retry_buffer_size = max(1, settings.pubsub_retry_buffer_size)
+        self._metrics = PublishMetrics()
+        self._lock = threading.Lock()
+        self._logger = configure_logging()
 
     def publish(
-        self, topic: str, payload: dict[str, Any], attributes: dict[str, str] | None = None
+        self,
+        topic: str,
+        payload: dict[str, Any],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
+        ordering_key: str = "",
+    ) -> None:
+        message = self._message(self._topic_path(topic), topic, payload, attributes)
+        if ordering_key and self._message_ordering:
+            message = replace(message, ordering_key=ordering_key)
+        self._submit(message)
+
+    def publish_many(
+        self,
+        topic: str,
+        payloads: list[dict[str, Any]],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
     ) -> None:
+        topic_path = self._topic_path(topic)
+        for payload in payloads:
+            self._submit(self._message(topic_path, topic, payload, attributes))
+
+    def flush(self, timeout: float | None = None, *, scope: PublishScope | None = None) -> int:
+        deadline = time.perf_counter() + (timeout if timeout is not None else self._flush_timeout)
+        if scope is not None:
+            return self._flush_scope(scope, deadline)
+        with self._lock:
+            pending = list(self._pending)
+        self._wait(pending, deadline)
+        with self._lock:
+            retries = sorted(self._retry_buffer, key=_enqueue_order)
+            self._retry_buffer.clear()
+            self._metrics.retried += len(retries)
+        if retries:
+            for message in retries:
+                self._submit(message)
+            with self._lock:
+                pending = list(self._pending)
+            self._wait(pending, deadline)
+        with self._lock:
+            return len(self._pending) + len(self._retry_buffer)
+
+    def _flush_scope(self, scope: PublishScope, deadline: float) -> int:
+        # Waits only for this scope's messages, so one request never waits on another's,
+        # and retries only its own failures.
+        self._wait(list(scope.pending), deadline)
+        retries: list[_OutboundMessage] = []
+        with self._lock:
+            for future, message in list(scope.pending.items()):
+                if not future.done() or future.exception() is None:
+                    continue
+                if message not in self._retry_buffer:
+                    continue
+                self._retry_buffer.remove(message)
+                del scope.pending[future]
+                retries.append(message)
+            self._metrics.retried += len(retries)
+        if retries:
+            for message in sorted(retries, key=_enqueue_order):
+                self._submit(message, scope)
+            self._wait(list(scope.pending), deadline)
+        return sum(
+            1 for future in scope.pending if not future.done() or future.exception() is not None
+        )
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            snapshot = self._metrics
+            return {
+                "published": snapshot.published,
+                "failed": snapshot.failed,
+                "retried": snapshot.retried,
+                "dropped": snapshot.dropped,
+                "pending": len(self._pending),
+                "retry_buffered": len(self._retry_buffer),
+                "publish_lag_avg_ms": (
+                    round(snapshot.lag_total_ms / snapshot.lag_count, 2)
+                    if snapshot.lag_count
+                    else 0.0
+                ),
+                "publish_lag_max_ms": round(snapshot.lag_max_ms, 2),
+            }
+
+    def _message(
+        self,
+        topic_path: str,
+        topic: str,
+        payload: dict[str, Any],
+        attributes: dict[str, str] | None,
+    ) -> _OutboundMessage:
+        encoded = self._codec.encode(new_envelope(topic, payload, attributes))
+        return _OutboundMessage(
+            topic_path=topic_path,
+            data=encoded.data,
+            attributes={**(attributes or {}), **encoded.attributes},
+            enqueued_at=time.perf_counter(),
+        )
+
+    def _topic_path(self, topic: str) -> str:
         topic_id = f"{self._prefix}-{topic}".replace(".", "-")
-        topic_path = self._publisher.topic_path(self._project_id, topic_id)
-        data = json.dumps(payload).encode("utf-8")
-        future = self._publisher.publish(topic_path, data=data, **(attributes or {}))
-        future.result(timeout=10)
+        return str(self._publisher.topic_path(self._project_id, topic_id))
+
+    def _submit(self, message: _OutboundMessage, scope: PublishScope | None = None) -> None:
+        if message.ordering_key:
+            future = self._publisher.publish(
+                message.topic_path,
+                data=message.data,
+                ordering_key=message.ordering_key,
+                **message.attributes,
+            )
+        else:
+            future = self._publisher.publish(
+                message.topic_path, data=message.data, **message.attributes
+            )
+        with self._lock:
+            self._pending[future] = message
+        scope = scope or current_publish_scope()
+        if scope is not None:
+            scope.pending[future] = message
+        future.add_done_callback(self._on_published)
+
+    def _on_published(self, future: futures.Future[Any]) -> None:
+        # flush() may settle a future before its callback runs; whichever pops it first
+        # records the outcome.
+        with self._lock:
+            message = self._pending.pop(future, None)
+            if message is None:
+                return
+            self._metrics.record_lag((time.perf_counter() - message.enqueued_at) * 1000)
+            error = future.exception()
+            if error is None:
+                self._metrics.published += 1
+                return
+            self._metrics.failed += 1
+            if len(self._retry_buffer) >= self._retry_buffer_size:
+                self._retry_buffer.popleft()
+                self._metrics.dropped += 1
+            self._retry_buffer.append(message)
+        if message.ordering_key:
+            # The client pauses a key after a failed publish; later messages on that key
+            # fail fast until it is resumed, so a retry can go out in order.
+            self._publisher.resume_publish(message.topic_path, message.ordering_key)
+        log_event(
+            self._logger,
+            "pubsub_publish_failed",
+            {"topic_path": message.topic_path, "error": str(error)},
+        )
+
+    def _wait(self, pending: list[futures.Future[Any]], deadline: float) -> None:
+        if not pending:
+            return
+        done, _ = futures.wait(pending, timeout=max(0.0, deadline - time.perf_counter()))
+        for future in done:
+            self._on_published(future)
+
+
+def _enqueue_order(message: _OutboundMessage) -> float:
+    # Retries go out in original publish order, not in the order failures came back.
+    return message.enqueued_at
 
 
 def get_event_bus(settings: Settings | None = None) -> EventBus:
+    runtime_settings = settings or get_settings()
+    if runtime_settings.event_outbox_enabled:
+        return OutboxEventBus()
+    return get_transport_event_bus(runtime_settings)
+
+
+def get_transport_event_bus(
+    settings: Settings | None = None, *, message_ordering: bool = False
+) -> EventBus:
     runtime_settings = settings or get_settings()
     if runtime_settings.event_bus_backend == "pubsub":
-        return GCPPubSubEventBus(runtime_settings)
-    return InMemoryEventBus()
+        return GCPPubSubEventBus(runtime_settings, message_ordering=message_ordering)
+    if runtime_settings.event_bus_backend == "sqlite":
+        return SQLiteEventQueue(
+            runtime_settings.stage_queue_path,
+            visibility_timeout_seconds=runtime_settings.stage_worker_visibility_timeout_seconds,
+            max_attempts=runtime_settings.stage_worker_max_attempts,
+            codec=get_event_codec(runtime_settings),
+        )
+    return InMemoryEventBus(
+        capacity=runtime_settings.event_bus_capacity,
+        workers=runtime_settings.event_bus_workers,
+        backpressure=runtime_settings.event_bus_backpressure,
+        block_timeout_seconds=runtime_settings.event_bus_block_timeout_seconds,
+    )
@@ -11,11 +11,13 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Index,
+    Integer,
     Numeric,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -87,6 +89,7 @@ class DocumentVersion(Base):
     version_number: Mapped[int] = mapped_column(nullable=False)
     storage_uri: Mapped[str] = mapped_column(String(512), nullable=False)
     checksum: Mapped[str] = mapped_column(String(128), nullable=False)
+    storage_encoding: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -309,6 +312,27 @@ class WebhookSubscription(Base):
     secret_ref: Mapped[str] = mapped_column(String(256), nullable=False)
     event_filter: Mapped[str] = mapped_column(String(128), nullable=False)
     active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    batch_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    batch_max_events: Mapped[int] = mapped_column(nullable=False, default=100)
+    batch_max_bytes: Mapped[int] = mapped_column(nullable=False, default=1_000_000)
+    batch_linger_seconds: Mapped[int] = mapped_column(nullable=False, default=5)
+    batch_compression: Mapped[str] = mapped_column(String(16), nullable=False, default="gzip")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class WebhookEventPayload(Base):
+    __tablename__ = "webhook_event_payloads"
+    __table_args__ = (
+        UniqueConstraint(
+            "tenant_id", "event_type", "payload_hash", name="uq_webhook_event_payload_hash"
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(ForeignKey("tenants.id"), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(128), nullable=False)
+    payload_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -316,6 +340,25 @@ class WebhookDelivery(Base):
     __tablename__ = "webhook_deliveries"
     __table_args__ = (
         UniqueConstraint("tenant_id", "idempotency_key", name="uq_webhook_idempotency"),
+        Index(
+            "ix_webhook_deliveries_deliverable",
+            "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'retry_scheduled')"),
+            sqlite_where=text("status IN ('pending', 'retry_scheduled')"),
+        ),
+        Index(
+            "ix_webhook_deliveries_delivered",
+            "delivered_at",
+            postgresql_where=text("status = 'delivered'"),
+            sqlite_where=text("status = 'delivered'"),
+        ),
+        Index(
+            "ix_webhook_deliveries_dead_lettered",
+            "dead_lettered_at",
+            postgresql_where=text("status = 'dead_lettered'"),
+            sqlite_where=text("status = 'dead_lettered'"),
+        ),
+        Index("ix_webhook_deliveries_payload_id", "payload_id"),
     )
 
     id: Mapped[str] = mapped_column(String(64), primary_key=True)
@@ -324,7 +367,10 @@ class WebhookDelivery(Base):
         ForeignKey("webhook_subscriptions.id"), nullable=False
     )
     event_type: Mapped[str] = mapped_column(String(128), nullable=False)
-    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    payload_id: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("webhook_event_payloads.id"), nullable=True
+    )
+    payload: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
     status: Mapped[str] = mapped_column(String(64), nullable=False)
     attempt_count: Mapped[int] = mapped_column(nullable=False, default=0)
     last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -334,10 +380,64 @@ class WebhookDelivery(Base):
     )
     last_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     dead_lettered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     delivered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
+class WebhookDeliveryArchive(Base):
+    __tablename__ = "webhook_deliveries_archive"
+    __table_args__ = (
+        Index("ix_webhook_deliveries_archive_tenant_archived", "tenant_id", "archived_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    subscription_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(128), nullable=False)
+    payload_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    payload: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    # Copy of the shared payload body, which is pruned once no live delivery references it.
+    payload_body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    status: Mapped[str] = mapped_column(String(64), nullable=False)
+    attempt_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    idempotency_key: Mapped[str] = mapped_column(String(128), nullable=False)
+    last_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    dead_lettered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    delivered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class OutboxEvent(Base):
+    __tablename__ = "event_outbox"
+    __table_args__ = (Index("ix_event_outbox_tenant_id", "tenant_id", "id"),)
+
+    # The relay publishes each tenant's rows in id order, i.e. in the order they were
+    # staged. Ids are assigned at insert, so rows of concurrent transactions can commit
+    # out of id order and a late commit may publish after a higher id.
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    tenant_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    topic: Mapped[str] = mapped_column(String(128), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    attributes: Mapped[dict[str, str]] = mapped_column(JSON, nullable=False)
+    attempt_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class ProcessedEvent(Base):
+    __tablename__ = "processed_events"
+
+    consumer: Mapped[str] = mapped_column(String(64), primary_key=True)
+    event_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    processed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+
+
 class AuditEvent(Base):
     __tablename__ = "audit_events"
 
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from libs.common.models import OutboxEvent
+from libs.common.publish_scope import PublishScope
+
+
+class OutboxEventBus:
+    def __init__(self) -> None:
+        self._staged = 0
+        self._lock = threading.Lock()
+
+    def publish(
+        self,
+        topic: str,
+        payload: dict[str, Any],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
+        ordering_key: str = "",
+    ) -> None:
+        self.publish_many(topic, [payload], attributes, db=db)
+
+    def publish_many(
+        self,
+        topic: str,
+        payloads: list[dict[str, Any]],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
+    ) -> None:
+        if db is None:
+            raise RuntimeError("outbox publish requires the caller's database session")
+        # Rows ride on the caller's transaction: they become visible to the relay only
+        # if the business changes commit, and vanish with them on rollback.
+        db.add_all(
+            [
+                OutboxEvent(
+                    tenant_id=_tenant_of(payload),
+                    topic=topic,
+                    payload=payload,
+                    # The id is fixed at staging so relay retries republish the same event
+                    # and consumers can drop the duplicates.
+                    attributes={**(attributes or {}), "event_id": uuid4().hex},
+                    attempt_count=0,
+                )
+                for payload in payloads
+            ]
+        )
+        with self._lock:
+            self._staged += len(payloads)
+
+    def flush(self, timeout: float | None = None, *, scope: PublishScope | None = None) -> int:
+        return 0
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {"backend": "outbox", "staged": self._staged}
+
+
+def _tenant_of(payload: dict[str, Any]) -> str | None:
+    tenant_id = payload.get("tenant_id")
+    return str(tenant_id) if tenant_id is not None else None
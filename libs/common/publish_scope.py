@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from concurrent import futures
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass
+class PublishScope:
+    # Transport futures of the messages published inside the scope, with the message
+    # each one carries so a failed publish can be retried by the same scope.
+    pending: dict[futures.Future[Any], Any] = field(default_factory=dict)
+
+
+_current_scope: ContextVar[Optional[PublishScope]] = ContextVar("publish_scope", default=None)
+
+
+@contextmanager
+def track_publishes() -> Iterator[PublishScope]:
+    # Like track_queries, the scope is shared by reference, so publishes from threadpool
+    # workers spawned in this context land in the same scope.
+    scope = PublishScope()
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_publish_scope() -> Optional[PublishScope]:
+    return _current_scope.get()
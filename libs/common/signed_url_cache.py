@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+Clock = Callable[[], float]
+Signer = Callable[[str, int], str]
+
+
+@dataclass
+class _Inflight:
+    done: threading.Event = field(default_factory=threading.Event)
+    url: Optional[str] = None
+    error: Optional[BaseException] = None
+
+
+# Reuses a signed URL while it still has at least `min_remaining_seconds` of lifetime,
+# so clients never receive a link that expires mid-download. Concurrent misses for the
+# same URI wait on a single signing call instead of each paying for one.
+class SignedUrlCache:
+    def __init__(
+        self,
+        *,
+        expiration_seconds: int = 900,
+        min_remaining_seconds: int = 300,
+        max_entries: int = 10_000,
+        clock: Clock = time.monotonic,
+    ):
+        if min_remaining_seconds >= expiration_seconds:
+            raise ValueError("min_remaining_seconds must be below expiration_seconds")
+        self._expiration = expiration_seconds
+        self._min_remaining = min_remaining_seconds
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._inflight: dict[str, _Inflight] = {}
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expired": 0}
+        self._lock = threading.Lock()
+
+    def get(self, uri: str, sign: Signer) -> str:
+        with self._lock:
+            cached = self._entries.get(uri)
+            if cached is not None:
+                expires_at, url = cached
+                if expires_at - self._clock() >= self._min_remaining:
+                    self._entries.move_to_end(uri)
+                    self._counters["hits"] += 1
+                    return url
+                del self._entries[uri]
+                self._counters["expired"] += 1
+            inflight = self._inflight.get(uri)
+            leader = inflight is None
+            if inflight is None:
+                inflight = self._inflight[uri] = _Inflight()
+                self._counters["misses"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            inflight.done.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return str(inflight.url)
+
+        try:
+            signed_at = self._clock()
+            url = sign(uri, self._expiration)
+            inflight.url = url
+            with self._lock:
+                self._entries[uri] = (signed_at + self._expiration, url)
+                self._entries.move_to_end(uri)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+            return url
+        except BaseException as exc:
+            inflight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(uri, None)
+            inflight.done.set()
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"] + self._counters["coalesced"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "hit_ratio": (
+                    round((self._counters["hits"] + self._counters["coalesced"]) / lookups, 4)
+                    if lookups
+                    else 0.0
+                ),
+            }
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from libs.common.logging import log_event
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|(?<!:):\w+|%s|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES\s*\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    # Literals and driver-specific placeholders become ?, and IN lists and multi-row
+    # VALUES collapse, so one query shape gives one fingerprint at any batch size.
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?...)", normalized)
+    normalized = _VALUES_LIST.sub(r"\1, ...", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def sql_fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class QueryStats:
+    scope: str = ""
+    statements: int = 0
+    db_time_ms: float = 0.0
+    # Enclosing scope, so statements of a nested scope still count towards it.
+    parent: Optional[QueryStats] = field(default=None, repr=False)
+
+    def record(self, duration_ms: float) -> None:
+        self.statements += 1
+        self.db_time_ms += duration_ms
+        if self.parent is not None:
+            self.parent.record(duration_ms)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+@contextmanager
+def track_queries(scope: str) -> Iterator[QueryStats]:
+    # Stats are shared by reference, so statements run in threadpool workers or async
+    # greenlets spawned from this context count towards the same scope.
+    stats = QueryStats(scope=scope, parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._per_scope: dict[str, dict[str, float]] = {}
+        self._slow_queries = 0
+
+    def record(self, stats: QueryStats) -> None:
+        with self._lock:
+            totals = self._per_scope.setdefault(
+                stats.scope,
+                {"scopes": 0, "statements": 0, "max_statements": 0, "db_time_ms": 0.0},
+            )
+            totals["scopes"] += 1
+            totals["statements"] += stats.statements
+            totals["max_statements"] = max(totals["max_statements"], stats.statements)
+            totals["db_time_ms"] += stats.db_time_ms
+
+    def record_slow_query(self) -> None:
+        with self._lock:
+            self._slow_queries += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            per_scope = {
+                scope: {
+                    "scopes": int(totals["scopes"]),
+                    "avg_statements": round(totals["statements"] / totals["scopes"], 2),
+                    "max_statements": int(totals["max_statements"]),
+                    "avg_db_time_ms": round(totals["db_time_ms"] / totals["scopes"], 2),
+                }
+                for scope, totals in self._per_scope.items()
+            }
+            return {"slow_queries": self._slow_queries, "per_scope": per_scope}
+
+
+query_metrics = QueryMetrics()
+
+
+@contextmanager
+def recorded_queries(scope: str) -> Iterator[QueryStats]:
+    # track_queries for a unit of work that reports into query_metrics when it ends.
+    with track_queries(scope) as stats:
+        try:
+            yield stats
+        finally:
+            query_metrics.record(stats)
+
+
+def install_query_instrumentation(
+    engine: Engine, *, slow_query_ms: float, logger: logging.Logger
+) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(
+        conn: Any, _cursor: Any, _statement: str, _parameters: Any, _context: Any, _many: bool
+    ) -> None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(
+        conn: Any, _cursor: Any, statement: str, _parameters: Any, _context: Any, many: bool
+    ) -> None:
+        duration_ms = (time.perf_counter() - conn.info["query_started_at"].pop()) * 1000
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(duration_ms)
+        if slow_query_ms <= 0 or duration_ms < slow_query_ms:
+            return
+        query_metrics.record_slow_query()
+        normalized = normalize_sql(statement)
+        log_event(
+            logger,
+            "slow_query",
+            {
+                "fingerprint": sql_fingerprint(normalized),
+                "sql": normalized,
+                "duration_ms": round(duration_ms, 2),
+                "executemany": many,
+                "scope": stats.scope if stats is not None else "",
+            },
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context: Any) -> None:
+        # after_cursor_execute never fires for a failed statement.
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from libs.common.event_codec import EventCodec, new_envelope
+from libs.common.logging import configure_logging, log_event
+from libs.common.publish_scope import PublishScope
+
+
+@dataclass(frozen=True)
+class ConsumedEvent:
+    message_id: str
+    topic: str
+    payload: dict[str, Any]
+    attributes: dict[str, str]
+    delivery_attempt: int
+    event_id: str = ""
+
+
+# Local stand-in for Pub/Sub: producers publish into a SQLite file and stage workers in
+# other processes claim messages with a visibility timeout, ack them, or nack for retry.
+# Stage workers share the default subscription; a named subscription (for example the
+# webhook bridge) receives its own copy of every message on the topics it registered.
+class SQLiteEventQueue:
+    def __init__(
+        self,
+        path: str,
+        *,
+        visibility_timeout_seconds: float = 300.0,
+        max_attempts: int = 5,
+        codec: EventCodec | None = None,
+        subscription: str = "",
+        topics: Sequence[str] = (),
+    ):
+        self._path = path
+        self._subscription = subscription
+        self._codec = codec or EventCodec()
+        self._visibility_timeout = visibility_timeout_seconds
+        self._max_attempts = max(1, max_attempts)
+        self._published = 0
+        self._lock = threading.Lock()
+        self._logger = configure_logging()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stage_events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, topic TEXT NOT NULL, "
+                "payload BLOB NOT NULL, attributes TEXT NOT NULL, "
+                "visible_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "dead INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(stage_events)")}
+            if "subscription" not in columns:
+                conn.execute(
+                    "ALTER TABLE stage_events ADD COLUMN subscription TEXT NOT NULL DEFAULT ''"
+                )
+            conn.execute("DROP INDEX IF EXISTS ix_stage_events_ready")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_stage_events_subscription_ready "
+                "ON stage_events (subscription, topic, visible_at) WHERE dead = 0"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stage_subscriptions ("
+                "name TEXT NOT NULL, topic TEXT NOT NULL, PRIMARY KEY (name, topic))"
+            )
+            if subscription:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO stage_subscriptions (name, topic) VALUES (?, ?)",
+                    [(subscription, topic) for topic in topics],
+                )
+
+    def publish(
+        self,
+        topic: str,
+        payload: dict[str, Any],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
+        ordering_key: str = "",
+    ) -> None:
+        self.publish_many(topic, [payload], attributes, db=db)
+
+    def publish_many(
+        self,
+        topic: str,
+        payloads: list[dict[str, Any]],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
+    ) -> None:
+        now = time.time()
+        encoded_rows = []
+        for payload in payloads:
+            encoded = self._codec.encode(new_envelope(topic, payload, attributes))
+            encoded_rows.append(
+                (encoded.data, json.dumps({**(attributes or {}), **encoded.attributes}))
+            )
+        with self._connect() as conn:
+            # Take the write lock before reading subscriptions; upgrading a read snapshot
+            # to a write fails immediately under WAL if another writer got in between.
+            conn.execute("BEGIN IMMEDIATE")
+            subscriptions = [""] + [
+                name
+                for (name,) in conn.execute(
+                    "SELECT name FROM stage_subscriptions WHERE topic = ?", (topic,)
+                )
+            ]
+            conn.executemany(
+                "INSERT INTO stage_events (subscription, topic, payload, attributes, visible_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (subscription, topic, data, encoded_attributes, now)
+                    for subscription in subscriptions
+                    for data, encoded_attributes in encoded_rows
+                ],
+            )
+        with self._lock:
+            self._published += len(payloads)
+
+    def flush(self, timeout: float | None = None, *, scope: PublishScope | None = None) -> int:
+        return 0
+
+    def metrics(self) -> dict[str, Any]:
+        with self._connect() as conn:
+            ready, dead = conn.execute(
+                "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead = 1), 0) FROM stage_events"
+            ).fetchone()
+        with self._lock:
+            return {"published": self._published, "queued": ready, "dead_lettered": dead}
+
+    def receive(self, topics: Sequence[str], max_messages: int) -> list[ConsumedEvent]:
+        if max_messages <= 0 or not topics:
+            return []
+        now = time.time()
+        placeholders = ",".join("?" for _ in topics)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # A claim that timed out on its last attempt (the worker died before acking or
+            # nacking) is dead-lettered here; otherwise it would sit at the head forever.
+            conn.execute(
+                "UPDATE stage_events SET dead = 1 WHERE subscription = ? AND dead = 0 "
+                "AND visible_at <= ? AND attempts >= ?",
+                (self._subscription, now, self._max_attempts),
+            )
+            rows = conn.execute(
+                "SELECT id, topic, payload, attributes, attempts FROM stage_events "
+                "WHERE subscription = ? AND dead = 0 AND visible_at <= ? "
+                f"AND topic IN ({placeholders}) ORDER BY id LIMIT ?",
+                (self._subscription, now, *topics, max_messages),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE stage_events SET visible_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(now + self._visibility_timeout, row[0]) for row in rows],
+            )
+        events = []
+        for row_id, topic, data, encoded_attributes, attempts in rows:
+            try:
+                attributes = json.loads(encoded_attributes)
+                # Rows written before envelopes were introduced hold JSON text.
+                raw = data.encode("utf-8") if isinstance(data, str) else data
+                envelope = self._codec.decode(raw, attributes)
+            except Exception as exc:  # noqa: BLE001
+                # Nack instead of raising so one bad row cannot stall the subscription;
+                # it is dead-lettered once its attempts run out.
+                log_event(
+                    self._logger,
+                    "stage_event_undecodable",
+                    {"message_id": row_id, "topic": topic, "error": str(exc)},
+                )
+                self.nack([str(row_id)], delay_seconds=min(2 ** (attempts + 1), 60))
+                continue
+            events.append(
+                ConsumedEvent(
+                    message_id=str(row_id),
+                    topic=topic,
+                    payload=envelope.payload,
+                    attributes=attributes,
+                    delivery_attempt=attempts + 1,
+                    event_id=envelope.event_id,
+                )
+            )
+        return events
+
+    def ack(self, message_ids: Sequence[str]) -> None:
+        if not message_ids:
+            return
+        with self._connect() as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "DELETE FROM stage_events WHERE id = ?",
+                [(int(message_id),) for message_id in message_ids],
+            )
+
+    def nack(self, message_ids: Sequence[str], *, delay_seconds: float = 0.0) -> None:
+        if not message_ids:
+            return
+        with self._connect() as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "UPDATE stage_events SET visible_at = ?, dead = (attempts >= ?) WHERE id = ?",
+                [
+                    (time.time() + delay_seconds, self._max_attempts, int(message_id))
+                    for message_id in message_ids
+                ],
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
@@ -1,11 +1,41 @@
 from __future__ import annotations
 
+import fcntl
+import hashlib
 import importlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Protocol
+from typing import Any, BinaryIO, Optional, Protocol, Union
 
 from libs.common.config import Settings, get_settings
+from libs.common.signed_url_cache import SignedUrlCache
+
+ProgressCallback = Callable[[int], None]
+UploadSource = Union[bytes, bytearray, memoryview, BinaryIO, Iterable[bytes]]
+
+# GCS resumable uploads require chunk sizes in multiples of 256 KiB.
+GCS_CHUNK_ALIGNMENT = 256 * 1024
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+GCS_GENERATION_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class UploadResult:
+    uri: str
+    size_bytes: int
+    sha256: str
+    # Set when the stored bytes are framed by CompressingStorageProvider; callers record it
+    # next to the URI and pass it back as encoding= on reads.
+    storage_encoding: Optional[str] = None
 
 
 class StorageProvider(Protocol):
@@ -13,33 +43,284 @@ class StorageProvider(Protocol):
         self, tenant_id: str, object_name: str, content: bytes, content_type: str
     ) -> str: ...
 
+    def upload_stream(
+        self,
+        tenant_id: str,
+        object_name: str,
+        source: UploadSource,
+        content_type: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+    ) -> UploadResult: ...
+
+    def open_read(
+        self,
+        uri: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> BinaryIO: ...
+
+    def object_size(
+        self, uri: str, *, checksum: Optional[str] = None, encoding: Optional[str] = None
+    ) -> int: ...
+
+    def iter_range(
+        self,
+        uri: str,
+        start: int,
+        end: int,
+        *,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> Iterator[bytes]: ...
+
     def generate_signed_url(self, uri: str) -> str: ...
 
+    def metrics(self) -> dict[str, Any]: ...
+
+
+class _ChecksumTracker:
+    def __init__(self, progress: Optional[ProgressCallback]):
+        self._sha256 = hashlib.sha256()
+        self._progress = progress
+        self.size_bytes = 0
+
+    def update(self, chunk: bytes | memoryview) -> None:
+        self._sha256.update(chunk)
+        self.size_bytes += len(chunk)
+        if self._progress is not None:
+            self._progress(self.size_bytes)
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+def iter_chunks(source: UploadSource, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[memoryview]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset : offset + chunk_size]
+        return
+    readinto = getattr(source, "readinto", None)
+    if readinto is None:
+        for chunk in source:
+            yield memoryview(chunk)
+        return
+    # One reusable buffer: each yielded view is only valid until the next iteration,
+    # which is all a write-then-hash consumer needs.
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        read = readinto(view)
+        if not read:
+            return
+        yield view[:read]
+
+
+class _ProgressReader(io.RawIOBase):
+    def __init__(self, raw: BinaryIO, progress: ProgressCallback):
+        self._raw = raw
+        self._progress = progress
+        self._transferred = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        read = self._raw.readinto(buffer)  # type: ignore[attr-defined]
+        if read:
+            self._transferred += read
+            self._progress(self._transferred)
+        return int(read or 0)
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+def with_progress(raw: BinaryIO, progress: Optional[ProgressCallback]) -> BinaryIO:
+    if progress is None:
+        return raw
+    return io.BufferedReader(_ProgressReader(raw, progress))
+
+
+def mmap_range(path: Path, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+    return mmap_handle_range(path.open("rb"), start, end, chunk_size)
+
+
+def mmap_handle_range(
+    handle: BinaryIO, start: int, end: int, chunk_size: int
+) -> Iterator[bytes]:
+    # ASGI servers here expose no sendfile hook, so ranges are served from an mmap. Each
+    # slice still copies its pages once into the bytes object the server sends; what the
+    # mmap saves is a read() syscall and a Python-side buffer per chunk.
+    # The handle is owned, and closed, by the iterator.
+    with handle:
+        if end < start:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(start, end + 1, chunk_size):
+                yield mapped[offset : min(offset + chunk_size, end + 1)]
+
 
+def _shard_path(base: Path, digest: str) -> Path:
+    return base / digest[:2] / digest[2:4] / digest
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        pass
+    except OSError:
+        # Filesystems without hardlinks still get an atomic, deduplicated-per-path copy.
+        with tempfile.NamedTemporaryFile(dir=destination.parent, delete=False) as handle:
+            temp_path = Path(handle.name)
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, destination)
+
+
+# Content-addressed layout: objects/ab/cd/<sha256> holds each distinct blob once, and
+# tenants/<tenant>/ab/cd/<sha256> is a hardlink to it, so a blob's link count is one
+# more than the number of tenants referencing it. Two shard levels keep every directory
+# small, and tenants get their own subtree so no tenant id can collide with objects/ or
+# .tmp/. Uploads publish and link under a shared flock on .gc.lock and garbage
+# collection unlinks under an exclusive one, so a blob cannot be collected between an
+# upload finding it and linking it.
 @dataclass
 class LocalStorageProvider:
     root_path: Path
+    chunk_size: int = DEFAULT_CHUNK_SIZE
 
     def upload_raw(
         self, tenant_id: str, object_name: str, content: bytes, content_type: str
     ) -> str:
-        _ = content_type
-        destination = self.root_path / tenant_id / object_name
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        destination.write_bytes(content)
-        return f"file://{destination}"
+        return self.upload_stream(tenant_id, object_name, content, content_type).uri
+
+    def upload_stream(
+        self,
+        tenant_id: str,
+        object_name: str,
+        source: UploadSource,
+        content_type: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+    ) -> UploadResult:
+        _ = (object_name, content_type)
+        temp_dir = self.root_path / ".tmp"
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        tracker = _ChecksumTracker(progress)
+        with tempfile.NamedTemporaryFile(dir=temp_dir, delete=False) as handle:
+            temp_path = Path(handle.name)
+            try:
+                for chunk in iter_chunks(source, self.chunk_size):
+                    handle.write(chunk)
+                    tracker.update(chunk)
+                handle.flush()
+                os.fsync(handle.fileno())
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+
+        digest = tracker.hexdigest()
+        blob_path = _shard_path(self.root_path / "objects", digest)
+        tenant_path = _shard_path(self.root_path / "tenants" / tenant_id, digest)
+        try:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            tenant_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._gc_lock(fcntl.LOCK_SH):
+                if blob_path.exists():
+                    temp_path.unlink()
+                else:
+                    # Rename is atomic: readers see the whole blob or nothing, and a racing
+                    # writer of the same content simply replaces it with identical bytes.
+                    os.replace(temp_path, blob_path)
+                _link_or_copy(blob_path, tenant_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        return UploadResult(
+            uri=f"file://{tenant_path}", size_bytes=tracker.size_bytes, sha256=digest
+        )
+
+    def collect_garbage(self) -> int:
+        # Blobs whose only remaining link is the objects/ entry have no tenant references.
+        # The exclusive lock is taken per blob so uploads only ever wait for one unlink.
+        removed = 0
+        for blob_path in (self.root_path / "objects").glob("*/*/*"):
+            with self._gc_lock(fcntl.LOCK_EX):
+                if blob_path.stat().st_nlink == 1:
+                    blob_path.unlink()
+                    removed += 1
+        return removed
+
+    @contextmanager
+    def _gc_lock(self, operation: int) -> Iterator[None]:
+        self.root_path.mkdir(parents=True, exist_ok=True)
+        with (self.root_path / ".gc.lock").open("a") as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def open_read(
+        self,
+        uri: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> BinaryIO:
+        _ = (checksum, encoding)
+        return with_progress(_local_path(uri).open("rb"), progress)
+
+    def object_size(
+        self, uri: str, *, checksum: Optional[str] = None, encoding: Optional[str] = None
+    ) -> int:
+        _ = (checksum, encoding)
+        return _local_path(uri).stat().st_size
+
+    def iter_range(
+        self,
+        uri: str,
+        start: int,
+        end: int,
+        *,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        _ = (checksum, encoding)
+        return mmap_range(_local_path(uri), start, end, self.chunk_size)
 
     def generate_signed_url(self, uri: str) -> str:
         return uri
 
+    def metrics(self) -> dict[str, Any]:
+        return {"backend": "local"}
+
 
 class GCSStorageProvider:
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, *, client: Any = None):
         if not settings.gcs_raw_bucket:
             raise RuntimeError("gcs_raw_bucket must be configured for GCS backend")
         self._bucket_name = settings.gcs_raw_bucket
-        storage_module = importlib.import_module("google.cloud.storage")
-        self._client = storage_module.Client(project=settings.gcp_project_id or None)
+        if client is None:
+            storage_module = importlib.import_module("google.cloud.storage")
+            client = storage_module.Client(project=settings.gcp_project_id or None)
+        self._client = client
+        aligned = settings.storage_chunk_size_bytes // GCS_CHUNK_ALIGNMENT * GCS_CHUNK_ALIGNMENT
+        self._chunk_size = max(GCS_CHUNK_ALIGNMENT, aligned)
+        self._signed_urls = SignedUrlCache(
+            expiration_seconds=settings.signed_url_expiration_seconds,
+            min_remaining_seconds=settings.signed_url_min_remaining_seconds,
+            max_entries=settings.signed_url_cache_size,
+        )
+        # Generation seen by the last object_size per URI, so the ranged reads that follow
+        # serve the same object the size (and Content-Length) came from.
+        self._generations: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
 
     def upload_raw(
         self, tenant_id: str, object_name: str, content: bytes, content_type: str
@@ -50,18 +331,154 @@ class GCSStorageProvider:
         blob.upload_from_string(content, content_type=content_type)
         return f"gs://{self._bucket_name}/{blob_name}"
 
+    def upload_stream(
+        self,
+        tenant_id: str,
+        object_name: str,
+        source: UploadSource,
+        content_type: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+    ) -> UploadResult:
+        blob_name = f"{tenant_id}/{object_name}"
+        blob = self._client.bucket(self._bucket_name).blob(blob_name, chunk_size=self._chunk_size)
+        tracker = _ChecksumTracker(progress)
+        # BlobWriter drives a resumable upload session, sending one chunk at a time, so
+        # memory stays at roughly one chunk however large the object is.
+        with blob.open("wb", content_type=content_type, chunk_size=self._chunk_size) as writer:
+            for chunk in iter_chunks(source, self._chunk_size):
+                writer.write(chunk)
+                tracker.update(chunk)
+        return UploadResult(
+            uri=f"gs://{self._bucket_name}/{blob_name}",
+            size_bytes=tracker.size_bytes,
+            sha256=tracker.hexdigest(),
+        )
+
+    def open_read(
+        self,
+        uri: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> BinaryIO:
+        _ = (checksum, encoding)
+        bucket_name, object_name = _split_gcs_uri(uri)
+        blob = self._client.bucket(bucket_name).blob(object_name)
+        reader = blob.open("rb", chunk_size=self._chunk_size)
+        return with_progress(reader, progress)
+
+    def object_size(
+        self, uri: str, *, checksum: Optional[str] = None, encoding: Optional[str] = None
+    ) -> int:
+        _ = (checksum, encoding)
+        return self._stat(uri)[0]
+
+    def iter_range(
+        self,
+        uri: str,
+        start: int,
+        end: int,
+        *,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        _ = (checksum, encoding)
+        bucket_name, object_name = _split_gcs_uri(uri)
+        with self._lock:
+            generation = self._generations.get(uri)
+        if generation is None:
+            generation = self._stat(uri)[1]
+        blob = self._client.bucket(bucket_name).blob(object_name)
+        # One ranged GET per chunk keeps memory flat and lets a cancelled response stop
+        # fetching; GCS range ends are inclusive, like HTTP's. Every chunk is pinned to one
+        # generation, so an overwrite mid-stream fails the read instead of splicing bytes
+        # from two objects.
+        for offset in range(start, end + 1, self._chunk_size):
+            yield bytes(
+                blob.download_as_bytes(
+                    start=offset,
+                    end=min(offset + self._chunk_size, end + 1) - 1,
+                    if_generation_match=generation,
+                )
+            )
+
     def generate_signed_url(self, uri: str) -> str:
-        if not uri.startswith("gs://"):
-            raise ValueError("uri must start with gs://")
-        _, remainder = uri.split("gs://", 1)
-        bucket_name, object_name = remainder.split("/", 1)
+        return self._signed_urls.get(uri, self._sign)
+
+    def metrics(self) -> dict[str, Any]:
+        return {"backend": "gcs", "signed_url_cache": self._signed_urls.metrics()}
+
+    def _stat(self, uri: str) -> tuple[int, int]:
+        bucket_name, object_name = _split_gcs_uri(uri)
+        blob = self._client.bucket(bucket_name).get_blob(object_name)
+        if blob is None:
+            raise FileNotFoundError(uri)
+        generation = int(blob.generation)
+        with self._lock:
+            self._generations[uri] = generation
+            self._generations.move_to_end(uri)
+            while len(self._generations) > GCS_GENERATION_CACHE_SIZE:
+                self._generations.popitem(last=False)
+        return int(blob.size), generation
+
+    def _sign(self, uri: str, expiration_seconds: int) -> str:
+        bucket_name, object_name = _split_gcs_uri(uri)
         bucket = self._client.bucket(bucket_name)
         blob = bucket.blob(object_name)
-        return str(blob.generate_signed_url(version="v4", expiration=900, method="GET"))
+        return str(
+            blob.generate_signed_url(version="v4", expiration=expiration_seconds, method="GET")
+        )
+
+
+def _local_path(uri: str) -> Path:
+    if not uri.startswith("file://"):
+        raise ValueError("uri must start with file://")
+    return Path(uri[len("file://") :])
+
+
+def _split_gcs_uri(uri: str) -> tuple[str, str]:
+    if not uri.startswith("gs://"):
+        raise ValueError("uri must start with gs://")
+    _, remainder = uri.split("gs://", 1)
+    bucket_name, object_name = remainder.split("/", 1)
+    return bucket_name, object_name
 
 
 def get_storage_provider(settings: Settings | None = None) -> StorageProvider:
     runtime_settings = settings or get_settings()
+    provider: StorageProvider
     if runtime_settings.storage_backend == "gcs":
-        return GCSStorageProvider(runtime_settings)
-    return LocalStorageProvider(root_path=Path(runtime_settings.storage_local_root))
+        provider = GCSStorageProvider(runtime_settings)
+    else:
+        provider = LocalStorageProvider(
+            root_path=Path(runtime_settings.storage_local_root),
+            chunk_size=runtime_settings.storage_chunk_size_bytes,
+        )
+    if runtime_settings.storage_compression_enabled:
+        from libs.common.storage_compression import CompressingStorageProvider, load_dictionary
+
+        provider = CompressingStorageProvider(
+            provider,
+            codec=runtime_settings.storage_compression_codec,
+            content_types=[
+                content_type.strip()
+                for content_type in runtime_settings.storage_compression_content_types.split(",")
+                if content_type.strip()
+            ],
+            level=runtime_settings.storage_compression_level,
+            dictionary=load_dictionary(runtime_settings.storage_zstd_dictionary_path),
+            dictionary_max_object_bytes=runtime_settings.storage_zstd_dictionary_max_object_bytes,
+            chunk_size=runtime_settings.storage_chunk_size_bytes,
+        )
+    if runtime_settings.storage_backend == "gcs" and runtime_settings.storage_cache_enabled:
+        from libs.common.storage_cache import CachingStorageProvider
+
+        # The cache sits outermost so it holds decompressed bytes keyed by their checksum.
+        provider = CachingStorageProvider(
+            provider,
+            Path(runtime_settings.storage_cache_dir),
+            max_bytes=runtime_settings.storage_cache_max_bytes,
+        )
+    return provider
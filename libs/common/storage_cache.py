@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import tempfile
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+from libs.common.storage import (
+    DEFAULT_CHUNK_SIZE,
+    ProgressCallback,
+    StorageProvider,
+    UploadResult,
+    UploadSource,
+    iter_chunks,
+    mmap_handle_range,
+    with_progress,
+)
+
+
+class ChecksumMismatchError(RuntimeError):
+    pass
+
+
+# Read-through cache on local disk in front of a remote StorageProvider. Entries are
+# keyed by URI and content checksum, filled under a per-entry flock so concurrent
+# processes on one node download an object once, and published with an atomic rename
+# so readers never see a partial file. Reads get an open handle, never a path, so an
+# eviction after the lookup cannot pull the file away. Recency is the file mtime, which
+# every process can see; eviction removes the least recently used entries that nobody
+# holds the entry lock for, until under max_bytes.
+class CachingStorageProvider:
+    def __init__(
+        self,
+        inner: StorageProvider,
+        cache_dir: Path,
+        *,
+        max_bytes: int = 2 * 1024 * 1024 * 1024,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self._inner = inner
+        self._data_dir = cache_dir / "data"
+        self._lock_dir = cache_dir / "locks"
+        self._tmp_dir = cache_dir / "tmp"
+        for directory in (self._data_dir, self._lock_dir, self._tmp_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._evict_lock_path = cache_dir / "evict.lock"
+        self._max_bytes = max_bytes
+        self._chunk_size = chunk_size
+        self._counters = {"hits": 0, "misses": 0, "bypassed": 0, "evictions": 0, "evicted_bytes": 0}
+        self._lock = threading.Lock()
+        # Other processes fill and evict too, so this drifts until the next eviction pass
+        # resets it from the directory scan it already does.
+        self._bytes_cached = sum(size for _, size, _ in self._scan())
+
+    def upload_raw(
+        self, tenant_id: str, object_name: str, content: bytes, content_type: str
+    ) -> str:
+        return self._inner.upload_raw(tenant_id, object_name, content, content_type)
+
+    def upload_stream(
+        self,
+        tenant_id: str,
+        object_name: str,
+        source: UploadSource,
+        content_type: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+    ) -> UploadResult:
+        return self._inner.upload_stream(
+            tenant_id, object_name, source, content_type, progress=progress
+        )
+
+    def open_read(
+        self,
+        uri: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> BinaryIO:
+        handle = self._open_cached(uri, checksum, encoding)
+        if handle is None:
+            return self._inner.open_read(
+                uri, progress=progress, checksum=checksum, encoding=encoding
+            )
+        return with_progress(handle, progress)
+
+    def object_size(
+        self, uri: str, *, checksum: Optional[str] = None, encoding: Optional[str] = None
+    ) -> int:
+        path = self._entry_path(uri, checksum)
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return self._inner.object_size(uri, checksum=checksum, encoding=encoding)
+
+    def iter_range(
+        self,
+        uri: str,
+        start: int,
+        end: int,
+        *,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        handle = self._open_cached(uri, checksum, encoding)
+        if handle is None:
+            return self._inner.iter_range(uri, start, end, checksum=checksum, encoding=encoding)
+        return mmap_handle_range(handle, start, end, self._chunk_size)
+
+    def generate_signed_url(self, uri: str) -> str:
+        return self._inner.generate_signed_url(uri)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            bytes_cached = self._bytes_cached
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **self._inner.metrics(),
+            "disk_cache": {
+                **counters,
+                "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+                "bytes_cached": bytes_cached,
+                "max_bytes": self._max_bytes,
+            },
+        }
+
+    def _entry_path(self, uri: str, checksum: Optional[str]) -> Path:
+        key = hashlib.sha256(f"{uri}\n{checksum or ''}".encode()).hexdigest()
+        return self._data_dir / key[:2] / key
+
+    def _open_cached(
+        self, uri: str, checksum: Optional[str], encoding: Optional[str]
+    ) -> Optional[BinaryIO]:
+        path = self._entry_path(uri, checksum)
+        handle = self._open_entry(path)
+        if handle is not None:
+            self._count("hits")
+            return handle
+        with self._entry_lock(path.name):
+            # Another process may have filled the entry while this one waited.
+            handle = self._open_entry(path)
+            if handle is not None:
+                self._count("hits")
+                return handle
+            self._count("misses")
+            if self._inner.object_size(uri, checksum=checksum, encoding=encoding) > self._max_bytes:
+                self._count("bypassed")
+                return None
+            size = self._fill(uri, checksum, encoding, path)
+            # Opened before the lock is released; eviction skips locked entries.
+            handle = path.open("rb")
+        with self._lock:
+            self._bytes_cached += size
+        self._evict()
+        return handle
+
+    def _fill(
+        self, uri: str, checksum: Optional[str], encoding: Optional[str], path: Path
+    ) -> int:
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=self._tmp_dir, delete=False) as handle:
+            temp_path = Path(handle.name)
+            try:
+                with self._inner.open_read(uri, checksum=checksum, encoding=encoding) as source:
+                    for chunk in iter_chunks(source, self._chunk_size):
+                        handle.write(chunk)
+                        digest.update(chunk)
+                if checksum and digest.hexdigest() != checksum:
+                    raise ChecksumMismatchError(f"checksum mismatch for {uri}")
+                path.parent.mkdir(parents=True, exist_ok=True)
+                size = handle.tell()
+                os.replace(temp_path, path)
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+        return size
+
+    def _evict(self) -> None:
+        with self._evict_lock_path.open("a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # another process is already evicting
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries, key=lambda item: item[0]):
+                if total <= self._max_bytes:
+                    break
+                # Lock files stay: a waiter may already hold the old inode, and unlinking
+                # it would let the next process lock a fresh file alongside it.
+                if not self._unlink_unlocked(entry):
+                    continue  # being filled or opened right now
+                total -= size
+                with self._lock:
+                    self._counters["evictions"] += 1
+                    self._counters["evicted_bytes"] += size
+            with self._lock:
+                self._bytes_cached = total
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for entry in self._data_dir.glob("*/*"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # evicted by another process mid-scan
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        return entries
+
+    @contextmanager
+    def _entry_lock(self, key: str) -> Iterator[None]:
+        with (self._lock_dir / f"{key}.lock").open("a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _unlink_unlocked(self, entry: Path) -> bool:
+        with (self._lock_dir / f"{entry.name}.lock").open("a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                # Unlinking is safe for readers that already hold the file open.
+                entry.unlink(missing_ok=True)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return True
+
+    def _open_entry(self, path: Path) -> Optional[BinaryIO]:
+        try:
+            handle = path.open("rb")
+        except FileNotFoundError:
+            return None
+        os.utime(handle.fileno())
+        return handle
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+from libs.common.compression import (
+    CompressionUnavailableError,
+    codec_available,
+    stream_compressor,
+    stream_decompressor,
+    zstd_dictionary_id,
+)
+from libs.common.storage import (
+    DEFAULT_CHUNK_SIZE,
+    ProgressCallback,
+    StorageProvider,
+    UploadResult,
+    UploadSource,
+    iter_chunks,
+    with_progress,
+)
+
+# Compressed objects are framed as: header (magic, codec id, zstd dictionary id), the
+# compressed stream, then a trailer (uncompressed length, magic). The trailer lets
+# object_size answer without decompressing. Whether an object is framed is never sniffed
+# from its bytes: uploads report the codec as UploadResult.storage_encoding, callers
+# store it, and reads without encoding= return the stored bytes as-is.
+MAGIC = b"NXO1"
+HEADER = struct.Struct(">4sBI")
+TRAILER = struct.Struct(">Q4s")
+CODEC_IDS = {"gzip": 1, "zstd": 2}
+CODECS_BY_ID = {codec_id: codec for codec, codec_id in CODEC_IDS.items()}
+FRAME_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class _ObjectFrame:
+    codec: str
+    dictionary_id: int
+    stored_size: int
+    uncompressed_size: int
+
+
+class _IteratorReader(io.RawIOBase):
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class CompressingStorageProvider:
+    def __init__(
+        self,
+        inner: StorageProvider,
+        *,
+        codec: str = "zstd",
+        content_types: Sequence[str] = (),
+        level: Optional[int] = None,
+        dictionary: Optional[bytes] = None,
+        dictionary_content_types: Sequence[str] = ("application/json",),
+        dictionary_max_object_bytes: int = 16 * 1024,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        if codec not in CODEC_IDS:
+            raise ValueError(f"unsupported storage compression codec: {codec}")
+        if not codec_available(codec):
+            raise CompressionUnavailableError(f"{codec} compression is not installed")
+        if dictionary and codec != "zstd":
+            raise ValueError("compression dictionaries require the zstd codec")
+        self._inner = inner
+        self._codec = codec
+        self._content_types = frozenset(content_types)
+        self._level = level
+        self._dictionary = dictionary
+        self._dictionary_id = zstd_dictionary_id(dictionary) if dictionary else 0
+        self._dictionary_content_types = frozenset(dictionary_content_types)
+        self._dictionary_max_object_bytes = dictionary_max_object_bytes
+        self._chunk_size = chunk_size
+        self._counters = {"compressed": 0, "passthrough": 0, "bytes_in": 0, "bytes_stored": 0}
+        # Stored objects are immutable, so each URI's framing is probed once.
+        self._frames: OrderedDict[str, _ObjectFrame] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def upload_raw(
+        self, tenant_id: str, object_name: str, content: bytes, content_type: str
+    ) -> str:
+        return self.upload_stream(tenant_id, object_name, content, content_type).uri
+
+    def upload_stream(
+        self,
+        tenant_id: str,
+        object_name: str,
+        source: UploadSource,
+        content_type: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+    ) -> UploadResult:
+        if content_type not in self._content_types:
+            with self._lock:
+                self._counters["passthrough"] += 1
+            return self._inner.upload_stream(
+                tenant_id, object_name, source, content_type, progress=progress
+            )
+        # A dictionary only pays off for small objects, whose size is known up front.
+        use_dictionary = (
+            self._dictionary is not None
+            and content_type in self._dictionary_content_types
+            and isinstance(source, (bytes, bytearray, memoryview))
+            and len(source) <= self._dictionary_max_object_bytes
+        )
+        sha256 = hashlib.sha256()
+        totals = {"in": 0, "out": 0}
+
+        def _frames() -> Iterator[bytes]:
+            compressor = stream_compressor(
+                self._codec,
+                level=self._level,
+                dictionary=self._dictionary if use_dictionary else None,
+            )
+            dictionary_id = self._dictionary_id if use_dictionary else 0
+            yield HEADER.pack(MAGIC, CODEC_IDS[self._codec], dictionary_id)
+            for chunk in iter_chunks(source, self._chunk_size):
+                sha256.update(chunk)
+                totals["in"] += len(chunk)
+                if progress is not None:
+                    progress(totals["in"])
+                compressed = compressor.compress(bytes(chunk))
+                totals["out"] += len(compressed)
+                if compressed:
+                    yield compressed
+            tail = compressor.flush()
+            totals["out"] += len(tail)
+            yield tail + TRAILER.pack(totals["in"], MAGIC)
+
+        stored = self._inner.upload_stream(tenant_id, object_name, _frames(), content_type)
+        with self._lock:
+            self._counters["compressed"] += 1
+            self._counters["bytes_in"] += totals["in"]
+            self._counters["bytes_stored"] += stored.size_bytes
+        # Callers see the logical object: checksums and sizes describe the original bytes.
+        return UploadResult(
+            uri=stored.uri,
+            size_bytes=totals["in"],
+            sha256=sha256.hexdigest(),
+            storage_encoding=self._codec,
+        )
+
+    def open_read(
+        self,
+        uri: str,
+        *,
+        progress: Optional[ProgressCallback] = None,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> BinaryIO:
+        if encoding is None:
+            return self._inner.open_read(uri, progress=progress, checksum=checksum)
+        frame = self._frame(uri, checksum, encoding)
+        reader = io.BufferedReader(_IteratorReader(self._decompressed(uri, frame, checksum)))
+        return with_progress(reader, progress)
+
+    def object_size(
+        self, uri: str, *, checksum: Optional[str] = None, encoding: Optional[str] = None
+    ) -> int:
+        if encoding is None:
+            return self._inner.object_size(uri, checksum=checksum)
+        return self._frame(uri, checksum, encoding).uncompressed_size
+
+    def iter_range(
+        self,
+        uri: str,
+        start: int,
+        end: int,
+        *,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        if encoding is None:
+            return self._inner.iter_range(uri, start, end, checksum=checksum)
+        frame = self._frame(uri, checksum, encoding)
+        return self._sliced(self._decompressed(uri, frame, checksum), start, end)
+
+    def generate_signed_url(self, uri: str) -> str:
+        # A signed URL hands out the stored bytes, so framed objects must be served through
+        # open_read/iter_range instead; callers check storage_encoding first.
+        return self._inner.generate_signed_url(uri)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **self._inner.metrics(),
+            "compression": {
+                **counters,
+                "codec": self._codec,
+                "ratio": (
+                    round(counters["bytes_in"] / counters["bytes_stored"], 2)
+                    if counters["bytes_stored"]
+                    else 0.0
+                ),
+            },
+        }
+
+    def _frame(self, uri: str, checksum: Optional[str], encoding: str) -> _ObjectFrame:
+        with self._lock:
+            if uri in self._frames:
+                self._frames.move_to_end(uri)
+                return self._frames[uri]
+        frame = self._probe(uri, checksum, encoding)
+        with self._lock:
+            self._frames[uri] = frame
+            while len(self._frames) > FRAME_CACHE_SIZE:
+                self._frames.popitem(last=False)
+        return frame
+
+    def _probe(self, uri: str, checksum: Optional[str], encoding: str) -> _ObjectFrame:
+        stored_size = self._inner.object_size(uri, checksum=checksum)
+        if stored_size < HEADER.size + TRAILER.size:
+            raise ValueError(f"truncated compressed object: {uri}")
+        header = b"".join(self._inner.iter_range(uri, 0, HEADER.size - 1, checksum=checksum))
+        magic, codec_id, dictionary_id = HEADER.unpack(header)
+        if magic != MAGIC or CODECS_BY_ID.get(codec_id) != encoding:
+            raise ValueError(f"object {uri} is not framed with {encoding}")
+        trailer = b"".join(
+            self._inner.iter_range(
+                uri, stored_size - TRAILER.size, stored_size - 1, checksum=checksum
+            )
+        )
+        uncompressed_size, trailer_magic = TRAILER.unpack(trailer)
+        if trailer_magic != MAGIC:
+            raise ValueError(f"truncated compressed object: {uri}")
+        if dictionary_id and dictionary_id != self._dictionary_id:
+            raise ValueError(f"object {uri} needs zstd dictionary {dictionary_id}")
+        return _ObjectFrame(
+            codec=CODECS_BY_ID[codec_id],
+            dictionary_id=dictionary_id,
+            stored_size=stored_size,
+            uncompressed_size=uncompressed_size,
+        )
+
+    def _decompressed(
+        self, uri: str, frame: _ObjectFrame, checksum: Optional[str]
+    ) -> Iterator[bytes]:
+        decompressor = stream_decompressor(
+            frame.codec, dictionary=self._dictionary if frame.dictionary_id else None
+        )
+        # The trailer's length is checked as bytes come out, so a corrupt object fails
+        # instead of streaming more or fewer bytes than object_size promised.
+        produced = 0
+        for chunk in self._inner.iter_range(
+            uri, HEADER.size, frame.stored_size - TRAILER.size - 1, checksum=checksum
+        ):
+            data = decompressor.decompress(chunk)
+            produced += len(data)
+            if produced > frame.uncompressed_size:
+                raise ValueError(f"compressed object {uri} is longer than its trailer")
+            if data:
+                yield data
+        if produced != frame.uncompressed_size:
+            raise ValueError(f"compressed object {uri} is shorter than its trailer")
+
+    @staticmethod
+    def _sliced(chunks: Iterator[bytes], start: int, end: int) -> Iterator[bytes]:
+        # Compressed streams cannot seek, so ranges decompress from the start and skip.
+        offset = 0
+        for chunk in chunks:
+            chunk_end = offset + len(chunk)
+            if chunk_end > start:
+                yield chunk[max(0, start - offset) : end + 1 - offset]
+            offset = chunk_end
+            if offset > end:
+                return
+
+
+def load_dictionary(path: str) -> Optional[bytes]:
+    return Path(path).read_bytes() if path else None
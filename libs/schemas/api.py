@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 
@@ -77,9 +77,37 @@ class ReviewCompleteRequest(BaseModel):
     corrections: list[CorrectionPayload] = Field(default_factory=list)
 
 
+class ReviewBulkCompleteItem(BaseModel):
+    task_id: str
+    approved: bool
+    corrections: list[CorrectionPayload] = Field(default_factory=list)
+
+
+class ReviewBulkCompleteRequest(BaseModel):
+    items: list[ReviewBulkCompleteItem] = Field(min_length=1, max_length=500)
+
+
+class ReviewBulkCompleteResult(BaseModel):
+    task_id: str
+    status: str
+    correction_count: int
+    error: Optional[str] = None
+
+
+class ReviewBulkCompleteResponse(BaseModel):
+    completed: int
+    failed: int
+    results: list[ReviewBulkCompleteResult]
+
+
 class WebhookSubscriptionRequest(BaseModel):
     target_url: HttpUrl
     event_filter: str
+    batch_enabled: bool = False
+    batch_max_events: int = Field(default=100, ge=1, le=1000)
+    batch_max_bytes: int = Field(default=1_000_000, ge=1024, le=10_000_000)
+    batch_linger_seconds: int = Field(default=5, ge=1, le=300)
+    batch_compression: Literal["none", "gzip", "zstd"] = "gzip"
 
 
 class WebhookDispatchRequest(BaseModel):
@@ -96,15 +124,22 @@ class WebhookWorkerRunResponse(BaseModel):
     delivered: int
     retried: int
     dead_lettered: int
+    deferred: int = 0
 
 
 class WebhookReplayRequest(BaseModel):
     delivery_ids: list[str] = Field(default_factory=list)
     limit: int = Field(default=100, ge=1, le=1000)
+    rate_per_second: Optional[float] = Field(default=None, gt=0)
+    burst: Optional[int] = Field(default=None, ge=1)
+    cursor: Optional[str] = None
 
 
 class WebhookReplayResponse(BaseModel):
     requeued: int
+    remaining: int = 0
+    next_cursor: Optional[str] = None
+    scheduled_until: Optional[datetime] = None
 
 
 class AwbValidateRequest(BaseModel):
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel, Field
 
+ENVELOPE_SCHEMA_VERSION = 1
+
 
 class EventEnvelope(BaseModel):
+    schema_version: int = ENVELOPE_SCHEMA_VERSION
     event_id: str
     event_type: str
-    tenant_id: str
+    tenant_id: Optional[str] = None
     occurred_at: datetime
     payload: dict[str, object] = Field(default_factory=dict)
 
@@ -111,6 +111,7 @@ class AecaWorkflowService:
                 "export_ref": export_case.export_ref,
                 "provider_status": response.get("status", "unknown"),
             },
+            db=db,
         )
         create_audit_event(
             db,
@@ -72,6 +72,7 @@ class DiscrepancyWorkflowService:
                 "shipment_id": shipment_id,
                 "score": discrepancy.score,
             },
+            db=db,
         )
         return discrepancy
 
@@ -109,6 +110,7 @@ class DiscrepancyWorkflowService:
                 "discrepancy_id": discrepancy_id,
                 "status": dispute.status,
             },
+            db=db,
         )
         create_audit_event(
             db,
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Compares the async /api/v1/documents endpoint with the same query served by a sync
+# endpoint on the threadpool. Point --database-url at Postgres for real round trips;
+# on SQLite, --latency-ms adds a per-statement delay on the driver's own thread.
+TENANT_ID = "tenant_bench"
+
+
+def _load_gateway(database_url: str) -> Any:
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("AUTH_JWT_SECRET", "bench-jwt-secret-123456789")
+    os.environ.setdefault("AUTH_REFRESH_SECRET", "bench-refresh-secret-123456789")
+    os.environ["EVENT_BUS_BACKEND"] = "memory"
+    spec = importlib.util.spec_from_file_location(
+        "api_gateway_main", Path(__file__).resolve().parents[1] / "apps/api-gateway/main.py"
+    )
+    if spec is None or spec.loader is None:
+        raise RuntimeError("failed to load api gateway module")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _size_async_pool(gateway: Any, database_url: str, concurrency: int) -> AsyncEngine:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from libs.common.config import Settings
+    from libs.common.database import get_async_db
+
+    # Same pool size as the baseline, so only the threadpool differs between the runs.
+    runtime_settings = Settings(database_url=database_url, database_async_url="")
+    async_engine = create_async_engine(
+        runtime_settings.resolved_database_async_url,
+        pool_size=concurrency,
+        max_overflow=0,
+    )
+    session_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as db:
+            yield db
+
+    gateway.app.dependency_overrides[get_async_db] = _get_async_db
+    return async_engine
+
+
+def _add_statement_latency(
+    latency_ms: float, sync_engine: Engine, async_engine: AsyncEngine
+) -> None:
+    from sqlalchemy import event
+
+    def _delay(_statement: str) -> None:
+        time.sleep(latency_ms / 1000)
+
+    @event.listens_for(sync_engine, "connect")
+    def _sync_connect(dbapi_connection: sqlite3.Connection, _record: Any) -> None:
+        dbapi_connection.set_trace_callback(_delay)
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _async_connect(dbapi_connection: Any, _record: Any) -> None:
+        dbapi_connection.run_async(lambda connection: connection.set_trace_callback(_delay))
+
+
+def _seed(documents: int) -> None:
+    from libs.common.database import SessionLocal, init_db
+    from libs.common.models import Document, Tenant
+
+    init_db()
+    with SessionLocal() as db:
+        if db.get(Tenant, TENANT_ID) is None:
+            db.add(Tenant(id=TENANT_ID, name="Bench"))
+            db.add_all(
+                Document(
+                    id=f"bench_doc_{index:05d}",
+                    tenant_id=TENANT_ID,
+                    file_name=f"awb-{index:05d}.pdf",
+                    content_type="application/pdf",
+                    storage_uri=f"local://{TENANT_ID}/bench_doc_{index:05d}",
+                    created_by="bench_user",
+                )
+                for index in range(documents)
+            )
+            db.commit()
+
+
+def _add_sync_baseline(gateway: Any, database_url: str, concurrency: int) -> Engine:
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import create_engine, func, select
+    from sqlalchemy.orm import Session, sessionmaker
+
+    from libs.auth.dependencies import TenantContext, get_tenant_context
+    from libs.common.models import Document
+
+    # A sync session is only closed once its dependency teardown gets a threadpool slot,
+    # so the baseline needs a connection per in-flight request or it deadlocks the pool.
+    engine = create_engine(database_url, pool_size=concurrency, max_overflow=0)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    def _get_db() -> Iterator[Session]:
+        with session_factory() as db:
+            yield db
+
+    app: FastAPI = gateway.app
+
+    @app.get("/api/v1/bench/sync-documents")
+    def sync_documents(
+        db: Session = Depends(_get_db),
+        context: TenantContext = Depends(get_tenant_context),
+    ) -> dict[str, int]:
+        stmt = (
+            select(Document)
+            .where(Document.tenant_id == context.tenant_id)
+            .order_by(Document.created_at.desc())
+            .limit(25)
+        )
+        items = list(db.execute(stmt).scalars().all())
+        total = db.scalar(
+            select(func.count()).select_from(Document).where(Document.tenant_id == context.tenant_id)
+        )
+        return {"items": len(items), "total": int(total or 0)}
+
+    return engine
+
+
+async def _run(gateway: Any, path: str, args: argparse.Namespace) -> dict[str, float]:
+    import anyio.to_thread
+    import httpx
+
+    from libs.auth.security import create_access_token
+    from libs.auth.types import AuthUser
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool
+    token, _ = create_access_token(
+        AuthUser(
+            user_id="bench_user",
+            email="bench@example.com",
+            tenant_ids=[TENANT_ID],
+            roles=["operator"],
+        )
+    )
+    headers = {"Authorization": f"Bearer {token}", "X-Tenant-Id": TENANT_ID}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=gateway.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def _one() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await _one()  # warm the pools
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(_one() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "req_per_s": args.requests / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync vs async gateway endpoint benchmark")
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--threadpool", type=int, default=40, help="Starlette's default is 40")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--documents", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="nexuscargo-bench-")
+    database_url = args.database_url or f"sqlite+pysqlite:///{workdir}/bench.db"
+    gateway = _load_gateway(database_url)
+    from libs.common.rate_limit import InMemoryRateLimiter, RateLimitConfig
+
+    gateway.rate_limiter = InMemoryRateLimiter(RateLimitConfig(max_requests=10**9))
+    _seed(args.documents)
+    baseline_engine = _add_sync_baseline(gateway, database_url, args.concurrency)
+    async_engine = _size_async_pool(gateway, database_url, args.concurrency)
+    if database_url.startswith("sqlite") and args.latency_ms > 0:
+        _add_statement_latency(args.latency_ms, baseline_engine, async_engine)
+
+    async def _bench() -> None:
+        print(f"{'endpoint':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for label, path in (
+            ("sync", "/api/v1/bench/sync-documents"),
+            ("async", "/api/v1/documents"),
+        ):
+            result = await _run(gateway, path, args)
+            print(
+                f"{label:<12}{result['req_per_s']:>10.1f}"
+                f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+            )
+        await async_engine.dispose()
+
+    asyncio.run(_bench())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
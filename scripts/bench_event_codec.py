@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from libs.common.event_codec import EventCodec, new_envelope  # noqa: E402
+
+SMALL_PAYLOAD: dict[str, Any] = {"tenant_id": "tenant_demo", "document_id": "doc_0001", "status": "received"}
+LARGE_PAYLOAD: dict[str, Any] = {
+    "tenant_id": "tenant_demo",
+    "document_id": "doc_0001",
+    "fields": [
+        {"name": f"line_item_{index}", "value": f"value {index}", "confidence": 0.97}
+        for index in range(200)
+    ],
+}
+
+
+def _time_per_op(operation: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        operation()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def _baseline(payload: dict[str, Any], iterations: int) -> tuple[float, float, int]:
+    # What publishers sent before envelopes: the bare payload through the stdlib.
+    data = json.dumps(payload).encode("utf-8")
+    return (
+        _time_per_op(lambda: json.dumps(payload).encode("utf-8"), iterations),
+        _time_per_op(lambda: json.loads(data), iterations),
+        len(data),
+    )
+
+
+def _measure(
+    codec: EventCodec, payload: dict[str, Any], iterations: int
+) -> tuple[float, float, int]:
+    envelope = new_envelope("document.received", payload)
+    encoded = codec.encode(envelope)
+    return (
+        _time_per_op(lambda: codec.encode(envelope), iterations),
+        _time_per_op(lambda: codec.decode(encoded.data, encoded.attributes), iterations),
+        len(encoded.data),
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare event codecs on publish payloads")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    print(f"{'payload':<8}{'codec':<22}{'encode_us':>12}{'decode_us':>12}{'bytes':>10}")
+    for label, payload in (("small", SMALL_PAYLOAD), ("large", LARGE_PAYLOAD)):
+        rows = [("json (bare payload)", *_baseline(payload, args.iterations))]
+        for name in ("json", "orjson", "msgpack"):
+            for compression in ("none", "gzip"):
+                try:
+                    codec = EventCodec(
+                        name, compression=compression, compression_threshold_bytes=0
+                    )
+                except RuntimeError:
+                    continue
+                rows.append((f"{name}+{compression}", *_measure(codec, payload, args.iterations)))
+        for codec_label, encode_us, decode_us, size in rows:
+            print(f"{label:<8}{codec_label:<22}{encode_us:>12.2f}{decode_us:>12.2f}{size:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
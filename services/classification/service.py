@@ -39,5 +39,6 @@ class ClassificationService:
                 "doc_type": doc_type,
                 "confidence": confidence,
             },
+            db=db,
         )
         return classification
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from libs.common.consumers import StageHandler, event_document, run_stage
+from libs.common.events import EventBus
+from libs.common.sqlite_queue import ConsumedEvent
+from libs.schemas.events import EventTypes
+from services.classification.service import ClassificationService
+
+TOPICS = (EventTypes.DOCUMENT_PREPROCESSED,)
+
+
+def build_handler(event_bus: EventBus) -> StageHandler:
+    service = ClassificationService(event_bus)
+
+    def handle(db: Session, event: ConsumedEvent) -> None:
+        document = event_document(db, event)
+        service.classify(db, document=document)
+
+    return handle
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    return run_stage("classification", TOPICS, build_handler, argv)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -49,5 +49,6 @@ class ExtractionService:
                 "doc_type": doc_type,
                 "average_confidence": average_confidence,
             },
+            db=db,
         )
         return entities, average_confidence
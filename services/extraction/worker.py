@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from libs.common.consumers import StageHandler, event_document, run_stage
+from libs.common.events import EventBus
+from libs.common.sqlite_queue import ConsumedEvent
+from libs.schemas.events import EventTypes
+from services.extraction.service import ExtractionService
+
+TOPICS = (EventTypes.DOCUMENT_CLASSIFIED,)
+
+
+def build_handler(event_bus: EventBus) -> StageHandler:
+    service = ExtractionService(event_bus)
+
+    def handle(db: Session, event: ConsumedEvent) -> None:
+        document = event_document(db, event)
+        # The gateway uses the file name as the extraction hint, so the stage does too.
+        service.extract(
+            db,
+            document=document,
+            doc_type=str(event.payload["doc_type"]),
+            text_hint=document.file_name,
+        )
+
+    return handle
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    return run_stage("extraction", TOPICS, build_handler, argv)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
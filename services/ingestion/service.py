@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import hashlib
 from uuid import uuid4
 
 from sqlalchemy.orm import Session
@@ -9,6 +8,7 @@ from libs.common.audit import create_audit_event
 from libs.common.config import get_settings
 from libs.common.events import EventBus
 from libs.common.models import Document, DocumentVersion
+from libs.common.sql_metrics import recorded_queries
 from libs.common.storage import StorageProvider
 from libs.schemas.events import EventTypes
 from services.classification.service import ClassificationService
@@ -60,14 +60,13 @@ class IngestionService:
 
         self._run_virus_scan_hook(payload_bytes)
 
-        digest = hashlib.sha256(payload_bytes).hexdigest()
         object_name = f"raw/{uuid4().hex}-{file_name}"
-        storage_uri = self._storage.upload_raw(
-            tenant_id=tenant_id,
-            object_name=object_name,
-            content=payload_bytes,
-            content_type=content_type,
+        # The checksum is computed while the bytes stream to storage, not in a second pass.
+        upload = self._storage.upload_stream(
+            tenant_id, object_name, payload_bytes, content_type
         )
+        storage_uri = upload.uri
+        digest = upload.sha256
 
         document = Document(
             id=f"doc_{uuid4().hex}",
@@ -87,6 +86,7 @@ class IngestionService:
             version_number=1,
             storage_uri=storage_uri,
             checksum=digest,
+            storage_encoding=upload.storage_encoding,
         )
         db.add(version)
 
@@ -103,43 +103,45 @@ class IngestionService:
         self._event_bus.publish(
             EventTypes.DOCUMENT_RECEIVED,
             {"tenant_id": tenant_id, "document_id": document.id, "content_type": content_type},
+            db=db,
         )
-
-        _artifact_uri = self._preprocessing.preprocess(document=document)
-        classification = self._classification.classify(db, document=document)
-        entities, average_confidence = self._extraction.extract(
-            db,
-            document=document,
-            doc_type=classification.doc_type,
-            text_hint=text_hint,
-        )
-        validation_results = self._validation.validate(
-            db,
-            document=document,
-            doc_type=classification.doc_type,
-            entities=entities,
-        )
-
-        settings = get_settings()
-        review_required = classification.confidence < settings.review_confidence_threshold
-        review_required = (
-            review_required or average_confidence < settings.review_confidence_threshold
-        )
-        review_required = review_required or any(not result.passed for result in validation_results)
-
-        if review_required:
-            self._review.queue_low_confidence_review(
+        if get_settings().pipeline_mode == "event_driven":
+            # Stage workers pick the document up from document.received.
+            return {
+                "document_id": document.id,
+                "status": document.status,
+                "review_required": False,
+                "doc_type": "pending",
+            }
+
+        # Same per-stage SQL scopes as the stage workers record, nested in the request scope.
+        with recorded_queries("stage:preprocessing inline"):
+            _artifact_uri = self._preprocessing.preprocess(db, document=document)
+        with recorded_queries("stage:classification inline"):
+            classification = self._classification.classify(db, document=document)
+        with recorded_queries("stage:extraction inline"):
+            entities, average_confidence = self._extraction.extract(
+                db,
+                document=document,
+                doc_type=classification.doc_type,
+                text_hint=text_hint,
+            )
+        with recorded_queries("stage:validation inline"):
+            validation_results = self._validation.validate(
+                db,
+                document=document,
+                doc_type=classification.doc_type,
+                entities=entities,
+            )
+        with recorded_queries("stage:review inline"):
+            review_required = self._review.route_document(
                 db,
-                tenant_id=tenant_id,
+                document=document,
                 actor_id=actor_id,
-                document_id=document.id,
-                reason="low-confidence or validation-failure",
-                source="pipeline",
-                confidence=min(classification.confidence, average_confidence),
+                classification_confidence=classification.confidence,
+                average_confidence=average_confidence,
+                validations_passed=all(result.passed for result in validation_results),
             )
-            document.status = "review_required"
-        else:
-            document.status = "validated"
 
         return {
             "document_id": document.id,
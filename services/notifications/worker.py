@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from libs.common.consumers import StageHandler, run_stage
+from libs.common.events import EventBus
+from libs.common.sqlite_queue import ConsumedEvent
+from libs.schemas.events import EventTypes
+from services.notifications.service import NotificationService
+
+TOPICS = (EventTypes.REVIEW_REQUIRED, EventTypes.DISCREPANCY_DETECTED)
+
+
+def build_handler(event_bus: EventBus) -> StageHandler:
+    _ = event_bus
+    service = NotificationService()
+
+    def handle(db: Session, event: ConsumedEvent) -> None:
+        _ = db
+        subject = event.payload.get("document_id") or event.payload.get("shipment_id", "")
+        service.send_exception_notification(
+            tenant_id=str(event.payload.get("tenant_id", "")),
+            category=event.topic,
+            message=f"{event.topic} for {subject}",
+        )
+
+    return handle
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    return run_stage("notifications", TOPICS, build_handler, argv)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
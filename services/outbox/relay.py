@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import argparse
+import signal
+import threading
+from collections.abc import Callable
+from types import FrameType
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.config import Settings, get_settings
+from libs.common.events import EventBus, get_transport_event_bus
+from libs.common.logging import configure_logging, log_event
+from libs.common.models import OutboxEvent
+from libs.common.publish_scope import track_publishes
+
+SessionFactory = Callable[[], Session]
+
+# First key of the two-part advisory lock, so tenant claims can't collide with other
+# advisory lock users.
+OUTBOX_LOCK_NAMESPACE = 0x0B0C
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        event_bus: EventBus,
+        session_factory: SessionFactory,
+        *,
+        settings: Settings | None = None,
+        tenant_id: Optional[str] = None,
+    ):
+        runtime_settings = settings or get_settings()
+        self._event_bus = event_bus
+        self._session_factory = session_factory
+        self._tenant_id = tenant_id
+        self._batch_size = runtime_settings.event_outbox_batch_size
+        self._poll_interval = runtime_settings.event_outbox_poll_interval_seconds
+        self._flush_timeout = runtime_settings.pubsub_flush_timeout_seconds
+        self._stop = threading.Event()
+        self._logger = configure_logging()
+
+    def request_stop(self) -> None:
+        self._stop.set()
+
+    def install_signal_handlers(self) -> None:
+        def _handle(signum: int, _frame: Optional[FrameType]) -> None:
+            log_event(self._logger, "outbox_relay_stop_requested", {"signal": signum})
+            self.request_stop()
+
+        signal.signal(signal.SIGTERM, _handle)
+        signal.signal(signal.SIGINT, _handle)
+
+    def run(self, *, drain: bool = False) -> dict[str, int]:
+        totals = {"batches": 0, "published": 0, "failed": 0}
+        log_event(self._logger, "outbox_relay_started", {"tenant_id": self._tenant_id})
+        while not self._stop.is_set():
+            outcome = self.run_once()
+            totals["batches"] += 1
+            totals["published"] += outcome["published"]
+            totals["failed"] += outcome["failed"]
+            if outcome["published"] == 0:
+                if drain:
+                    break
+                self._stop.wait(self._poll_interval)
+        log_event(self._logger, "outbox_relay_stopped", totals)
+        return totals
+
+    def run_once(self) -> dict[str, int]:
+        totals = {"published": 0, "failed": 0}
+        for tenant_id in self._pending_tenants():
+            outcome = self._relay_tenant(tenant_id)
+            totals["published"] += outcome["published"]
+            totals["failed"] += outcome["failed"]
+        return totals
+
+    def _pending_tenants(self) -> list[Optional[str]]:
+        if self._tenant_id:
+            return [self._tenant_id]
+        db = self._session_factory()
+        try:
+            stmt = (
+                select(OutboxEvent.tenant_id)
+                .group_by(OutboxEvent.tenant_id)
+                .order_by(func.min(OutboxEvent.id))
+                .limit(self._batch_size)
+            )
+            return list(db.execute(stmt).scalars().all())
+        finally:
+            db.close()
+
+    def _relay_tenant(self, tenant_id: Optional[str]) -> dict[str, int]:
+        # Events are published per tenant in outbox id order with the tenant as the
+        # Pub/Sub ordering key. Only one relay works on a tenant at a time, and a tenant
+        # whose batch is not fully confirmed stops there: the whole batch stays queued
+        # and is republished from its first event, so consumers still dedupe on event_id.
+        db = self._session_factory()
+        try:
+            if not _claim_tenant(db, tenant_id):
+                db.rollback()
+                return {"published": 0, "failed": 0}
+            stmt = (
+                select(OutboxEvent)
+                .where(
+                    OutboxEvent.tenant_id == tenant_id
+                    if tenant_id is not None
+                    else OutboxEvent.tenant_id.is_(None)
+                )
+                .order_by(OutboxEvent.id.asc())
+                .limit(self._batch_size)
+            )
+            events = list(db.execute(stmt).scalars().all())
+            if not events:
+                db.commit()
+                return {"published": 0, "failed": 0}
+
+            with track_publishes() as scope:
+                for event in events:
+                    attributes = {**event.attributes, "outbox_id": str(event.id)}
+                    if event.tenant_id:
+                        attributes["tenant_id"] = event.tenant_id
+                    self._event_bus.publish(
+                        event.topic,
+                        event.payload,
+                        attributes,
+                        ordering_key=event.tenant_id or "",
+                    )
+            undelivered = self._event_bus.flush(self._flush_timeout, scope=scope)
+
+            event_ids = [event.id for event in events]
+            if undelivered:
+                db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(event_ids))
+                    .values(
+                        attempt_count=OutboxEvent.attempt_count + 1,
+                        last_error=f"{undelivered} of {len(events)} messages unconfirmed",
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                log_event(
+                    self._logger,
+                    "outbox_relay_batch_failed",
+                    {"tenant_id": tenant_id, "events": len(events), "undelivered": undelivered},
+                )
+                return {"published": 0, "failed": len(events)}
+
+            db.execute(
+                delete(OutboxEvent)
+                .where(OutboxEvent.id.in_(event_ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            log_event(
+                self._logger,
+                "outbox_relay_batch",
+                {"tenant_id": tenant_id, "published": len(events)},
+            )
+            return {"published": len(events), "failed": 0}
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def _claim_tenant(db: Session, tenant_id: Optional[str]) -> bool:
+    # A transaction-scoped advisory lock, released by the commit or rollback that ends
+    # the tenant's batch. SQLite has no concurrent writers to fence off.
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    claimed = db.execute(
+        select(
+            func.pg_try_advisory_xact_lock(
+                OUTBOX_LOCK_NAMESPACE, func.hashtext(tenant_id or "")
+            )
+        )
+    ).scalar_one()
+    return bool(claimed)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="NexusCargo event outbox relay")
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="exit once the outbox is empty (Cloud Run job mode)",
+    )
+    parser.add_argument("--tenant-id", default=None)
+    args = parser.parse_args(argv)
+
+    from libs.common.database import engine
+
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    relay = OutboxRelay(
+        get_transport_event_bus(message_ordering=True), session_factory, tenant_id=args.tenant_id
+    )
+    relay.install_signal_handlers()
+    relay.run(drain=args.drain)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from sqlalchemy.orm import Session
+
 from libs.common.events import EventBus
 from libs.common.models import Document
 from libs.schemas.events import EventTypes
@@ -9,7 +11,7 @@ class PreprocessingService:
     def __init__(self, event_bus: EventBus):
         self._event_bus = event_bus
 
-    def preprocess(self, *, document: Document) -> str:
+    def preprocess(self, db: Session, *, document: Document) -> str:
         # Hook for deskew/denoise/contrast operations.
         # TODO(owner:doc-intel): integrate image preprocessing pipeline in Cloud Run job.
         artifact_uri = f"{document.storage_uri}#preprocessed"
@@ -20,5 +22,6 @@ class PreprocessingService:
                 "document_id": document.id,
                 "artifact_uri": artifact_uri,
             },
+            db=db,
         )
         return artifact_uri
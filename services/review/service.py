@@ -1,17 +1,35 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Any, Optional
 from uuid import uuid4
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, insert, select
 from sqlalchemy.orm import Session
 
-from libs.common.audit import create_audit_event
+from libs.common.audit import create_audit_event, create_audit_events_bulk
+from libs.common.config import get_settings
 from libs.common.events import EventBus
-from libs.common.models import Correction, ReviewTask
+from libs.common.models import Correction, Document, ReviewTask
 from libs.schemas.events import EventTypes
 
 
+@dataclass(frozen=True)
+class ReviewDecision:
+    review_task_id: str
+    approved: bool
+    corrections: list[dict[str, str]] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ReviewDecisionResult:
+    review_task_id: str
+    status: str
+    correction_count: int = 0
+    error: Optional[str] = None
+
+
 class ReviewService:
     def __init__(self, event_bus: EventBus):
         self._event_bus = event_bus
@@ -68,9 +86,41 @@ class ReviewService:
                 "source": source,
                 "confidence": confidence,
             },
+            db=db,
         )
         return task
 
+    def route_document(
+        self,
+        db: Session,
+        *,
+        document: Document,
+        actor_id: str,
+        classification_confidence: float,
+        average_confidence: float,
+        validations_passed: bool,
+    ) -> bool:
+        threshold = get_settings().review_confidence_threshold
+        review_required = (
+            classification_confidence < threshold
+            or average_confidence < threshold
+            or not validations_passed
+        )
+        if review_required:
+            self.queue_low_confidence_review(
+                db,
+                tenant_id=document.tenant_id,
+                actor_id=actor_id,
+                document_id=document.id,
+                reason="low-confidence or validation-failure",
+                source="pipeline",
+                confidence=min(classification_confidence, average_confidence),
+            )
+            document.status = "review_required"
+        else:
+            document.status = "validated"
+        return review_required
+
     def complete_review(
         self,
         db: Session,
@@ -122,5 +172,105 @@ class ReviewService:
                 "approved": approved,
                 "correction_count": len(corrections),
             },
+            db=db,
         )
         return task
+
+    def complete_reviews_bulk(
+        self,
+        db: Session,
+        *,
+        tenant_id: str,
+        actor_id: str,
+        decisions: list[ReviewDecision],
+    ) -> list[ReviewDecisionResult]:
+        task_ids = {decision.review_task_id for decision in decisions}
+        stmt = select(ReviewTask).where(
+            ReviewTask.tenant_id == tenant_id,
+            ReviewTask.id.in_(task_ids),
+        )
+        tasks = {task.id: task for task in db.execute(stmt).scalars().all()}
+
+        completed_at = datetime.now(timezone.utc)
+        seen: set[str] = set()
+        results: list[ReviewDecisionResult] = []
+        correction_rows: list[dict[str, Any]] = []
+        audit_entries: list[tuple[str, dict[str, Any]]] = []
+        event_payloads: list[dict[str, Any]] = []
+        for decision in decisions:
+            task = tasks.get(decision.review_task_id)
+            if task is None:
+                results.append(
+                    ReviewDecisionResult(
+                        review_task_id=decision.review_task_id,
+                        status="failed",
+                        error="review task not found",
+                    )
+                )
+                continue
+            if task.id in seen:
+                results.append(
+                    ReviewDecisionResult(
+                        review_task_id=task.id,
+                        status="failed",
+                        error="duplicate review task in request",
+                    )
+                )
+                continue
+            seen.add(task.id)
+
+            task.status = "approved" if decision.approved else "rejected"
+            task.completed_at = completed_at
+            correction_rows.extend(
+                {
+                    "id": f"cor_{uuid4().hex}",
+                    "tenant_id": tenant_id,
+                    "review_task_id": task.id,
+                    "field_name": correction["field_name"],
+                    "old_value": correction["old_value"],
+                    "new_value": correction["new_value"],
+                    "reason_tag": correction["reason_tag"],
+                    "corrected_by": actor_id,
+                }
+                for correction in decision.corrections
+            )
+            audit_entries.append(
+                (
+                    task.id,
+                    {
+                        "approved": decision.approved,
+                        "correction_count": len(decision.corrections),
+                        "bulk": True,
+                    },
+                )
+            )
+            event_payloads.append(
+                {
+                    "tenant_id": tenant_id,
+                    "review_task_id": task.id,
+                    "approved": decision.approved,
+                    "correction_count": len(decision.corrections),
+                }
+            )
+            results.append(
+                ReviewDecisionResult(
+                    review_task_id=task.id,
+                    status=task.status,
+                    correction_count=len(decision.corrections),
+                )
+            )
+
+        db.flush()
+        if correction_rows:
+            db.execute(insert(Correction), correction_rows)
+        create_audit_events_bulk(
+            db,
+            tenant_id=tenant_id,
+            actor_id=actor_id,
+            action="review.task.completed",
+            entity_type="review_task",
+            entries=audit_entries,
+        )
+        if event_payloads:
+            self._event_bus.publish_many(EventTypes.REVIEW_COMPLETED, event_payloads, db=db)
+        return results
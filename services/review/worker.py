@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from libs.common.consumers import StageHandler, event_document, run_stage
+from libs.common.events import EventBus
+from libs.common.models import DocumentClassification, ExtractedEntity
+from libs.common.sqlite_queue import ConsumedEvent
+from libs.schemas.events import EventTypes
+from services.review.service import ReviewService
+
+TOPICS = (EventTypes.DOCUMENT_VALIDATED,)
+
+
+def build_handler(event_bus: EventBus) -> StageHandler:
+    service = ReviewService(event_bus)
+
+    def handle(db: Session, event: ConsumedEvent) -> None:
+        document = event_document(db, event)
+        classification_stmt = (
+            select(DocumentClassification.confidence)
+            .where(
+                DocumentClassification.tenant_id == document.tenant_id,
+                DocumentClassification.document_id == document.id,
+            )
+            .order_by(DocumentClassification.created_at.desc())
+            .limit(1)
+        )
+        average_stmt = select(func.avg(ExtractedEntity.confidence)).where(
+            ExtractedEntity.tenant_id == document.tenant_id,
+            ExtractedEntity.document_id == document.id,
+        )
+        service.route_document(
+            db,
+            document=document,
+            actor_id=document.created_by,
+            classification_confidence=float(db.scalar(classification_stmt) or 0.0),
+            average_confidence=float(db.scalar(average_stmt) or 0.0),
+            validations_passed=not event.payload.get("failed_rules"),
+        )
+
+    return handle
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    return run_stage("review", TOPICS, build_handler, argv)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
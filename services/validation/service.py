@@ -59,5 +59,6 @@ class ValidationService:
                 "doc_type": doc_type,
                 "failed_rules": [result.rule_code for result in results if not result.passed],
             },
+            db=db,
         )
         return results
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from libs.common.consumers import StageHandler, event_document, run_stage
+from libs.common.events import EventBus
+from libs.common.models import ExtractedEntity
+from libs.common.sqlite_queue import ConsumedEvent
+from libs.schemas.events import EventTypes
+from services.validation.service import ValidationService
+
+TOPICS = (EventTypes.DOCUMENT_EXTRACTED,)
+
+
+def build_handler(event_bus: EventBus) -> StageHandler:
+    service = ValidationService(event_bus)
+
+    def handle(db: Session, event: ConsumedEvent) -> None:
+        document = event_document(db, event)
+        entities_stmt = select(ExtractedEntity).where(
+            ExtractedEntity.tenant_id == document.tenant_id,
+            ExtractedEntity.document_id == document.id,
+        )
+        service.validate(
+            db,
+            document=document,
+            doc_type=str(event.payload["doc_type"]),
+            entities=list(db.execute(entities_stmt).scalars().all()),
+        )
+
+    return handle
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    return run_stage("validation", TOPICS, build_handler, argv)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
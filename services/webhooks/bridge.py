@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import argparse
+import signal
+import threading
+from collections.abc import Callable, Sequence
+from types import FrameType
+from typing import Any, Optional
+
+from sqlalchemy.orm import Session
+
+from libs.common.config import Settings, get_settings
+from libs.common.consumers import EventSource, get_event_source, receive_backoff
+from libs.common.events import InMemoryEventBus
+from libs.common.logging import configure_logging, log_event
+from libs.common.sqlite_queue import ConsumedEvent
+from libs.schemas.events import EventTypes
+from services.webhooks.service import WebhookService
+
+SessionFactory = Callable[[], Session]
+
+BRIDGE_SUBSCRIPTION = "webhooks"
+WEBHOOK_TOPICS = tuple(
+    value for name, value in vars(EventTypes).items() if name.isupper() and isinstance(value, str)
+)
+
+
+# Feeds internal domain events into webhook dispatch. Redelivered events need no
+# separate dedupe: dispatch keys deliveries on subscription, event type and payload hash.
+class WebhookEventBridge:
+    def __init__(
+        self,
+        service: WebhookService,
+        session_factory: SessionFactory,
+        *,
+        settings: Settings | None = None,
+        topics: Sequence[str] = WEBHOOK_TOPICS,
+        batch_size: Optional[int] = None,
+    ):
+        runtime_settings = settings or get_settings()
+        self.topics = list(topics)
+        self._service = service
+        self._session_factory = session_factory
+        self._batch_size = max(1, batch_size or runtime_settings.webhook_bridge_batch_size)
+        self._poll_interval = runtime_settings.stage_worker_poll_interval_seconds
+        self._counters = {"received": 0, "skipped": 0, "groups": 0, "enqueued": 0, "failed": 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._logger = configure_logging()
+
+    def handle(self, events: Sequence[ConsumedEvent]) -> int:
+        groups: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        skipped = 0
+        for event in events:
+            tenant_id = event.payload.get("tenant_id") or event.attributes.get("tenant_id")
+            if not tenant_id:
+                skipped += 1
+                continue
+            groups.setdefault((str(tenant_id), event.topic), []).append(event.payload)
+
+        enqueued = 0
+        dispatched_groups = 0
+        # The subscription index answers from memory, so a session only touches the
+        # database for tenants whose index expired or that actually have subscribers.
+        db = self._session_factory()
+        try:
+            for (tenant_id, event_type), payloads in groups.items():
+                if not self._service.has_subscribers(
+                    db, tenant_id=tenant_id, event_type=event_type
+                ):
+                    skipped += len(payloads)
+                    continue
+                enqueued += self._service.dispatch_events(
+                    db, tenant_id=tenant_id, event_type=event_type, payloads=payloads
+                )
+                dispatched_groups += 1
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self._counters["received"] += len(events)
+            self._counters["skipped"] += skipped
+            self._counters["groups"] += dispatched_groups
+            self._counters["enqueued"] += enqueued
+        return enqueued
+
+    def handle_bus_event(self, event: dict[str, Any]) -> None:
+        self.handle(
+            [
+                ConsumedEvent(
+                    message_id=str(event["event_id"]),
+                    topic=str(event["topic"]),
+                    payload=event["payload"],
+                    attributes=event["attributes"],
+                    delivery_attempt=1,
+                    event_id=str(event["event_id"]),
+                )
+            ]
+        )
+
+    def attach(self, event_bus: InMemoryEventBus) -> None:
+        for topic in self.topics:
+            event_bus.subscribe(topic, self.handle_bus_event)
+
+    def run(self, source: EventSource, *, drain: bool = False) -> dict[str, int]:
+        log_event(
+            self._logger,
+            "webhook_bridge_started",
+            {"topics": self.topics, "batch_size": self._batch_size},
+        )
+        receive_failures = 0
+        while not self._stop.is_set():
+            try:
+                events = source.receive(self.topics, self._batch_size)
+            except Exception as exc:  # noqa: BLE001
+                receive_failures += 1
+                log_event(
+                    self._logger,
+                    "webhook_bridge_receive_failed",
+                    {"failures": receive_failures, "error": str(exc)},
+                )
+                self._stop.wait(receive_backoff(self._poll_interval, receive_failures))
+                continue
+            receive_failures = 0
+            if not events:
+                if drain:
+                    break
+                self._stop.wait(self._poll_interval)
+                continue
+            message_ids = [event.message_id for event in events]
+            try:
+                self.handle(events)
+            except Exception as exc:  # noqa: BLE001
+                attempt = max(event.delivery_attempt for event in events)
+                with self._lock:
+                    self._counters["failed"] += len(events)
+                log_event(
+                    self._logger,
+                    "webhook_bridge_batch_failed",
+                    {"events": len(events), "attempt": attempt, "error": str(exc)},
+                )
+                source.nack(message_ids, delay_seconds=min(2**attempt, 60))
+                continue
+            source.ack(message_ids)
+        totals = self.metrics()
+        log_event(self._logger, "webhook_bridge_stopped", totals)
+        return totals
+
+    def request_stop(self) -> None:
+        self._stop.set()
+
+    def install_signal_handlers(self) -> None:
+        def _handle(signum: int, _frame: Optional[FrameType]) -> None:
+            log_event(self._logger, "webhook_bridge_stop_requested", {"signal": signum})
+            self.request_stop()
+
+        signal.signal(signal.SIGTERM, _handle)
+        signal.signal(signal.SIGINT, _handle)
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Dispatch internal events to webhooks")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="exit once no messages are waiting (Cloud Run job mode)",
+    )
+    args = parser.parse_args(argv)
+
+    from libs.common.database import SessionLocal
+
+    settings = get_settings()
+    bridge = WebhookEventBridge(
+        WebhookService(), SessionLocal, settings=settings, batch_size=args.batch_size
+    )
+    source = get_event_source(settings, BRIDGE_SUBSCRIPTION, fanout_topics=bridge.topics)
+    bridge.install_signal_handlers()
+    bridge.run(source, drain=args.drain)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
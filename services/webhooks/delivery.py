@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable, Coroutine, Iterator
+from concurrent import futures
+from dataclasses import dataclass
+from typing import Any, Optional, TypeVar
+
+import httpx
+
+from libs.common.config import Settings, get_settings
+from services.webhooks.health import TargetHealthRegistry
+
+AsyncPostFn = Callable[..., Awaitable[httpx.Response]]
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class DeliveryRequest:
+    delivery_id: str
+    target_url: str
+    body: bytes
+    headers: dict[str, str]
+
+
+@dataclass(frozen=True)
+class DeliveryOutcome:
+    delivery_id: str
+    delivered: bool
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    retry_after_seconds: Optional[float] = None
+
+
+def target_host(url: str) -> str:
+    parsed = httpx.URL(url)
+    return f"{parsed.host}:{parsed.port}" if parsed.port else parsed.host
+
+
+def is_target_failure(exc: Exception) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        status_code = exc.response.status_code
+        return status_code >= 500 or status_code in {408, 429}
+    return True
+
+
+class AsyncWebhookDeliveryEngine:
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        *,
+        post: Optional[AsyncPostFn] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        health: Optional[TargetHealthRegistry] = None,
+    ):
+        runtime_settings = settings or get_settings()
+        self._max_concurrency = max(1, runtime_settings.webhook_delivery_concurrency)
+        self.health = health or TargetHealthRegistry(runtime_settings)
+        self._timeout_seconds = runtime_settings.integration_timeout_seconds
+        self._http2 = runtime_settings.webhook_http2_enabled
+        self._post = post
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        self._host_slots: dict[str, asyncio.Condition] = {}
+        self._host_in_flight: dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    async def deliver_batch(self, requests: list[DeliveryRequest]) -> list[DeliveryOutcome]:
+        if not requests:
+            return []
+        return list(await asyncio.gather(*(self._deliver(request) for request in requests)))
+
+    def run_batch(self, requests: list[DeliveryRequest]) -> list[DeliveryOutcome]:
+        if not requests:
+            return []
+        return self._run(self.deliver_batch(requests))
+
+    def iter_completed(
+        self, requests: list[DeliveryRequest], *, max_wait: float
+    ) -> Iterator[list[DeliveryOutcome]]:
+        # Yields outcomes as deliveries finish instead of after the slowest target. An
+        # empty list means nothing finished within max_wait, so the caller can still
+        # record what it holds.
+        loop = self._event_loop()
+        pending = {
+            asyncio.run_coroutine_threadsafe(self._deliver(request), loop) for request in requests
+        }
+        while pending:
+            done, pending = futures.wait(
+                pending, timeout=max_wait, return_when=futures.FIRST_COMPLETED
+            )
+            yield [future.result() for future in done]
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = None
+            self._loop_thread = None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
+        loop.close()
+        self._global_limit = None
+        self._host_slots.clear()
+        self._host_in_flight.clear()
+
+    async def _deliver(self, request: DeliveryRequest) -> DeliveryOutcome:
+        host = target_host(request.target_url)
+        # Wait for a per-host slot before taking a global one, so requests queued
+        # behind a slow host never hold capacity other hosts could use.
+        await self._acquire_host_slot(host)
+        try:
+            retry_after = self.health.admit(host)
+            if retry_after is not None:
+                return DeliveryOutcome(
+                    delivery_id=request.delivery_id,
+                    delivered=False,
+                    error="circuit_open",
+                    retry_after_seconds=retry_after,
+                )
+            async with self._global_semaphore():
+                started = time.perf_counter()
+                try:
+                    response = await self._send(request)
+                    response.raise_for_status()
+                except Exception as exc:  # noqa: BLE001
+                    if is_target_failure(exc):
+                        self.health.record_failure(host)
+                    else:
+                        self.health.record_success(host, (time.perf_counter() - started) * 1000)
+                    status_code = (
+                        exc.response.status_code
+                        if isinstance(exc, httpx.HTTPStatusError)
+                        else None
+                    )
+                    return DeliveryOutcome(
+                        delivery_id=request.delivery_id,
+                        delivered=False,
+                        status_code=status_code,
+                        error=str(exc) or exc.__class__.__name__,
+                    )
+                self.health.record_success(host, (time.perf_counter() - started) * 1000)
+                return DeliveryOutcome(
+                    delivery_id=request.delivery_id,
+                    delivered=True,
+                    status_code=response.status_code,
+                )
+        finally:
+            await self._release_host_slot(host)
+
+    async def _send(self, request: DeliveryRequest) -> httpx.Response:
+        if self._post is not None:
+            return await self._post(
+                request.target_url,
+                content=request.body,
+                headers=request.headers,
+                timeout=self._timeout_seconds,
+            )
+        return await self._http_client().post(
+            request.target_url, content=request.body, headers=request.headers
+        )
+
+    def _http_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self._http2,
+                timeout=self._timeout_seconds,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=self._max_concurrency,
+                    max_keepalive_connections=self._max_concurrency,
+                    keepalive_expiry=30,
+                ),
+            )
+        return self._client
+
+    def _global_semaphore(self) -> asyncio.Semaphore:
+        if self._global_limit is None:
+            self._global_limit = asyncio.Semaphore(self._max_concurrency)
+        return self._global_limit
+
+    async def _acquire_host_slot(self, host: str) -> None:
+        condition = self._host_slots.setdefault(host, asyncio.Condition())
+        async with condition:
+            await condition.wait_for(
+                lambda: self._host_in_flight.get(host, 0) < self.health.concurrency_limit(host)
+            )
+            self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+
+    async def _release_host_slot(self, host: str) -> None:
+        condition = self._host_slots[host]
+        async with condition:
+            self._host_in_flight[host] -= 1
+            condition.notify_all()
+
+    def _run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._event_loop()).result()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        # The client's connection pools are bound to one loop, so sync callers share a
+        # dedicated background loop instead of creating a fresh one per batch.
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="webhook-delivery-loop", daemon=True
+                )
+                thread.start()
+                self._loop = loop
+                self._loop_thread = thread
+            return self._loop
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Optional
+
+from libs.common.config import Settings, get_settings
+
+Clock = Callable[[], float]
+
+
+@dataclass
+class TargetHealth:
+    concurrency_limit: float
+    state: str = "closed"
+    consecutive_failures: int = 0
+    opened_until: float = 0.0
+    probe_in_flight: bool = False
+    successes: int = 0
+    failures: int = 0
+    short_circuited: int = 0
+    latency_ewma_ms: float = 0.0
+
+
+class TargetHealthRegistry:
+    def __init__(self, settings: Settings | None = None, *, clock: Clock = time.monotonic):
+        runtime_settings = settings or get_settings()
+        self._max_limit = float(max(1, runtime_settings.webhook_per_host_concurrency))
+        self._failure_threshold = max(1, runtime_settings.webhook_circuit_failure_threshold)
+        self._open_seconds = runtime_settings.webhook_circuit_open_seconds
+        self._clock = clock
+        self._targets: dict[str, TargetHealth] = {}
+        self._lock = threading.Lock()
+
+    def concurrency_limit(self, host: str) -> int:
+        with self._lock:
+            return int(self._target(host).concurrency_limit)
+
+    def admit(self, host: str) -> Optional[float]:
+        with self._lock:
+            target = self._target(host)
+            now = self._clock()
+            if target.state == "open":
+                if now < target.opened_until:
+                    target.short_circuited += 1
+                    return target.opened_until - now
+                target.state = "half_open"
+            if target.state == "half_open":
+                if target.probe_in_flight:
+                    target.short_circuited += 1
+                    return self._open_seconds
+                target.probe_in_flight = True
+            return None
+
+    def record_success(self, host: str, latency_ms: float) -> None:
+        with self._lock:
+            target = self._target(host)
+            target.successes += 1
+            target.consecutive_failures = 0
+            target.probe_in_flight = False
+            target.state = "closed"
+            target.concurrency_limit = min(
+                self._max_limit, target.concurrency_limit + 1 / target.concurrency_limit
+            )
+            target.latency_ewma_ms = (
+                latency_ms
+                if target.latency_ewma_ms == 0.0
+                else 0.8 * target.latency_ewma_ms + 0.2 * latency_ms
+            )
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            target = self._target(host)
+            target.failures += 1
+            target.consecutive_failures += 1
+            target.probe_in_flight = False
+            target.concurrency_limit = max(1.0, target.concurrency_limit / 2)
+            if (
+                target.state == "half_open"
+                or target.consecutive_failures >= self._failure_threshold
+            ):
+                target.state = "open"
+                target.opened_until = self._clock() + self._open_seconds
+
+    def snapshot(self) -> dict[str, dict[str, object]]:
+        with self._lock:
+            return {
+                host: {
+                    "state": target.state,
+                    "concurrency_limit": int(target.concurrency_limit),
+                    "consecutive_failures": target.consecutive_failures,
+                    "successes": target.successes,
+                    "failures": target.failures,
+                    "short_circuited": target.short_circuited,
+                    "latency_ewma_ms": round(target.latency_ewma_ms, 2),
+                }
+                for host, target in self._targets.items()
+            }
+
+    def _target(self, host: str) -> TargetHealth:
+        target = self._targets.get(host)
+        if target is None:
+            target = TargetHealth(concurrency_limit=self._max_limit)
+            self._targets[host] = target
+        return target
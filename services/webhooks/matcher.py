@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Generic, Optional, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from libs.common.models import WebhookSubscription
+
+T = TypeVar("T")
+Clock = Callable[[], float]
+
+SINGLE_SEGMENT = "*"
+ANY_SEGMENTS = "#"
+
+
+def validate_topic_filter(pattern: str) -> None:
+    segments = pattern.split(".")
+    if not pattern or any(not segment for segment in segments):
+        raise ValueError(f"invalid event filter: {pattern!r}")
+    for segment in segments:
+        if segment in (SINGLE_SEGMENT, ANY_SEGMENTS):
+            continue
+        if SINGLE_SEGMENT in segment or ANY_SEGMENTS in segment:
+            raise ValueError(f"wildcards must span a whole segment: {pattern!r}")
+
+
+@dataclass
+class _TrieNode(Generic[T]):
+    children: dict[str, _TrieNode[T]] = field(default_factory=dict)
+    values: list[T] = field(default_factory=list)
+
+
+# Filters are dot-separated: "*" matches exactly one segment, "#" zero or more.
+class TopicTrie(Generic[T]):
+    def __init__(self) -> None:
+        self._root: _TrieNode[T] = _TrieNode()
+
+    def insert(self, pattern: str, value: T) -> None:
+        node = self._root
+        for segment in pattern.split("."):
+            node = node.children.setdefault(segment, _TrieNode())
+        node.values.append(value)
+
+    def match(self, topic: str) -> list[T]:
+        matched: list[T] = []
+        seen: set[int] = set()
+        self._collect(self._root, topic.split("."), 0, matched, seen)
+        return matched
+
+    def _collect(
+        self,
+        node: _TrieNode[T],
+        segments: list[str],
+        index: int,
+        matched: list[T],
+        seen: set[int],
+    ) -> None:
+        any_node = node.children.get(ANY_SEGMENTS)
+        if any_node is not None:
+            for position in range(index, len(segments) + 1):
+                self._collect(any_node, segments, position, matched, seen)
+        if index == len(segments):
+            if id(node) not in seen:
+                seen.add(id(node))
+                matched.extend(node.values)
+            return
+        for key in (segments[index], SINGLE_SEGMENT):
+            child = node.children.get(key)
+            if child is not None:
+                self._collect(child, segments, index + 1, matched, seen)
+
+
+@dataclass(frozen=True)
+class SubscriptionRoute:
+    subscription_id: str
+    batch_linger_seconds: Optional[int]
+
+
+class SubscriptionIndex:
+    def __init__(self, *, ttl_seconds: float = 30.0, clock: Clock = time.monotonic):
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._tries: dict[str, tuple[float, TopicTrie[SubscriptionRoute]]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, db: Session, tenant_id: str, event_type: str) -> list[SubscriptionRoute]:
+        return self._trie(db, tenant_id).match(event_type)
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        with self._lock:
+            if tenant_id is None:
+                self._tries.clear()
+            else:
+                self._tries.pop(tenant_id, None)
+
+    def _trie(self, db: Session, tenant_id: str) -> TopicTrie[SubscriptionRoute]:
+        now = self._clock()
+        with self._lock:
+            cached = self._tries.get(tenant_id)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+
+        stmt = select(
+            WebhookSubscription.id,
+            WebhookSubscription.event_filter,
+            WebhookSubscription.batch_enabled,
+            WebhookSubscription.batch_linger_seconds,
+        ).where(
+            WebhookSubscription.tenant_id == tenant_id,
+            WebhookSubscription.active.is_(True),
+        )
+        trie = _compile(db.execute(stmt).all())
+        # The TTL bounds how long another replica's subscription change can go unseen;
+        # changes made through this process invalidate the tenant immediately.
+        with self._lock:
+            self._tries[tenant_id] = (now + self._ttl_seconds, trie)
+        return trie
+
+
+def _compile(
+    rows: Iterable[tuple[str, str, bool, int]],
+) -> TopicTrie[SubscriptionRoute]:
+    trie: TopicTrie[SubscriptionRoute] = TopicTrie()
+    for subscription_id, event_filter, batch_enabled, linger_seconds in rows:
+        trie.insert(
+            event_filter,
+            SubscriptionRoute(
+                subscription_id=subscription_id,
+                batch_linger_seconds=linger_seconds if batch_enabled else None,
+            ),
+        )
+    return trie
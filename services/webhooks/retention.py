@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.config import Settings, get_settings
+from libs.common.logging import configure_logging, log_event
+from services.webhooks.service import WebhookService
+
+SessionFactory = Callable[[], Session]
+
+
+class WebhookRetentionJob:
+    def __init__(
+        self,
+        service: WebhookService,
+        session_factory: SessionFactory,
+        *,
+        settings: Settings | None = None,
+    ):
+        runtime_settings = settings or get_settings()
+        self._service = service
+        self._session_factory = session_factory
+        self._retention_days = runtime_settings.webhook_retention_days
+        self._chunk_size = runtime_settings.webhook_retention_chunk_size
+        self._logger = configure_logging()
+
+    def run(
+        self,
+        *,
+        retention_days: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        max_chunks: Optional[int] = None,
+    ) -> dict[str, int]:
+        days = retention_days if retention_days is not None else self._retention_days
+        size = chunk_size or self._chunk_size
+        older_than = datetime.now(timezone.utc) - timedelta(days=days)
+        totals = {"chunks": 0, "archived": 0}
+        # Each chunk commits on its own, so locks stay short and an interrupted run
+        # simply resumes where it stopped.
+        while max_chunks is None or totals["chunks"] < max_chunks:
+            db = self._session_factory()
+            try:
+                archived = self._service.archive_finished_deliveries(
+                    db, older_than=older_than, chunk_size=size
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            if archived == 0:
+                break
+            totals["chunks"] += 1
+            totals["archived"] += archived
+        log_event(
+            self._logger,
+            "webhook_retention_completed",
+            {"retention_days": days, "chunk_size": size, **totals},
+        )
+        return totals
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Archive finished webhook deliveries")
+    parser.add_argument("--days", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--max-chunks", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from libs.common.database import engine
+
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    WebhookRetentionJob(WebhookService(), session_factory).run(
+        retention_days=args.days, chunk_size=args.chunk_size, max_chunks=args.max_chunks
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
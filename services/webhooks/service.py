@@ -1,28 +1,155 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import hashlib
 import hmac
 import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Optional
 from uuid import uuid4
 
 import httpx
-from sqlalchemy import and_, select
+from sqlalchemy import DateTime, and_, delete, func, insert, literal, or_, select, update
+from sqlalchemy import event as sa_event
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from libs.common.audit import create_audit_event
+from libs.common.compression import codec_available, compress
 from libs.common.config import get_settings
-from libs.common.models import WebhookDelivery, WebhookSubscription
+from libs.common.models import (
+    WebhookDelivery,
+    WebhookDeliveryArchive,
+    WebhookEventPayload,
+    WebhookSubscription,
+)
 from libs.common.secrets import resolve_secret
+from services.webhooks.delivery import (
+    AsyncPostFn,
+    AsyncWebhookDeliveryEngine,
+    DeliveryOutcome,
+    DeliveryRequest,
+)
+from services.webhooks.matcher import SubscriptionIndex, validate_topic_filter
 
 HttpPostFn = Callable[..., httpx.Response]
+SignedBody = tuple[bytes, str]
+
+PAYLOAD_BODY_CACHE_SIZE = 4096
+
+CONTENT_ENCODINGS = {"gzip": "gzip", "zstd": "zstd"}
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "tenant_id",
+    "subscription_id",
+    "event_type",
+    "payload_id",
+    "payload",
+    "status",
+    "attempt_count",
+    "last_error",
+    "idempotency_key",
+    "last_attempt_at",
+    "dead_lettered_at",
+    "delivered_at",
+    "created_at",
+)
+
+
+def _sign(body: bytes, signing_secret: str) -> str:
+    return hmac.new(signing_secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def _as_utc(value: Optional[datetime]) -> datetime:
+    if value is None:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# Replay order key. Rows dead-lettered before dead_lettered_at was recorded sort first,
+# as _as_utc(None), so cursors compare them like any other row on every dialect.
+DEAD_LETTERED_KEY = func.coalesce(
+    WebhookDelivery.dead_lettered_at, literal(_as_utc(None), DateTime(timezone=True))
+)
+
+
+def _insert_ignoring_conflicts(
+    db: Session, model: type[Any], index_elements: list[str]
+) -> postgresql.Insert | sqlite.Insert:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    raise RuntimeError(f"webhook dispatch does not support the {dialect} dialect")
+
+
+def _batch_window_end(now: datetime, linger_seconds: int) -> datetime:
+    # Events dispatched within one linger window share a due time, so a claim picks
+    # them up together and they leave as a single batch.
+    linger = max(1, linger_seconds)
+    return datetime.fromtimestamp(
+        math.ceil(now.timestamp() / linger) * linger, tz=timezone.utc
+    )
+
+
+def _encode_replay_cursor(dead_lettered_at: datetime, delivery_id: str) -> str:
+    raw = json.dumps({"t": dead_lettered_at.isoformat(), "id": delivery_id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_replay_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return _as_utc(datetime.fromisoformat(raw["t"])), str(raw["id"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("invalid replay cursor") from exc
+
+
+@dataclass(frozen=True)
+class DeadLetterReplayProgress:
+    requeued: int
+    remaining: int
+    next_cursor: Optional[str]
+    scheduled_until: Optional[datetime] = None
+
+
+def _threaded_post(http_post: HttpPostFn) -> AsyncPostFn:
+    async def _post(url: str, **kwargs: Any) -> httpx.Response:
+        return await asyncio.to_thread(http_post, url, **kwargs)
+
+    return _post
 
 
 class WebhookService:
-    def __init__(self, http_post: Optional[HttpPostFn] = None):
-        self._http_post = http_post or httpx.post
+    def __init__(
+        self,
+        http_post: Optional[HttpPostFn] = None,
+        delivery_engine: Optional[AsyncWebhookDeliveryEngine] = None,
+        subscription_index: Optional[SubscriptionIndex] = None,
+    ):
+        self._delivery_engine = delivery_engine or AsyncWebhookDeliveryEngine(
+            post=_threaded_post(http_post) if http_post else None
+        )
+        self._subscription_index = subscription_index or SubscriptionIndex(
+            ttl_seconds=get_settings().webhook_subscription_index_ttl_seconds
+        )
+        # Bodies are immutable per payload id; signatures are not cached because the
+        # signing secret can rotate, so every send signs with the current secret.
+        self._payload_bodies: OrderedDict[str, bytes] = OrderedDict()
+        self._payload_bodies_lock = threading.Lock()
+
+    def close(self) -> None:
+        self._delivery_engine.close()
 
     def create_subscription(
         self,
@@ -32,7 +159,15 @@ class WebhookService:
         actor_id: str,
         target_url: str,
         event_filter: str,
+        batch_enabled: bool = False,
+        batch_max_events: int = 100,
+        batch_max_bytes: int = 1_000_000,
+        batch_linger_seconds: int = 5,
+        batch_compression: str = "gzip",
     ) -> WebhookSubscription:
+        validate_topic_filter(event_filter)
+        if batch_enabled and not codec_available(batch_compression):
+            raise ValueError(f"compression codec unavailable: {batch_compression}")
         subscription = WebhookSubscription(
             id=f"whs_{uuid4().hex}",
             tenant_id=tenant_id,
@@ -40,8 +175,20 @@ class WebhookService:
             secret_ref="secret-manager://webhook-signing-secret",
             event_filter=event_filter,
             active=True,
+            batch_enabled=batch_enabled,
+            batch_max_events=batch_max_events,
+            batch_max_bytes=batch_max_bytes,
+            batch_linger_seconds=batch_linger_seconds,
+            batch_compression=batch_compression,
         )
         db.add(subscription)
+        self._subscription_index.invalidate(tenant_id)
+        sa_event.listen(
+            db,
+            "after_commit",
+            lambda _session: self._subscription_index.invalidate(tenant_id),
+            once=True,
+        )
 
         create_audit_event(
             db,
@@ -50,7 +197,11 @@ class WebhookService:
             action="webhook.subscription.created",
             entity_type="webhook_subscription",
             entity_id=subscription.id,
-            payload={"target_url": target_url, "event_filter": event_filter},
+            payload={
+                "target_url": target_url,
+                "event_filter": event_filter,
+                "batch_enabled": batch_enabled,
+            },
         )
         return subscription
 
@@ -62,43 +213,72 @@ class WebhookService:
         event_type: str,
         payload: dict[str, object],
     ) -> int:
-        stmt = select(WebhookSubscription).where(
-            WebhookSubscription.tenant_id == tenant_id,
-            WebhookSubscription.active.is_(True),
-            WebhookSubscription.event_filter == event_type,
-        )
-        subscriptions = list(db.execute(stmt).scalars().all())
-        enqueued = 0
-        for subscription in subscriptions:
-            idempotency_key = (
-                f"{subscription.id}:{event_type}:"
-                f"{hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()}"
-            )
-            existing_stmt = select(WebhookDelivery).where(
-                WebhookDelivery.tenant_id == tenant_id,
-                WebhookDelivery.idempotency_key == idempotency_key,
-            )
-            existing = db.execute(existing_stmt).scalar_one_or_none()
-            if existing:
-                continue
+        return self.dispatch_events(
+            db, tenant_id=tenant_id, event_type=event_type, payloads=[payload]
+        )
 
-            delivery = WebhookDelivery(
-                id=f"whd_{uuid4().hex}",
-                tenant_id=tenant_id,
-                subscription_id=subscription.id,
-                event_type=event_type,
-                payload=payload,
-                status="pending",
-                attempt_count=0,
-                idempotency_key=idempotency_key,
-                next_attempt_at=datetime.now(timezone.utc),
-                last_attempt_at=None,
-                dead_lettered_at=None,
-            )
-            db.add(delivery)
-            enqueued += 1
+    def has_subscribers(self, db: Session, *, tenant_id: str, event_type: str) -> bool:
+        return bool(self._subscription_index.resolve(db, tenant_id, event_type))
 
-        return enqueued
+    def dispatch_events(
+        self,
+        db: Session,
+        *,
+        tenant_id: str,
+        event_type: str,
+        payloads: list[dict[str, Any]],
+    ) -> int:
+        linger_by_subscription = {
+            route.subscription_id: route.batch_linger_seconds
+            for route in self._subscription_index.resolve(db, tenant_id, event_type)
+        }
+        if not linger_by_subscription or not payloads:
+            return 0
+
+        bodies: dict[str, str] = {}
+        for payload in payloads:
+            body = json.dumps(payload, sort_keys=True)
+            bodies.setdefault(hashlib.sha256(body.encode("utf-8")).hexdigest(), body)
+        keys = {
+            (subscription_id, payload_digest): (
+                f"{subscription_id}:{event_type}:{payload_digest}"
+            )
+            for payload_digest in bodies
+            for subscription_id in linger_by_subscription
+        }
+        payload_ids = self._ensure_event_payloads(
+            db, tenant_id=tenant_id, event_type=event_type, bodies=bodies
+        )
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "id": f"whd_{uuid4().hex}",
+                "tenant_id": tenant_id,
+                "subscription_id": subscription_id,
+                "event_type": event_type,
+                "payload_id": payload_ids[payload_digest],
+                "payload": None,
+                "status": "pending",
+                "attempt_count": 0,
+                "idempotency_key": idempotency_key,
+                "next_attempt_at": (
+                    now
+                    if linger_by_subscription[subscription_id] is None
+                    else _batch_window_end(now, linger_by_subscription[subscription_id] or 1)
+                ),
+                "last_attempt_at": None,
+                "dead_lettered_at": None,
+            }
+            for (subscription_id, payload_digest), idempotency_key in keys.items()
+        ]
+        # Keys already enqueued, including by a concurrent dispatcher, are skipped by the
+        # unique constraint instead of failing the transaction.
+        inserted = db.execute(
+            _insert_ignoring_conflicts(db, WebhookDelivery, ["tenant_id", "idempotency_key"])
+            .returning(WebhookDelivery.id),
+            rows,
+        )
+        return len(inserted.all())
 
     def process_delivery_queue(
         self,
@@ -107,10 +287,33 @@ class WebhookService:
         tenant_id: Optional[str] = None,
         batch_size: int = 100,
     ) -> dict[str, int]:
+        worker_id = f"inline-{uuid4().hex}"
+        deliveries = self.claim_deliveries(
+            db,
+            worker_id=worker_id,
+            tenant_id=tenant_id,
+            batch_size=batch_size,
+        )
+        db.flush()
+        return self.deliver_claimed(db, deliveries, worker_id=worker_id)
+
+    def claim_deliveries(
+        self,
+        db: Session,
+        *,
+        worker_id: str,
+        tenant_id: Optional[str] = None,
+        batch_size: int = 100,
+        lease_seconds: Optional[int] = None,
+    ) -> list[WebhookDelivery]:
         now = datetime.now(timezone.utc)
         filters = [
             WebhookDelivery.status.in_(["pending", "retry_scheduled"]),
             WebhookDelivery.next_attempt_at <= now,
+            or_(
+                WebhookDelivery.lease_expires_at.is_(None),
+                WebhookDelivery.lease_expires_at < now,
+            ),
         ]
         if tenant_id:
             filters.append(WebhookDelivery.tenant_id == tenant_id)
@@ -120,28 +323,236 @@ class WebhookService:
             .where(and_(*filters))
             .order_by(WebhookDelivery.next_attempt_at.asc())
             .limit(batch_size)
+            .with_for_update(skip_locked=True)
         )
         deliveries = list(db.execute(stmt).scalars().all())
+        lease_expires_at = now + timedelta(
+            seconds=lease_seconds or get_settings().webhook_lease_seconds
+        )
+        for delivery in deliveries:
+            delivery.lease_owner = worker_id
+            delivery.lease_expires_at = lease_expires_at
+        return deliveries
+
+    def extend_leases(
+        self,
+        db: Session,
+        *,
+        worker_id: str,
+        delivery_ids: list[str],
+        lease_seconds: Optional[int] = None,
+    ) -> int:
+        if not delivery_ids:
+            return 0
+        lease_expires_at = datetime.now(timezone.utc) + timedelta(
+            seconds=lease_seconds or get_settings().webhook_lease_seconds
+        )
+        result = db.execute(
+            update(WebhookDelivery)
+            .where(
+                WebhookDelivery.id.in_(delivery_ids),
+                WebhookDelivery.lease_owner == worker_id,
+            )
+            .values(lease_expires_at=lease_expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        return int(getattr(result, "rowcount", 0) or 0)
+
+    def recover_expired_leases(self, db: Session) -> int:
+        result = db.execute(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.lease_expires_at < datetime.now(timezone.utc))
+            .values(lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        return int(getattr(result, "rowcount", 0) or 0)
+
+    def deliver_claimed(
+        self,
+        db: Session,
+        deliveries: list[WebhookDelivery],
+        *,
+        worker_id: str,
+        checkpoint: Optional[Callable[[], None]] = None,
+    ) -> dict[str, int]:
+        if not deliveries:
+            return {
+                "processed": 0,
+                "delivered": 0,
+                "retried": 0,
+                "dead_lettered": 0,
+                "deferred": 0,
+            }
+
+        now = datetime.now(timezone.utc)
+        settings = get_settings()
+        subscriptions = self._load_subscriptions(db, deliveries)
+        signed_bodies = self._load_signed_bodies(db, deliveries)
+        updates: dict[str, dict[str, Any]] = {}
+        requests: list[DeliveryRequest] = []
+        members: dict[str, list[WebhookDelivery]] = {}
+        batched: dict[str, list[WebhookDelivery]] = {}
+        for delivery in deliveries:
+            subscription = subscriptions.get(delivery.subscription_id)
+            if subscription is None or subscription.tenant_id != delivery.tenant_id:
+                updates[delivery.id] = self._delivery_update(
+                    delivery,
+                    status="dead_lettered",
+                    last_error="subscription_missing_or_inactive",
+                    dead_lettered_at=now,
+                )
+                continue
+            if subscription.batch_enabled:
+                batched.setdefault(subscription.id, []).append(delivery)
+                continue
+            body, signature = signed_bodies[delivery.id]
+            requests.append(
+                DeliveryRequest(
+                    delivery_id=delivery.id,
+                    target_url=subscription.target_url,
+                    body=body,
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-Nexus-Signature": f"sha256={signature}",
+                        "X-Nexus-Event": delivery.event_type,
+                        "X-Idempotency-Key": delivery.idempotency_key,
+                    },
+                )
+            )
+            members[delivery.id] = [delivery]
+
+        for subscription_id, subscription_deliveries in batched.items():
+            subscription = subscriptions[subscription_id]
+            for chunk in self._batch_chunks(subscription, subscription_deliveries, signed_bodies):
+                requests.append(self._batch_request(subscription, chunk, signed_bodies))
+                members[chunk[0].id] = chunk
 
-        delivered = 0
-        retried = 0
-        dead_lettered = 0
+        # Outcomes are written as deliveries finish, in groups of commit_size or after
+        # commit_interval, and checkpoint (the worker's commit) makes each group durable,
+        # so fast targets are not held back by the slowest one in the batch.
+        commit_size = max(1, settings.webhook_outcome_commit_size)
+        commit_interval = settings.webhook_outcome_commit_interval_seconds
+        unwritten = list(updates.values())
+        last_write = time.monotonic()
+        for completed in self._delivery_engine.iter_completed(requests, max_wait=commit_interval):
+            finished_at = datetime.now(timezone.utc)
+            for outcome in completed:
+                for delivery in members[outcome.delivery_id]:
+                    row = self._outcome_update(
+                        delivery,
+                        outcome,
+                        now=finished_at,
+                        max_retries=settings.webhook_max_retries,
+                    )
+                    updates[delivery.id] = row
+                    unwritten.append(row)
+            if len(unwritten) >= commit_size or (
+                unwritten and time.monotonic() - last_write >= commit_interval
+            ):
+                self._write_outcomes(db, unwritten, worker_id=worker_id, checkpoint=checkpoint)
+                unwritten = []
+                last_write = time.monotonic()
+        if unwritten:
+            self._write_outcomes(db, unwritten, worker_id=worker_id, checkpoint=checkpoint)
         for delivery in deliveries:
-            result = self._attempt_delivery(db, delivery)
-            if result == "delivered":
-                delivered += 1
-            elif result == "retry_scheduled":
-                retried += 1
-            elif result == "dead_lettered":
-                dead_lettered += 1
+            db.expire(delivery)
 
+        statuses = [row["status"] for row in updates.values()]
+        deferred = sum(1 for row in updates.values() if row["last_error"] == "circuit_open")
         return {
             "processed": len(deliveries),
-            "delivered": delivered,
-            "retried": retried,
-            "dead_lettered": dead_lettered,
+            "delivered": statuses.count("delivered"),
+            "retried": statuses.count("retry_scheduled") - deferred,
+            "dead_lettered": statuses.count("dead_lettered"),
+            "deferred": deferred,
         }
 
+    def _write_outcomes(
+        self,
+        db: Session,
+        rows: list[dict[str, Any]],
+        *,
+        worker_id: str,
+        checkpoint: Optional[Callable[[], None]],
+    ) -> None:
+        # Only rows still leased by this worker are written, so a worker whose lease
+        # expired mid-batch cannot overwrite the outcome of the replica that took over.
+        db.execute(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.lease_owner == worker_id)
+            .execution_options(synchronize_session=None),
+            rows,
+        )
+        if checkpoint is not None:
+            checkpoint()
+
+    def archive_finished_deliveries(
+        self,
+        db: Session,
+        *,
+        older_than: datetime,
+        chunk_size: int = 1000,
+    ) -> int:
+        # One query per finished status, with the status rendered inline rather than bound,
+        # so the planner can match each range scan to its partial index.
+        rows: list[Any] = []
+        for finished_status, finished_at in (
+            ("delivered", WebhookDelivery.delivered_at),
+            ("dead_lettered", WebhookDelivery.dead_lettered_at),
+        ):
+            if len(rows) >= chunk_size:
+                break
+            chunk_stmt = (
+                select(WebhookDelivery.id, WebhookDelivery.payload_id)
+                .where(
+                    WebhookDelivery.status == literal(finished_status, literal_execute=True),
+                    finished_at < older_than,
+                )
+                .limit(chunk_size - len(rows))
+                .with_for_update(skip_locked=True)
+            )
+            rows.extend(db.execute(chunk_stmt).all())
+        if not rows:
+            return 0
+        delivery_ids = [row.id for row in rows]
+        payload_ids = {row.payload_id for row in rows if row.payload_id}
+
+        db.execute(
+            insert(WebhookDeliveryArchive).from_select(
+                [*ARCHIVED_COLUMNS, "payload_body"],
+                select(
+                    *(getattr(WebhookDelivery, column) for column in ARCHIVED_COLUMNS),
+                    WebhookEventPayload.body,
+                )
+                .outerjoin(
+                    WebhookEventPayload, WebhookEventPayload.id == WebhookDelivery.payload_id
+                )
+                .where(WebhookDelivery.id.in_(delivery_ids)),
+            )
+        )
+        db.execute(
+            delete(WebhookDelivery)
+            .where(WebhookDelivery.id.in_(delivery_ids))
+            .execution_options(synchronize_session=False)
+        )
+        if payload_ids:
+            # Shared payload bodies go once their last delivery is archived; the archive
+            # rows above carry their own copy of the body.
+            db.execute(
+                delete(WebhookEventPayload)
+                .where(
+                    WebhookEventPayload.id.in_(payload_ids),
+                    ~select(WebhookDelivery.id)
+                    .where(WebhookDelivery.payload_id == WebhookEventPayload.id)
+                    .exists(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        return len(delivery_ids)
+
+    def target_health(self) -> dict[str, dict[str, object]]:
+        return self._delivery_engine.health.snapshot()
+
     def replay_dead_lettered(
         self,
         db: Session,
@@ -150,76 +561,377 @@ class WebhookService:
         delivery_ids: Optional[list[str]] = None,
         limit: int = 100,
     ) -> int:
-        stmt = select(WebhookDelivery).where(
+        # Unlike paged replay, this picks the newest dead letters first, as it always has.
+        stmt = select(WebhookDelivery.id).where(
             WebhookDelivery.tenant_id == tenant_id,
             WebhookDelivery.status == "dead_lettered",
         )
         if delivery_ids:
             stmt = stmt.where(WebhookDelivery.id.in_(delivery_ids))
-        stmt = stmt.order_by(WebhookDelivery.dead_lettered_at.desc()).limit(limit)
+        stmt = stmt.order_by(DEAD_LETTERED_KEY.desc(), WebhookDelivery.id.desc()).limit(limit)
+        newest_ids = list(db.execute(stmt).scalars().all())
+        if not newest_ids:
+            return 0
+        return self.replay_dead_letter_page(
+            db,
+            tenant_id=tenant_id,
+            delivery_ids=newest_ids,
+            limit=limit,
+        ).requeued
+
+    def replay_dead_letter_page(
+        self,
+        db: Session,
+        *,
+        tenant_id: str,
+        delivery_ids: Optional[list[str]] = None,
+        limit: int = 100,
+        rate_per_second: Optional[float] = None,
+        burst: int = 1,
+        cursor: Optional[str] = None,
+    ) -> DeadLetterReplayProgress:
+        filters = [
+            WebhookDelivery.tenant_id == tenant_id,
+            WebhookDelivery.status == "dead_lettered",
+        ]
+        if delivery_ids:
+            filters.append(WebhookDelivery.id.in_(delivery_ids))
+        if cursor:
+            after_dead_lettered_at, after_id = _decode_replay_cursor(cursor)
+            filters.append(
+                or_(
+                    DEAD_LETTERED_KEY > after_dead_lettered_at,
+                    and_(
+                        DEAD_LETTERED_KEY == after_dead_lettered_at,
+                        WebhookDelivery.id > after_id,
+                    ),
+                )
+            )
 
+        stmt = (
+            select(WebhookDelivery)
+            .where(*filters)
+            .order_by(DEAD_LETTERED_KEY.asc(), WebhookDelivery.id.asc())
+            .limit(limit)
+        )
         deliveries = list(db.execute(stmt).scalars().all())
+        if not deliveries:
+            return DeadLetterReplayProgress(requeued=0, remaining=0, next_cursor=None)
+
+        last = deliveries[-1]
+        # Captured before the loop below clears dead_lettered_at on the replayed rows.
+        last_key = _as_utc(last.dead_lettered_at)
+        next_cursor = _encode_replay_cursor(last_key, last.id)
         now = datetime.now(timezone.utc)
+        schedule = (
+            self._paced_schedule(db, deliveries, now, rate_per_second, max(1, burst))
+            if rate_per_second
+            else {delivery.id: now for delivery in deliveries}
+        )
         for delivery in deliveries:
             delivery.status = "pending"
             delivery.attempt_count = 0
             delivery.last_error = None
-            delivery.next_attempt_at = now
+            delivery.next_attempt_at = schedule[delivery.id]
             delivery.dead_lettered_at = None
-        return len(deliveries)
+        db.flush()
 
-    def _attempt_delivery(self, db: Session, delivery: WebhookDelivery) -> str:
-        subscription_stmt = select(WebhookSubscription).where(
-            WebhookSubscription.id == delivery.subscription_id,
-            WebhookSubscription.tenant_id == delivery.tenant_id,
-            WebhookSubscription.active.is_(True),
+        remaining_filters = filters[:2] + [
+            or_(
+                DEAD_LETTERED_KEY > last_key,
+                and_(
+                    DEAD_LETTERED_KEY == last_key,
+                    WebhookDelivery.id > last.id,
+                ),
+            )
+        ]
+        if delivery_ids:
+            remaining_filters.append(WebhookDelivery.id.in_(delivery_ids))
+        remaining = int(
+            db.scalar(
+                select(func.count()).select_from(WebhookDelivery).where(*remaining_filters)
+            )
+            or 0
+        )
+        return DeadLetterReplayProgress(
+            requeued=len(deliveries),
+            remaining=remaining,
+            next_cursor=next_cursor if remaining else None,
+            scheduled_until=max(schedule.values()),
         )
-        subscription = db.execute(subscription_stmt).scalar_one_or_none()
-        if subscription is None:
-            delivery.status = "dead_lettered"
-            delivery.last_error = "subscription_missing_or_inactive"
-            delivery.dead_lettered_at = datetime.now(timezone.utc)
-            return "dead_lettered"
 
-        settings = get_settings()
-        body = json.dumps(delivery.payload).encode("utf-8")
-        signing_secret = resolve_secret("WEBHOOK_SIGNING_SECRET", "webhook-signing-secret")
-        signature = hmac.new(
-            signing_secret.encode("utf-8"),
-            body,
-            hashlib.sha256,
+    def _paced_schedule(
+        self,
+        db: Session,
+        deliveries: list[WebhookDelivery],
+        now: datetime,
+        rate_per_second: float,
+        burst: int,
+    ) -> dict[str, datetime]:
+        interval = timedelta(seconds=1 / rate_per_second)
+        subscription_ids = {delivery.subscription_id for delivery in deliveries}
+        # Continue after anything an earlier replay page already scheduled for the same
+        # subscription, so resumed pages do not stack a second burst on the subscriber.
+        scheduled_stmt = (
+            select(WebhookDelivery.subscription_id, func.max(WebhookDelivery.next_attempt_at))
+            .where(
+                WebhookDelivery.subscription_id.in_(subscription_ids),
+                WebhookDelivery.status.in_(["pending", "retry_scheduled"]),
+                WebhookDelivery.next_attempt_at > now,
+            )
+            .group_by(WebhookDelivery.subscription_id)
+        )
+        last_scheduled = {
+            subscription_id: _as_utc(scheduled_at)
+            for subscription_id, scheduled_at in db.execute(scheduled_stmt).all()
+        }
+
+        schedule: dict[str, datetime] = {}
+        positions: dict[str, int] = {}
+        for delivery in deliveries:
+            position = positions.get(delivery.subscription_id, 0)
+            positions[delivery.subscription_id] = position + 1
+            previous = last_scheduled.get(delivery.subscription_id)
+            if previous is not None:
+                schedule[delivery.id] = previous + interval * (position + 1)
+            else:
+                schedule[delivery.id] = now + interval * max(0, position - burst + 1)
+        return schedule
+
+    def _batch_chunks(
+        self,
+        subscription: WebhookSubscription,
+        deliveries: list[WebhookDelivery],
+        signed_bodies: dict[str, SignedBody],
+    ) -> list[list[WebhookDelivery]]:
+        max_events = max(1, subscription.batch_max_events)
+        chunks: list[list[WebhookDelivery]] = []
+        current: list[WebhookDelivery] = []
+        current_bytes = 0
+        for delivery in deliveries:
+            size = len(signed_bodies[delivery.id][0])
+            if current and (
+                len(current) >= max_events
+                or current_bytes + size > subscription.batch_max_bytes
+            ):
+                chunks.append(current)
+                current, current_bytes = [], 0
+            current.append(delivery)
+            current_bytes += size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _batch_request(
+        self,
+        subscription: WebhookSubscription,
+        deliveries: list[WebhookDelivery],
+        signed_bodies: dict[str, SignedBody],
+    ) -> DeliveryRequest:
+        # Stored payload bodies are already canonical JSON, so the array is assembled
+        # from bytes instead of re-serializing every event.
+        items = [
+            b'{"event_type":'
+            + json.dumps(delivery.event_type).encode("utf-8")
+            + b',"idempotency_key":'
+            + json.dumps(delivery.idempotency_key).encode("utf-8")
+            + b',"payload":'
+            + signed_bodies[delivery.id][0]
+            + b"}"
+            for delivery in deliveries
+        ]
+        body = b"[" + b",".join(items) + b"]"
+        batch_key = hashlib.sha256(
+            "\n".join(delivery.idempotency_key for delivery in deliveries).encode("utf-8")
         ).hexdigest()
         headers = {
             "Content-Type": "application/json",
-            "X-Nexus-Signature": f"sha256={signature}",
-            "X-Nexus-Event": delivery.event_type,
-            "X-Idempotency-Key": delivery.idempotency_key,
+            "X-Nexus-Signature": f"sha256={_sign(body, self._signing_secret())}",
+            "X-Nexus-Event": "batch",
+            "X-Nexus-Batch-Size": str(len(deliveries)),
+            "X-Idempotency-Key": f"batch:{subscription.id}:{batch_key}",
         }
+        encoding = CONTENT_ENCODINGS.get(subscription.batch_compression)
+        if encoding is not None:
+            body = compress(body, subscription.batch_compression)
+            headers["Content-Encoding"] = encoding
+        return DeliveryRequest(
+            delivery_id=deliveries[0].id,
+            target_url=subscription.target_url,
+            body=body,
+            headers=headers,
+        )
 
-        now = datetime.now(timezone.utc)
-        delivery.last_attempt_at = now
-        delivery.attempt_count += 1
-
-        try:
-            response = self._http_post(
-                subscription.target_url,
-                content=body,
-                headers=headers,
-                timeout=settings.integration_timeout_seconds,
+    def _load_subscriptions(
+        self, db: Session, deliveries: list[WebhookDelivery]
+    ) -> dict[str, WebhookSubscription]:
+        subscription_stmt = select(WebhookSubscription).where(
+            WebhookSubscription.id.in_({delivery.subscription_id for delivery in deliveries}),
+            WebhookSubscription.active.is_(True),
+        )
+        return {
+            subscription.id: subscription
+            for subscription in db.execute(subscription_stmt).scalars().all()
+        }
+
+    def _ensure_event_payloads(
+        self,
+        db: Session,
+        *,
+        tenant_id: str,
+        event_type: str,
+        bodies: dict[str, str],
+    ) -> dict[str, str]:
+        existing_stmt = select(WebhookEventPayload.payload_hash, WebhookEventPayload.id).where(
+            WebhookEventPayload.tenant_id == tenant_id,
+            WebhookEventPayload.event_type == event_type,
+            WebhookEventPayload.payload_hash.in_(bodies),
+        )
+        payload_ids: dict[str, str] = {
+            payload_hash: payload_id for payload_hash, payload_id in db.execute(existing_stmt).all()
+        }
+        missing = {
+            payload_hash: body
+            for payload_hash, body in bodies.items()
+            if payload_hash not in payload_ids
+        }
+        if not missing:
+            return payload_ids
+        inserted = db.execute(
+            _insert_ignoring_conflicts(
+                db, WebhookEventPayload, ["tenant_id", "event_type", "payload_hash"]
+            ).returning(WebhookEventPayload.payload_hash, WebhookEventPayload.id),
+            [
+                {
+                    "id": f"whp_{uuid4().hex}",
+                    "tenant_id": tenant_id,
+                    "event_type": event_type,
+                    "payload_hash": payload_hash,
+                    "body": body,
+                }
+                for payload_hash, body in missing.items()
+            ],
+        )
+        payload_ids.update((payload_hash, payload_id) for payload_hash, payload_id in inserted)
+        if len(payload_ids) < len(bodies):
+            # A concurrent dispatcher stored the same body first; use its row.
+            payload_ids.update(
+                (payload_hash, payload_id)
+                for payload_hash, payload_id in db.execute(existing_stmt)
             )
-            response.raise_for_status()
-            delivery.status = "delivered"
-            delivery.delivered_at = now
-            delivery.last_error = None
-            return "delivered"
-        except Exception as exc:  # noqa: BLE001
-            delivery.last_error = str(exc)
-            if delivery.attempt_count >= settings.webhook_max_retries:
-                delivery.status = "dead_lettered"
-                delivery.dead_lettered_at = now
-                return "dead_lettered"
-
-            backoff_seconds = min(2 ** (delivery.attempt_count - 1), 300)
-            delivery.status = "retry_scheduled"
-            delivery.next_attempt_at = now + timedelta(seconds=backoff_seconds)
-            return "retry_scheduled"
+        for payload_hash, body in missing.items():
+            self._remember_payload_body(payload_ids[payload_hash], body.encode("utf-8"))
+        return payload_ids
+
+    def _load_signed_bodies(
+        self, db: Session, deliveries: list[WebhookDelivery]
+    ) -> dict[str, SignedBody]:
+        bodies: dict[str, bytes] = {}
+        with self._payload_bodies_lock:
+            for delivery in deliveries:
+                payload_id = delivery.payload_id
+                if payload_id and payload_id in self._payload_bodies:
+                    self._payload_bodies.move_to_end(payload_id)
+                    bodies[payload_id] = self._payload_bodies[payload_id]
+        missing_ids = {
+            delivery.payload_id
+            for delivery in deliveries
+            if delivery.payload_id and delivery.payload_id not in bodies
+        }
+        if missing_ids:
+            payload_stmt = select(WebhookEventPayload.id, WebhookEventPayload.body).where(
+                WebhookEventPayload.id.in_(missing_ids)
+            )
+            for payload_id, body in db.execute(payload_stmt).all():
+                bodies[payload_id] = body.encode("utf-8")
+                self._remember_payload_body(payload_id, bodies[payload_id])
+
+        signing_secret = self._signing_secret()
+        signatures: dict[str, str] = {}
+        signed: dict[str, SignedBody] = {}
+        for delivery in deliveries:
+            payload_id = delivery.payload_id or ""
+            if payload_id in bodies:
+                if payload_id not in signatures:
+                    signatures[payload_id] = _sign(bodies[payload_id], signing_secret)
+                signed[delivery.id] = (bodies[payload_id], signatures[payload_id])
+            else:
+                # Rows enqueued before payloads were stored per event carry inline JSON.
+                body_bytes = json.dumps(delivery.payload).encode("utf-8")
+                signed[delivery.id] = (body_bytes, _sign(body_bytes, signing_secret))
+        return signed
+
+    def _remember_payload_body(self, payload_id: str, body: bytes) -> None:
+        with self._payload_bodies_lock:
+            self._payload_bodies[payload_id] = body
+            self._payload_bodies.move_to_end(payload_id)
+            while len(self._payload_bodies) > PAYLOAD_BODY_CACHE_SIZE:
+                self._payload_bodies.popitem(last=False)
+
+    def _signing_secret(self) -> str:
+        return resolve_secret("WEBHOOK_SIGNING_SECRET", "webhook-signing-secret")
+
+    def _outcome_update(
+        self,
+        delivery: WebhookDelivery,
+        outcome: DeliveryOutcome,
+        *,
+        now: datetime,
+        max_retries: int,
+    ) -> dict[str, Any]:
+        if outcome.retry_after_seconds is not None:
+            # Open circuit: the target was not contacted, so the attempt is not counted.
+            delay = outcome.retry_after_seconds + random.uniform(0, outcome.retry_after_seconds / 4)
+            return self._delivery_update(
+                delivery,
+                status="retry_scheduled",
+                last_error="circuit_open",
+                next_attempt_at=now + timedelta(seconds=delay),
+            )
+
+        attempt_count = delivery.attempt_count + 1
+        if outcome.delivered:
+            return self._delivery_update(
+                delivery,
+                status="delivered",
+                attempt_count=attempt_count,
+                last_attempt_at=now,
+                last_error=None,
+                delivered_at=now,
+            )
+        if attempt_count >= max_retries:
+            return self._delivery_update(
+                delivery,
+                status="dead_lettered",
+                attempt_count=attempt_count,
+                last_attempt_at=now,
+                last_error=outcome.error,
+                dead_lettered_at=now,
+            )
+
+        backoff_seconds = min(2 ** (attempt_count - 1), 300)
+        backoff_seconds = random.uniform(backoff_seconds / 2, backoff_seconds)
+        return self._delivery_update(
+            delivery,
+            status="retry_scheduled",
+            attempt_count=attempt_count,
+            last_attempt_at=now,
+            last_error=outcome.error,
+            next_attempt_at=now + timedelta(seconds=backoff_seconds),
+        )
+
+    def _delivery_update(self, delivery: WebhookDelivery, **changes: Any) -> dict[str, Any]:
+        row: dict[str, Any] = {
+            "id": delivery.id,
+            "status": delivery.status,
+            "attempt_count": delivery.attempt_count,
+            "last_error": delivery.last_error,
+            "next_attempt_at": delivery.next_attempt_at,
+            "last_attempt_at": delivery.last_attempt_at,
+            "dead_lettered_at": delivery.dead_lettered_at,
+            "delivered_at": delivery.delivered_at,
+            "lease_owner": None,
+            "lease_expires_at": None,
+        }
+        row.update(changes)
+        return row
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import threading
+from collections.abc import Callable
+from types import FrameType
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.config import Settings, get_settings
+from libs.common.logging import configure_logging, log_event
+from services.webhooks.service import WebhookService
+
+SessionFactory = Callable[[], Session]
+
+
+class WebhookWorker:
+    def __init__(
+        self,
+        service: WebhookService,
+        session_factory: SessionFactory,
+        *,
+        settings: Settings | None = None,
+        worker_id: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+    ):
+        runtime_settings = settings or get_settings()
+        self._service = service
+        self._session_factory = session_factory
+        self._tenant_id = tenant_id
+        self._batch_size = runtime_settings.webhook_worker_batch_size
+        self._lease_seconds = runtime_settings.webhook_lease_seconds
+        self._poll_interval = runtime_settings.webhook_worker_poll_interval_seconds
+        self._heartbeat_interval = runtime_settings.webhook_worker_heartbeat_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._logger = configure_logging()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def request_stop(self) -> None:
+        self._stop.set()
+
+    def install_signal_handlers(self) -> None:
+        def _handle(signum: int, _frame: Optional[FrameType]) -> None:
+            log_event(
+                self._logger,
+                "webhook_worker_stop_requested",
+                {"worker_id": self.worker_id, "signal": signum},
+            )
+            self.request_stop()
+
+        signal.signal(signal.SIGTERM, _handle)
+        signal.signal(signal.SIGINT, _handle)
+
+    def run(self, *, drain: bool = False) -> dict[str, int]:
+        totals = {
+            "batches": 0,
+            "processed": 0,
+            "delivered": 0,
+            "retried": 0,
+            "dead_lettered": 0,
+            "deferred": 0,
+        }
+        log_event(self._logger, "webhook_worker_started", {"worker_id": self.worker_id})
+        while not self._stop.is_set():
+            outcome = self.run_once()
+            totals["batches"] += 1
+            for key in ("processed", "delivered", "retried", "dead_lettered", "deferred"):
+                totals[key] += outcome[key]
+            if outcome["processed"] == 0:
+                if drain:
+                    break
+                self._stop.wait(self._poll_interval)
+        self._service.close()
+        log_event(self._logger, "webhook_worker_stopped", {"worker_id": self.worker_id, **totals})
+        return totals
+
+    def run_once(self) -> dict[str, int]:
+        db = self._session_factory()
+        try:
+            recovered = self._service.recover_expired_leases(db)
+            deliveries = self._service.claim_deliveries(
+                db,
+                worker_id=self.worker_id,
+                tenant_id=self._tenant_id,
+                batch_size=self._batch_size,
+                lease_seconds=self._lease_seconds,
+            )
+            db.commit()
+            if recovered:
+                log_event(
+                    self._logger,
+                    "webhook_leases_recovered",
+                    {"worker_id": self.worker_id, "recovered": recovered},
+                )
+            if not deliveries:
+                return {
+                    "processed": 0,
+                    "delivered": 0,
+                    "retried": 0,
+                    "dead_lettered": 0,
+                    "deferred": 0,
+                }
+
+            heartbeat_done = threading.Event()
+            heartbeat = threading.Thread(
+                target=self._heartbeat,
+                args=([delivery.id for delivery in deliveries], heartbeat_done),
+                name="webhook-lease-heartbeat",
+                daemon=True,
+            )
+            heartbeat.start()
+            try:
+                outcome = self._service.deliver_claimed(
+                    db, deliveries, worker_id=self.worker_id, checkpoint=db.commit
+                )
+            finally:
+                heartbeat_done.set()
+                heartbeat.join()
+            db.commit()
+            log_event(
+                self._logger,
+                "webhook_worker_batch",
+                {
+                    "worker_id": self.worker_id,
+                    **outcome,
+                    "targets": self._service.target_health(),
+                },
+            )
+            return outcome
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _heartbeat(self, delivery_ids: list[str], done: threading.Event) -> None:
+        while not done.wait(self._heartbeat_interval):
+            db = self._session_factory()
+            try:
+                self._service.extend_leases(
+                    db,
+                    worker_id=self.worker_id,
+                    delivery_ids=delivery_ids,
+                    lease_seconds=self._lease_seconds,
+                )
+                db.commit()
+            except Exception as exc:  # noqa: BLE001
+                db.rollback()
+                log_event(
+                    self._logger,
+                    "webhook_lease_heartbeat_failed",
+                    {"worker_id": self.worker_id, "error": str(exc)},
+                )
+            finally:
+                db.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="NexusCargo webhook delivery worker")
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="exit once the queue is empty (Cloud Run job mode)",
+    )
+    parser.add_argument("--tenant-id", default=None)
+    args = parser.parse_args(argv)
+
+    from libs.common.database import engine
+
+    session_factory = sessionmaker(
+        bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True
+    )
+    worker = WebhookWorker(WebhookService(), session_factory, tenant_id=args.tenant_id)
+    worker.install_signal_handlers()
+    worker.run(drain=args.drain)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,13 +2,18 @@ from __future__ import annotations
 
 import importlib.util
 import os
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 from pathlib import Path
 from typing import cast
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from httpx import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.models import Base, Tenant, User
 
 
 @pytest.fixture(scope="session")
@@ -39,3 +44,36 @@ def api_app() -> FastAPI:
 def client(api_app: FastAPI) -> Generator[TestClient, None, None]:
     with TestClient(api_app) as test_client:
         yield test_client
+
+
+@pytest.fixture
+def assert_max_queries() -> Callable[[Response, int], None]:
+    # Query budgets per endpoint, read from the gateway's X-DB-Statements header, so
+    # an N+1 regression fails the test that exercises the endpoint.
+    def _check(response: Response, budget: int) -> None:
+        statements = int(response.headers["X-DB-Statements"])
+        assert statements <= budget, (
+            f"{response.request.method} {response.request.url.path} ran {statements} "
+            f"SQL statements, budget {budget}"
+        )
+
+    return _check
+
+
+@pytest.fixture
+def session_factory(tmp_path: Path) -> sessionmaker[Session]:
+    # File-backed rather than :memory:, so tests can open sessions on several threads.
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'app.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    with factory() as session:
+        session.add(Tenant(id="tenant_1", name="Tenant 1", status="active"))
+        session.add(User(id="user_1", email="user1@example.com", display_name="User 1"))
+        session.commit()
+    return factory
+
+
+@pytest.fixture
+def db(session_factory: sessionmaker[Session]) -> Generator[Session, None, None]:
+    with session_factory() as session:
+        yield session
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from libs.common.db_pool import PoolTelemetry, install_liveness_check, instrumented_pool_class
+
+
+def _engine(
+    tmp_path: Path, telemetry: PoolTelemetry, *, idle_seconds: float, **options: object
+) -> Engine:
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'pool.db'}",
+        poolclass=instrumented_pool_class(QueuePool, telemetry),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+        **options,
+    )
+    install_liveness_check(engine, telemetry, idle_seconds)
+    return engine
+
+
+def test_checkout_waits_and_timeouts_are_recorded(tmp_path: Path) -> None:
+    telemetry = PoolTelemetry()
+    engine = _engine(tmp_path, telemetry, idle_seconds=60)
+
+    with engine.connect() as held:
+        held.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        snapshot = telemetry.snapshot(engine.pool)
+        assert snapshot["checked_out"] == 1
+        assert snapshot["timeouts"] == 1
+
+    snapshot = telemetry.snapshot(engine.pool)
+    assert snapshot["checkouts"] == 1
+    assert snapshot["checked_out"] == 0
+    assert sum(snapshot["wait_ms"]["histogram"].values()) == 1
+    # Recently used connections are handed out without a liveness round trip.
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert telemetry.snapshot(engine.pool)["liveness_checks"] == 0
+
+
+def test_idle_connection_that_fails_liveness_is_replaced(tmp_path: Path) -> None:
+    telemetry = PoolTelemetry()
+    # Skip the rollback on checkin so the dropped connection is only noticed at checkout.
+    engine = _engine(tmp_path, telemetry, idle_seconds=1e-9, pool_reset_on_return=None)
+
+    with engine.connect() as connection:
+        # Simulate the server or a proxy dropping the connection while it sits idle.
+        connection.connection.dbapi_connection.close()  # type: ignore[union-attr]
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+
+    snapshot = telemetry.snapshot(engine.pool)
+    assert snapshot["liveness_checks"] >= 1
+    assert snapshot["liveness_failures"] == 1
+    assert snapshot["invalidations"] >= 1
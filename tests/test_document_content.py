@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from libs.common.byte_ranges import RangeNotSatisfiableError, etag_matches, parse_range
+
+CONTENT = bytes(range(256)) * 64
+
+
+def _headers(client: TestClient) -> dict[str, str]:
+    response = client.post(
+        "/api/v1/auth/token",
+        json={
+            "user_id": "user_1",
+            "email": "ops@example.com",
+            "tenant_ids": ["tenant_1"],
+            "roles": ["admin", "operator", "reviewer"],
+        },
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}", "X-Tenant-Id": "tenant_1"}
+
+
+def test_document_content_supports_ranges_and_conditional_get(client: TestClient) -> None:
+    headers = _headers(client)
+    ingest = client.post(
+        "/api/v1/ingestion/documents",
+        json={
+            "file_name": "awb-content-range.pdf",
+            "content_type": "application/pdf",
+            "content_base64": base64.b64encode(CONTENT).decode("utf-8"),
+        },
+        headers={**headers, "Idempotency-Key": "idem-content-range"},
+    )
+    assert ingest.status_code == 200
+    assert ingest.json()["review_required"] is False
+    url = f"/api/v1/documents/{ingest.json()['document_id']}/content"
+
+    full = client.get(url, headers=headers)
+    assert full.status_code == 200
+    assert full.content == CONTENT
+    assert full.headers["content-type"] == "application/pdf"
+    etag = full.headers["etag"]
+    assert etag == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+
+    partial = client.get(url, headers={**headers, "Range": "bytes=100-299"})
+    assert partial.status_code == 206
+    assert partial.content == CONTENT[100:300]
+    assert partial.headers["content-range"] == f"bytes 100-299/{len(CONTENT)}"
+
+    tail = client.get(url, headers={**headers, "Range": "bytes=-10", "If-Range": etag})
+    assert tail.status_code == 206
+    assert tail.content == CONTENT[-10:]
+
+    stale_if_range = client.get(url, headers={**headers, "Range": "bytes=0-9", "If-Range": '"old"'})
+    assert stale_if_range.status_code == 200
+
+    not_modified = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    unsatisfiable = client.get(url, headers={**headers, "Range": f"bytes={len(CONTENT)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    assert client.get(f"{url}x", headers=headers).status_code == 404
+
+
+def test_signed_url_for_compressed_version_points_at_content_endpoint(
+    client: TestClient,
+) -> None:
+    from libs.common.database import SessionLocal
+    from libs.common.models import DocumentVersion
+
+    headers = _headers(client)
+    ingest = client.post(
+        "/api/v1/ingestion/documents",
+        json={
+            "file_name": "awb-content-signed.pdf",
+            "content_type": "application/pdf",
+            "content_base64": base64.b64encode(CONTENT).decode("utf-8"),
+        },
+        headers={**headers, "Idempotency-Key": "idem-content-signed"},
+    )
+    document_id = ingest.json()["document_id"]
+    url = f"/api/v1/documents/{document_id}/signed-url"
+    assert client.get(url, headers=headers).json()["signed_url"].startswith("file://")
+
+    with SessionLocal() as db:
+        version = db.query(DocumentVersion).filter_by(document_id=document_id).one()
+        version.storage_encoding = "zstd"
+        db.commit()
+    signed_url = client.get(url, headers=headers).json()["signed_url"]
+    assert signed_url.endswith(f"/api/v1/documents/{document_id}/content")
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, None),
+        ("bytes=0-0", (0, 0)),
+        ("bytes=5-", (5, 9)),
+        ("bytes=-3", (7, 9)),
+        ("bytes=2-100", (2, 9)),
+        ("bytes=0-1,4-5", None),
+        ("items=0-1", None),
+        ("bytes=4-2", None),
+        ("bytes=a-b", None),
+    ],
+)
+def test_parse_range(header: str | None, expected: tuple[int, int] | None) -> None:
+    assert parse_range(header, 10) == expected
+
+
+def test_parse_range_rejects_ranges_past_the_end() -> None:
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range("bytes=10-", 10)
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert not etag_matches('"abc"', '"def"')
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.consumers import transactional
+from libs.common.dedupe import EventDedupeStore
+from libs.common.event_codec import EventCodec, new_envelope
+from libs.common.sqlite_queue import ConsumedEvent, SQLiteEventQueue
+
+
+@pytest.mark.parametrize("codec_name", ["json", "orjson"])
+def test_envelope_roundtrip_compresses_only_above_threshold(codec_name: str) -> None:
+    codec = EventCodec(codec_name, compression="gzip", compression_threshold_bytes=512)
+    small = new_envelope("document.received", {"tenant_id": "tenant_1", "document_id": "doc_1"})
+    large = new_envelope("document.received", {"tenant_id": "tenant_1", "blob": "x" * 4096})
+
+    small_encoded = codec.encode(small)
+    large_encoded = codec.encode(large)
+
+    assert "content_encoding" not in small_encoded.attributes
+    assert large_encoded.attributes["content_encoding"] == "gzip"
+    assert len(large_encoded.data) < 4096
+    decoded = codec.decode(large_encoded.data, large_encoded.attributes)
+    assert decoded.event_id == large.event_id
+    assert decoded.tenant_id == "tenant_1"
+    assert decoded.schema_version == 1
+    assert decoded.payload == large.payload
+    assert codec.decode(small_encoded.data, small_encoded.attributes).payload == small.payload
+
+
+def test_decode_accepts_bare_payloads_published_before_envelopes() -> None:
+    data = json.dumps({"tenant_id": "tenant_1", "document_id": "doc_1"}).encode("utf-8")
+
+    first = EventCodec().decode(data, {})
+    second = EventCodec().decode(data, {})
+
+    assert first.schema_version == 0
+    assert first.payload["document_id"] == "doc_1"
+    assert first.event_id == second.event_id
+
+
+def test_publisher_event_id_survives_queue_roundtrip(tmp_path: Path) -> None:
+    queue = SQLiteEventQueue(str(tmp_path / "queue.db"))
+    queue.publish("document.received", {"tenant_id": "tenant_1"}, {"event_id": "evt_1"})
+
+    [event] = queue.receive(["document.received"], 10)
+
+    assert event.event_id == "evt_1"
+    assert event.payload == {"tenant_id": "tenant_1"}
+    assert event.attributes["content_type"] == "application/json"
+
+
+def test_redelivered_events_are_processed_once(session_factory: sessionmaker[Session]) -> None:
+    calls: list[str] = []
+    event = ConsumedEvent("1", "document.received", {}, {}, 1, event_id="evt_1")
+
+    handler = transactional(
+        session_factory,
+        lambda _db, consumed: calls.append(consumed.event_id),
+        dedupe=EventDedupeStore(capacity=1),
+        consumer="classification",
+    )
+    handler(event)
+    handler(event)
+    # A fresh store (another replica or a restart) still finds the persisted marker.
+    transactional(
+        session_factory,
+        lambda _db, consumed: calls.append(consumed.event_id),
+        dedupe=EventDedupeStore(),
+        consumer="classification",
+    )(event)
+
+    assert calls == ["evt_1"]
+
+
+def test_dedupe_lru_is_bounded_and_markers_expire(session_factory: sessionmaker[Session]) -> None:
+    now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+    store = EventDedupeStore(capacity=2, ttl_seconds=60, clock=lambda: now)
+    for event_id in ("a", "b", "c"):
+        store.remember("stage", event_id)
+    assert store.metrics()["cached"] == 2
+    assert store.metrics()["evicted"] == 1
+
+    with session_factory() as db:
+        store.mark(db, "stage", "old")
+        db.commit()
+        later = EventDedupeStore(ttl_seconds=60, clock=lambda: now + timedelta(minutes=5))
+        assert later.seen(db, "stage", "old") is False
+        assert later.purge_expired(db) == 1
+
+
+def test_decode_validates_envelopes() -> None:
+    codec = EventCodec("json")
+    attributes = {"content_type": "application/json"}
+    envelope = {
+        "schema_version": 1,
+        "event_id": "evt_1",
+        "event_type": "document.received",
+        "occurred_at": "2026-10-19T00:00:00+00:00",
+        "payload": {"document_id": "doc_1"},
+    }
+    decoded = codec.decode(json.dumps(envelope).encode(), attributes)
+    assert decoded.occurred_at.year == 2026
+
+    with pytest.raises(ValidationError):
+        codec.decode(json.dumps({**envelope, "payload": "not-a-dict"}).encode(), attributes)
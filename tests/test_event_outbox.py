@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.config import Settings
+from libs.common.events import InMemoryEventBus
+from libs.common.models import OutboxEvent
+from libs.common.outbox import OutboxEventBus
+from libs.common.publish_scope import PublishScope
+from services.outbox.relay import OutboxRelay
+
+
+class UnconfirmedEventBus(InMemoryEventBus):
+    def flush(self, timeout: float | None = None, *, scope: PublishScope | None = None) -> int:
+        return len(self.events)
+
+
+class FailingTenantEventBus(InMemoryEventBus):
+    def __init__(self, failing_tenant: str):
+        super().__init__()
+        self.ordering_keys: list[str] = []
+        self._failing_tenant = failing_tenant
+        self._batch_keys: list[str] = []
+
+    def publish(
+        self,
+        topic: str,
+        payload: dict[str, Any],
+        attributes: dict[str, str] | None = None,
+        *,
+        db: Session | None = None,
+        ordering_key: str = "",
+    ) -> None:
+        self.ordering_keys.append(ordering_key)
+        self._batch_keys.append(ordering_key)
+        super().publish(topic, payload, attributes, db=db, ordering_key=ordering_key)
+
+    def flush(self, timeout: float | None = None, *, scope: PublishScope | None = None) -> int:
+        keys, self._batch_keys = self._batch_keys, []
+        return keys.count(self._failing_tenant)
+
+
+def test_outbox_publishes_only_committed_events_in_tenant_order(
+    session_factory: sessionmaker[Session]
+) -> None:
+    outbox = OutboxEventBus()
+
+    with session_factory() as db:
+        outbox.publish("document.received", {"tenant_id": "tenant_1", "document_id": "doc_1"}, db=db)
+        outbox.publish("document.received", {"tenant_id": "tenant_2", "document_id": "doc_9"}, db=db)
+        outbox.publish_many(
+            "document.classified",
+            [{"tenant_id": "tenant_1", "document_id": "doc_1"}],
+            db=db,
+        )
+        db.commit()
+
+    with session_factory() as db:
+        outbox.publish("document.received", {"tenant_id": "tenant_1", "document_id": "doc_x"}, db=db)
+        db.rollback()
+
+    transport = InMemoryEventBus()
+    relay = OutboxRelay(transport, session_factory, settings=Settings(event_outbox_batch_size=2))
+    totals = relay.run(drain=True)
+
+    assert totals["published"] == 3
+    published: list[dict[str, Any]] = list(transport.events)
+    # Tenants go in order of their oldest row, each tenant's rows in id order.
+    assert [(event["topic"], event["payload"]["document_id"]) for event in published] == [
+        ("document.received", "doc_1"),
+        ("document.classified", "doc_1"),
+        ("document.received", "doc_9"),
+    ]
+    assert published[0]["attributes"]["tenant_id"] == "tenant_1"
+    assert int(published[0]["attributes"]["outbox_id"]) < int(published[1]["attributes"]["outbox_id"])
+    with session_factory() as db:
+        assert db.execute(select(OutboxEvent)).first() is None
+
+
+def test_unconfirmed_batch_stays_in_outbox(session_factory: sessionmaker[Session]) -> None:
+    with session_factory() as db:
+        OutboxEventBus().publish("document.validated", {"tenant_id": "tenant_1"}, db=db)
+        db.commit()
+
+    relay = OutboxRelay(UnconfirmedEventBus(), session_factory)
+    assert relay.run_once() == {"published": 0, "failed": 1}
+
+    with session_factory() as db:
+        event = db.execute(select(OutboxEvent)).scalar_one()
+        assert event.attempt_count == 1
+        assert event.last_error == "1 of 1 messages unconfirmed"
+
+
+def test_unconfirmed_tenant_stops_without_holding_back_others(
+    session_factory: sessionmaker[Session]
+) -> None:
+    outbox = OutboxEventBus()
+    with session_factory() as db:
+        for tenant_id, document_id in (
+            ("tenant_1", "doc_1"),
+            ("tenant_bad", "doc_2"),
+            ("tenant_1", "doc_3"),
+            ("tenant_bad", "doc_4"),
+        ):
+            outbox.publish(
+                "document.received", {"tenant_id": tenant_id, "document_id": document_id}, db=db
+            )
+        db.commit()
+
+    transport = FailingTenantEventBus("tenant_bad")
+    assert OutboxRelay(transport, session_factory).run_once() == {"published": 2, "failed": 2}
+
+    assert transport.ordering_keys == ["tenant_1", "tenant_1", "tenant_bad", "tenant_bad"]
+    with session_factory() as db:
+        remaining = db.execute(select(OutboxEvent).order_by(OutboxEvent.id)).scalars().all()
+        assert [event.payload["document_id"] for event in remaining] == ["doc_2", "doc_4"]
+        assert {event.attempt_count for event in remaining} == {1}
@@ -129,3 +129,20 @@ def test_hardening_workflow_endpoints(client: TestClient) -> None:
     body = metrics.json()
     assert body["total_requests"] >= 1
     assert body["failed_requests"] >= 0
+    assert body["database_pools"]["async"]["checkouts"] >= 1
+    assert "le_1ms" in body["database_pools"]["sync"]["wait_ms"]["histogram"]
+
+
+def test_dlq_replay_rejects_a_zero_rate(client: TestClient) -> None:
+    headers = _auth_headers(client)
+
+    rejected = client.post(
+        "/api/v1/webhooks/dlq/replay", headers=headers, json={"rate_per_second": 0}
+    )
+    assert rejected.status_code == 422
+
+    replayed = client.post(
+        "/api/v1/webhooks/dlq/replay", headers=headers, json={"rate_per_second": 0.5}
+    )
+    assert replayed.status_code == 200
+    assert replayed.json()["requeued"] == 0
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any
+
+import pytest
+
+from libs.common.events import EventBusFullError, InMemoryEventBus
+
+
+def test_history_is_a_bounded_ring_buffer() -> None:
+    bus = InMemoryEventBus(capacity=3)
+    for index in range(10):
+        bus.publish("document.received", {"index": index})
+
+    assert [event["payload"]["index"] for event in bus.events] == [7, 8, 9]
+    assert bus.metrics()["published"] == 10
+
+
+def test_subscribers_receive_events_from_worker_pool() -> None:
+    bus = InMemoryEventBus(workers=2)
+    received: list[tuple[str, Any]] = []
+    lock = threading.Lock()
+
+    def on_classified(event: dict[str, Any]) -> None:
+        with lock:
+            received.append(("sync", event["payload"]["document_id"]))
+
+    async def on_any(event: dict[str, Any]) -> None:
+        with lock:
+            received.append(("async", event["topic"]))
+
+    bus.subscribe("document.classified", on_classified)
+    bus.subscribe("#", on_any)
+    bus.publish("document.classified", {"document_id": "doc_1"})
+    bus.publish("document.validated", {"document_id": "doc_1"})
+
+    assert bus.drain(timeout=5) == 0
+    bus.close()
+    assert sorted(received) == [
+        ("async", "document.classified"),
+        ("async", "document.validated"),
+        ("sync", "doc_1"),
+    ]
+    assert bus.metrics()["dispatched"] == 2
+
+
+def _blocked_bus(backpressure: str) -> tuple[InMemoryEventBus, threading.Event, list[int]]:
+    bus = InMemoryEventBus(
+        capacity=2, workers=1, backpressure=backpressure, block_timeout_seconds=0.05
+    )
+    release = threading.Event()
+    started = threading.Event()
+    seen: list[int] = []
+
+    def slow_handler(event: dict[str, Any]) -> None:
+        started.set()
+        release.wait(5)
+        seen.append(event["payload"]["index"])
+
+    bus.subscribe("document.extracted", slow_handler)
+    bus.publish("document.extracted", {"index": 0})
+    assert started.wait(5)
+    return bus, release, seen
+
+
+def test_drop_oldest_policy_discards_queued_events() -> None:
+    bus, release, seen = _blocked_bus("drop_oldest")
+    for index in range(1, 5):
+        bus.publish("document.extracted", {"index": index})
+
+    release.set()
+    assert bus.drain(timeout=5) == 0
+    bus.close()
+    assert seen == [0, 3, 4]
+    assert bus.metrics()["dropped"] == 2
+
+
+def test_block_policy_raises_when_queue_stays_full() -> None:
+    bus, release, _ = _blocked_bus("block")
+    bus.publish("document.extracted", {"index": 1})
+    bus.publish("document.extracted", {"index": 2})
+
+    with pytest.raises(EventBusFullError):
+        bus.publish("document.extracted", {"index": 3})
+
+    release.set()
+    bus.close(timeout=5)
+
+
+def test_handlers_publishing_into_a_full_queue_do_not_deadlock() -> None:
+    bus = InMemoryEventBus(capacity=1, workers=1, backpressure="block", block_timeout_seconds=5)
+    received: list[int] = []
+    loops: list[asyncio.AbstractEventLoop] = []
+
+    def fan_out(event: dict[str, Any]) -> None:
+        for index in range(3):
+            bus.publish("document.classified", {"index": index})
+
+    async def on_classified(event: dict[str, Any]) -> None:
+        loops.append(asyncio.get_running_loop())
+        received.append(event["payload"]["index"])
+
+    bus.subscribe("document.preprocessed", fan_out)
+    bus.subscribe("document.classified", on_classified)
+    bus.publish("document.preprocessed", {})
+
+    assert bus.drain(timeout=5) == 0
+    bus.close(timeout=5)
+    assert sorted(received) == [0, 1, 2]
+    assert bus.metrics()["overflowed"] == 2
+    assert bus.metrics()["handler_errors"] == 0
+    assert loops and all(loop.is_closed() for loop in loops)
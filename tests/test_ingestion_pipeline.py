@@ -75,3 +75,37 @@ def test_ingestion_to_review_flow(client: TestClient) -> None:
     )
     assert complete_response.status_code == 200
     assert complete_response.json()["status"] == "approved"
+
+
+def test_bulk_review_completion_endpoint(client: TestClient) -> None:
+    token = _issue_token(client)
+    headers = {"Authorization": f"Bearer {token}", "X-Tenant-Id": "tenant_1"}
+    for index in range(2):
+        ingest_response = client.post(
+            "/api/v1/ingestion/documents",
+            json={
+                "file_name": f"bulk-lowconf-{index}.pdf",
+                "content_type": "application/pdf",
+                "content_base64": base64.b64encode(b"bulk review").decode("utf-8"),
+            },
+            headers={**headers, "Idempotency-Key": f"idem-bulk-{index}"},
+        )
+        assert ingest_response.status_code == 200
+
+    open_tasks = client.get("/api/v1/review/tasks", headers=headers).json()
+    assert len(open_tasks) >= 2
+
+    bulk_response = client.post(
+        "/api/v1/review/tasks:bulk-complete",
+        json={
+            "items": [{"task_id": task["id"], "approved": True} for task in open_tasks]
+            + [{"task_id": "rvw_unknown", "approved": False}]
+        },
+        headers=headers,
+    )
+    assert bulk_response.status_code == 200
+    body = bulk_response.json()
+    assert body["completed"] == len(open_tasks)
+    assert body["failed"] == 1
+    assert body["results"][-1]["error"] == "review task not found"
+    assert client.get("/api/v1/review/tasks", headers=headers).json() == []
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+from typing import Any
+
+from libs.common.config import Settings
+from libs.common.events import GCPPubSubEventBus
+from libs.common.publish_scope import track_publishes
+
+
+class FakePublisher:
+    def __init__(self, fail_first: int = 0):
+        self.published: list[tuple[str, bytes, dict[str, str]]] = []
+        self.futures: list[Future[str]] = []
+        self.resumed: list[tuple[str, str]] = []
+        self._fail_remaining = fail_first
+
+    def topic_path(self, project_id: str, topic_id: str) -> str:
+        return f"projects/{project_id}/topics/{topic_id}"
+
+    def publish(self, topic_path: str, *, data: bytes, **attributes: str) -> Future[str]:
+        self.published.append((topic_path, data, attributes))
+        future: Future[str] = Future()
+        self.futures.append(future)
+        return future
+
+    def resume_publish(self, topic_path: str, ordering_key: str) -> None:
+        self.resumed.append((topic_path, ordering_key))
+
+    def settle(self) -> None:
+        for future in self.futures:
+            if future.done():
+                continue
+            if self._fail_remaining:
+                self._fail_remaining -= 1
+                future.set_exception(RuntimeError("unavailable"))
+            else:
+                future.set_result("message-id")
+
+
+def _settings(**overrides: Any) -> Settings:
+    return Settings(gcp_project_id="nexus-test", **overrides)
+
+
+def test_publish_does_not_block_and_flush_waits_for_batch() -> None:
+    publisher = FakePublisher()
+    bus = GCPPubSubEventBus(_settings(), publisher=publisher)
+
+    for index in range(5):
+        bus.publish("document.received", {"document_id": f"doc_{index}"})
+
+    assert len(publisher.published) == 5
+    assert bus.metrics()["pending"] == 5
+
+    publisher.settle()
+    assert bus.flush(timeout=1) == 0
+    metrics = bus.metrics()
+    assert metrics["published"] == 5
+    assert metrics["pending"] == 0
+    assert publisher.published[0][0] == "projects/nexus-test/topics/nexuscargo-document-received"
+
+
+def test_failed_publishes_are_buffered_and_retried_on_flush() -> None:
+    publisher = FakePublisher(fail_first=2)
+    bus = GCPPubSubEventBus(_settings(pubsub_retry_buffer_size=1), publisher=publisher)
+
+    bus.publish_many("document.validated", [{"document_id": "doc_1"}, {"document_id": "doc_2"}])
+    publisher.settle()
+
+    metrics = bus.metrics()
+    assert metrics["failed"] == 2
+    assert metrics["dropped"] == 1
+    assert metrics["retry_buffered"] == 1
+
+    undelivered = bus.flush(timeout=0)
+    assert undelivered == 1
+    publisher.settle()
+    assert bus.flush(timeout=1) == 0
+
+    metrics = bus.metrics()
+    assert metrics["retried"] == 1
+    assert metrics["published"] == 1
+    assert len(publisher.published) == 3
+
+
+def test_scoped_flush_waits_only_for_its_own_messages() -> None:
+    publisher = FakePublisher(fail_first=1)
+    bus = GCPPubSubEventBus(_settings(), publisher=publisher)
+
+    with track_publishes() as first:
+        bus.publish("document.received", {"document_id": "doc_1"})
+    publisher.settle()
+    with track_publishes() as second:
+        bus.publish("document.received", {"document_id": "doc_2"})
+    with track_publishes() as idle:
+        pass
+
+    assert not idle.pending
+    # doc_1 failed and is retried by its own scope; doc_2 stays pending and is not awaited.
+    assert bus.flush(timeout=0, scope=first) == 1
+    assert bus.metrics()["retried"] == 1
+    assert len(second.pending) == 1
+    publisher.settle()
+    assert bus.flush(timeout=1, scope=first) == 0
+    assert bus.flush(timeout=1, scope=second) == 0
+    assert bus.metrics()["published"] == 2
+
+
+def test_ordering_keys_are_resumed_and_retried_in_publish_order() -> None:
+    publisher = FakePublisher(fail_first=2)
+    bus = GCPPubSubEventBus(_settings(), publisher=publisher, message_ordering=True)
+
+    with track_publishes() as scope:
+        for document_id in ("doc_1", "doc_2"):
+            bus.publish("document.received", {"document_id": document_id}, ordering_key="tenant_1")
+    publisher.settle()
+
+    topic_path = "projects/nexus-test/topics/nexuscargo-document-received"
+    assert publisher.resumed == [(topic_path, "tenant_1"), (topic_path, "tenant_1")]
+    assert bus.flush(timeout=0, scope=scope) == 2
+    first, second, retried_first, retried_second = publisher.published
+    assert (retried_first[1], retried_second[1]) == (first[1], second[1])
+    assert retried_first[2]["ordering_key"] == "tenant_1"
+    publisher.settle()
+    assert bus.flush(timeout=1, scope=scope) == 0
+
+
+def test_ordering_key_is_dropped_without_message_ordering() -> None:
+    publisher = FakePublisher()
+    bus = GCPPubSubEventBus(_settings(), publisher=publisher)
+
+    bus.publish("document.received", {"document_id": "doc_1"}, ordering_key="tenant_1")
+
+    assert "ordering_key" not in publisher.published[0][2]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from libs.common.events import InMemoryEventBus
+from libs.common.models import AuditEvent, Correction, ReviewTask
+from libs.schemas.events import EventTypes
+from services.review.service import ReviewDecision, ReviewService
+
+
+def test_bulk_complete_reviews_in_single_transaction(db: Session) -> None:
+    event_bus = InMemoryEventBus()
+    service = ReviewService(event_bus)
+    tasks = [
+        service.queue_low_confidence_review(
+            db,
+            tenant_id="tenant_1",
+            actor_id="user_1",
+            document_id=f"doc_{index}",
+            reason="low-confidence",
+            source="pipeline",
+            confidence=0.5,
+        )
+        for index in range(3)
+    ]
+    db.commit()
+    event_bus.events.clear()
+
+    correction = {
+        "field_name": "awb_number",
+        "old_value": "123-INVALID",
+        "new_value": "123-12345678",
+        "reason_tag": "manual_fix",
+    }
+    results = service.complete_reviews_bulk(
+        db,
+        tenant_id="tenant_1",
+        actor_id="user_1",
+        decisions=[
+            ReviewDecision(review_task_id=tasks[0].id, approved=True, corrections=[correction]),
+            ReviewDecision(review_task_id=tasks[1].id, approved=False),
+            ReviewDecision(review_task_id=tasks[2].id, approved=True),
+            ReviewDecision(review_task_id=tasks[2].id, approved=True),
+            ReviewDecision(review_task_id="rvw_missing", approved=True),
+        ],
+    )
+    db.commit()
+
+    assert [result.status for result in results] == [
+        "approved",
+        "rejected",
+        "approved",
+        "failed",
+        "failed",
+    ]
+    assert results[3].error == "duplicate review task in request"
+    assert results[4].error == "review task not found"
+
+    statuses = {
+        task.id: task.status for task in db.execute(select(ReviewTask)).scalars().all()
+    }
+    assert statuses == {tasks[0].id: "approved", tasks[1].id: "rejected", tasks[2].id: "approved"}
+    assert db.scalar(select(func.count()).select_from(Correction)) == 1
+    completed_audits = db.scalar(
+        select(func.count())
+        .select_from(AuditEvent)
+        .where(AuditEvent.action == "review.task.completed")
+    )
+    assert completed_audits == 3
+    assert [event["topic"] for event in event_bus.events] == [EventTypes.REVIEW_COMPLETED] * 3
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from libs.common.signed_url_cache import SignedUrlCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_signed_urls_are_reused_until_remaining_lifetime_runs_low() -> None:
+    clock = FakeClock()
+    cache = SignedUrlCache(expiration_seconds=900, min_remaining_seconds=300, clock=clock)
+    calls: list[str] = []
+
+    def sign(uri: str, expiration: int) -> str:
+        calls.append(uri)
+        return f"https://signed/{uri}?n={len(calls)}&exp={expiration}"
+
+    first = cache.get("gs://bucket/a", sign)
+    clock.now += 599
+    assert cache.get("gs://bucket/a", sign) == first
+    clock.now += 2
+    assert cache.get("gs://bucket/a", sign) != first
+
+    assert len(calls) == 2
+    metrics = cache.metrics()
+    assert metrics["hits"] == 1
+    assert metrics["expired"] == 1
+    assert metrics["hit_ratio"] == pytest.approx(1 / 3, abs=1e-4)
+
+
+def test_cache_is_bounded_lru() -> None:
+    cache = SignedUrlCache(max_entries=2)
+    for uri in ("a", "b", "a", "c"):
+        cache.get(uri, lambda value, _exp: f"url-{value}")
+
+    assert cache.metrics()["entries"] == 2
+    assert cache.metrics()["evictions"] == 1
+    assert cache.get("a", lambda _value, _exp: "resigned") == "url-a"
+    assert cache.get("b", lambda _value, _exp: "resigned") == "resigned"
+
+
+def test_concurrent_misses_share_one_signing_call() -> None:
+    cache = SignedUrlCache()
+    started = threading.Event()
+    calls = 0
+
+    def slow_sign(uri: str, _expiration: int) -> str:
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.1)
+        return f"https://signed/{uri}"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leader = executor.submit(cache.get, "gs://bucket/doc", slow_sign)
+        started.wait(timeout=5)
+        followers = [executor.submit(cache.get, "gs://bucket/doc", slow_sign) for _ in range(7)]
+        results = {leader.result()} | {future.result() for future in followers}
+
+    assert results == {"https://signed/gs://bucket/doc"}
+    assert calls == 1
+    assert cache.metrics()["coalesced"] == 7
+
+
+def test_signing_errors_propagate_to_waiters_and_are_not_cached() -> None:
+    cache = SignedUrlCache()
+
+    def failing(_uri: str, _expiration: int) -> str:
+        raise RuntimeError("iam unavailable")
+
+    with pytest.raises(RuntimeError):
+        cache.get("gs://bucket/doc", failing)
+    assert cache.get("gs://bucket/doc", lambda uri, _exp: "ok") == "ok"
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import base64
+import logging
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from httpx import Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from libs.common.config import Settings
+from libs.common.sql_metrics import (
+    install_query_instrumentation,
+    normalize_sql,
+    query_metrics,
+    recorded_queries,
+    sql_fingerprint,
+    track_queries,
+)
+
+QueryBudget = Callable[[Response, int], None]
+
+
+def test_normalize_sql_collapses_literals_and_batches() -> None:
+    first = normalize_sql(
+        "SELECT id FROM documents\n  WHERE tenant_id = 'tenant_1' AND id IN (?, ?, ?) LIMIT 10"
+    )
+    second = normalize_sql(
+        "SELECT id FROM documents WHERE tenant_id = %(tenant_id)s AND id IN (?) LIMIT 25"
+    )
+    assert first == "SELECT id FROM documents WHERE tenant_id = ? AND id IN (?...) LIMIT ?"
+    assert sql_fingerprint(first) == sql_fingerprint(
+        normalize_sql("SELECT id FROM documents WHERE tenant_id = $1 AND id IN ($2, $3) LIMIT 5")
+    )
+    assert second.endswith("IN (?) LIMIT ?")
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == (
+        "INSERT INTO t (a, b) VALUES (?...), ..."
+    )
+    assert normalize_sql("SELECT payload::text FROM t") == "SELECT payload::text FROM t"
+
+
+def test_statements_are_counted_per_scope_and_slow_ones_logged(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'sql.db'}")
+    logger = logging.getLogger("test_sql_instrumentation")
+    install_query_instrumentation(engine, slow_query_ms=1e-9, logger=logger)
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        with track_queries("unit") as stats, engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 'secret-value'"))
+        with pytest.raises(OperationalError), engine.connect() as connection:
+            connection.execute(text("SELECT * FROM missing_table"))
+
+    assert stats.statements == 2
+    assert stats.db_time_ms > 0
+    slow = [record for record in caplog.records if record.getMessage() == "slow_query"]
+    assert len(slow) == 2
+    assert all("secret-value" not in str(record.event) for record in slow)  # type: ignore[attr-defined]
+
+
+def test_nested_scopes_count_towards_the_enclosing_scope(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'sql.db'}")
+    install_query_instrumentation(engine, slow_query_ms=1000, logger=logging.getLogger(__name__))
+
+    with track_queries("request") as outer, engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with recorded_queries("stage:unit inline") as inner:
+            connection.execute(text("SELECT 2"))
+            connection.execute(text("SELECT 3"))
+
+    assert inner.statements == 2
+    assert outer.statements == 3
+    assert query_metrics.snapshot()["per_scope"]["stage:unit inline"]["max_statements"] >= 2
+
+
+def _headers(client: TestClient, roles: list[str]) -> tuple[dict[str, str], Response]:
+    response = client.post(
+        "/api/v1/auth/token",
+        json={
+            "user_id": "user_sql",
+            "email": "sql@example.com",
+            "tenant_ids": ["tenant_sql"],
+            "roles": roles,
+        },
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}", "X-Tenant-Id": "tenant_sql"}, response
+
+
+def test_endpoint_query_budgets(client: TestClient, assert_max_queries: QueryBudget) -> None:
+    roles = ["admin", "operator", "reviewer", "analyst"]
+    # Tenant, user, roles and memberships: the role loop must not add queries per role.
+    _, first_token = _headers(client, roles)
+    assert_max_queries(first_token, 9)
+    headers, repeat_token = _headers(client, roles)
+    assert_max_queries(repeat_token, 5)
+
+    documents = client.get("/api/v1/documents", headers=headers)
+    assert documents.status_code == 200
+    assert_max_queries(documents, 2)
+    assert float(documents.headers["X-DB-Time-Ms"]) >= 0
+    assert documents.headers["Server-Timing"].startswith("db;dur=")
+
+    overview = client.get("/api/v1/analytics/overview", headers=headers)
+    assert overview.status_code == 200
+    assert_max_queries(overview, 3)
+
+    for index in range(5):
+        client.get(f"/nope/{index}")
+    sql_metrics = client.get("/metrics").json()["sql"]["per_scope"]
+    assert sql_metrics["GET /api/v1/documents"]["max_statements"] <= 2
+    assert sql_metrics["GET <unmatched>"]["scopes"] >= 5
+    assert not any(scope.startswith("GET /nope") for scope in sql_metrics)
+
+
+def test_inline_pipeline_records_each_stage(client: TestClient) -> None:
+    headers, _ = _headers(client, ["operator"])
+    response = client.post(
+        "/api/v1/ingestion/documents",
+        json={
+            "file_name": "stage-metrics.pdf",
+            "content_type": "application/pdf",
+            "content_base64": base64.b64encode(b"stage metrics").decode("utf-8"),
+        },
+        headers={**headers, "Idempotency-Key": "idem-stage-metrics"},
+    )
+    assert response.status_code == 200
+
+    sql_metrics = client.get("/metrics").json()["sql"]["per_scope"]
+    for stage in ["preprocessing", "classification", "extraction", "validation", "review"]:
+        assert sql_metrics[f"stage:{stage} inline"]["scopes"] >= 1
+
+
+def test_timing_headers_default_to_dev_only() -> None:
+    assert Settings(environment="dev").database_timing_headers_active
+    assert not Settings(environment="prod").database_timing_headers_active
+    assert Settings(
+        environment="prod", database_timing_headers_enabled=True
+    ).database_timing_headers_active
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterator, Sequence
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.config import Settings, get_settings
+from libs.common.consumers import StageConsumer, purge_processed_events, transactional
+from libs.common.dedupe import EventDedupeStore
+from libs.common.models import (
+    Document,
+    DocumentClassification,
+    ProcessedEvent,
+)
+from libs.common.sqlite_queue import ConsumedEvent, SQLiteEventQueue
+from libs.common.storage import LocalStorageProvider
+from libs.schemas.events import EventTypes
+from services.classification import worker as classification_worker
+from services.classification.service import ClassificationService
+from services.extraction import worker as extraction_worker
+from services.extraction.service import ExtractionService
+from services.ingestion.service import IngestionService
+from services.notifications import worker as notifications_worker
+from services.preprocessing import worker as preprocessing_worker
+from services.preprocessing.service import PreprocessingService
+from services.review import worker as review_worker
+from services.review.service import ReviewService
+from services.validation import worker as validation_worker
+from services.validation.service import ValidationService
+
+
+@pytest.fixture
+def event_driven(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("PIPELINE_MODE", "event_driven")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_stage_workers_process_document_end_to_end(
+    tmp_path: Path, session_factory: sessionmaker[Session], event_driven: None
+) -> None:
+    queue = SQLiteEventQueue(str(tmp_path / "queue.db"))
+    ingestion = IngestionService(
+        queue,
+        LocalStorageProvider(tmp_path / "storage"),
+        PreprocessingService(queue),
+        ClassificationService(queue),
+        ExtractionService(queue),
+        ValidationService(queue),
+        ReviewService(queue),
+    )
+    with session_factory() as db:
+        response = ingestion.ingest_and_process(
+            db,
+            tenant_id="tenant_1",
+            actor_id="user_1",
+            file_name="awb-123.pdf",
+            content_type="application/pdf",
+            payload_bytes=b"%PDF-1.4",
+            text_hint="awb-123.pdf",
+        )
+        db.commit()
+    assert response["status"] == "received"
+    assert response["doc_type"] == "pending"
+
+    settings = Settings(stage_worker_concurrency=2, stage_worker_poll_interval_seconds=0.01)
+    for stage in (
+        preprocessing_worker,
+        classification_worker,
+        extraction_worker,
+        validation_worker,
+        review_worker,
+        notifications_worker,
+    ):
+        consumer = StageConsumer(
+            stage.__name__,
+            queue,
+            stage.TOPICS,
+            transactional(session_factory, stage.build_handler(queue)),
+            settings=settings,
+        )
+        totals = consumer.run(drain=True)
+        assert totals["nacked"] == 0
+
+    with session_factory() as db:
+        document = db.execute(select(Document)).scalar_one()
+        classification = db.execute(select(DocumentClassification)).scalar_one()
+    assert classification.doc_type == "awb"
+    assert document.status in {"validated", "review_required"}
+    assert queue.metrics()["queued"] == 0
+
+
+def test_failed_events_are_retried_then_dead_lettered(tmp_path: Path) -> None:
+    queue = SQLiteEventQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    queue.publish(EventTypes.DOCUMENT_RECEIVED, {"document_id": "doc_1"})
+    attempts: list[int] = []
+
+    def failing(event: ConsumedEvent) -> None:
+        attempts.append(event.delivery_attempt)
+        raise RuntimeError("boom")
+
+    consumer = StageConsumer(
+        "failing",
+        queue,
+        [EventTypes.DOCUMENT_RECEIVED],
+        failing,
+        settings=Settings(stage_worker_poll_interval_seconds=0.01),
+    )
+    assert consumer.run(drain=True)["nacked"] == 1
+    # Make the backed-off message visible again instead of waiting out the delay.
+    queue.nack(["1"])
+    assert consumer.run(drain=True)["nacked"] == 2
+    assert attempts == [1, 2]
+    assert queue.metrics() == {"published": 1, "queued": 0, "dead_lettered": 1}
+
+
+def test_event_for_uncommitted_document_is_nacked(
+    tmp_path: Path, session_factory: sessionmaker[Session]
+) -> None:
+    queue = SQLiteEventQueue(str(tmp_path / "queue.db"))
+    queue.publish(
+        EventTypes.DOCUMENT_RECEIVED, {"tenant_id": "tenant_1", "document_id": "doc_not_yet"}
+    )
+    consumer = StageConsumer(
+        "preprocessing",
+        queue,
+        preprocessing_worker.TOPICS,
+        transactional(session_factory, preprocessing_worker.build_handler(queue)),
+        settings=Settings(stage_worker_poll_interval_seconds=0.01),
+    )
+    totals = consumer.run(drain=True)
+    assert totals == {"received": 1, "acked": 0, "nacked": 1}
+    assert queue.metrics()["queued"] == 1
+
+
+def test_event_driven_mode_requires_outbox() -> None:
+    without_outbox = Settings(pipeline_mode="event_driven", event_outbox_enabled=False)
+    with pytest.raises(RuntimeError, match="event_outbox_enabled"):
+        without_outbox.validate_runtime_constraints()
+    Settings(pipeline_mode="event_driven", event_outbox_enabled=True).validate_runtime_constraints()
+
+
+def test_undecodable_event_is_dead_lettered_without_blocking_the_queue(tmp_path: Path) -> None:
+    path = tmp_path / "queue.db"
+    queue = SQLiteEventQueue(str(path), max_attempts=1)
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "INSERT INTO stage_events (subscription, topic, payload, attributes, visible_at) "
+            "VALUES ('', ?, ?, '{}', 0)",
+            (EventTypes.DOCUMENT_RECEIVED, b"\\x00not an envelope"),
+        )
+    queue.publish(EventTypes.DOCUMENT_RECEIVED, {"document_id": "doc_1"})
+    handled: list[str] = []
+    consumer = StageConsumer(
+        "poison",
+        queue,
+        [EventTypes.DOCUMENT_RECEIVED],
+        lambda event: handled.append(event.payload["document_id"]),
+        settings=Settings(stage_worker_poll_interval_seconds=0.01),
+    )
+    assert consumer.run(drain=True) == {"received": 1, "acked": 1, "nacked": 0}
+    assert handled == ["doc_1"]
+    assert queue.metrics() == {"published": 1, "queued": 0, "dead_lettered": 1}
+
+
+def test_expired_claim_on_last_attempt_is_dead_lettered(tmp_path: Path) -> None:
+    queue = SQLiteEventQueue(
+        str(tmp_path / "queue.db"), visibility_timeout_seconds=0, max_attempts=1
+    )
+    queue.publish(EventTypes.DOCUMENT_RECEIVED, {"document_id": "doc_1"})
+    assert len(queue.receive([EventTypes.DOCUMENT_RECEIVED], 10)) == 1
+    # The worker never acked; the claim lapsed with no attempts left.
+    assert queue.receive([EventTypes.DOCUMENT_RECEIVED], 10) == []
+    assert queue.metrics()["dead_lettered"] == 1
+
+
+def test_receive_errors_back_off_instead_of_stopping_the_worker(tmp_path: Path) -> None:
+    queue = SQLiteEventQueue(str(tmp_path / "queue.db"))
+    queue.publish(EventTypes.DOCUMENT_RECEIVED, {"document_id": "doc_1"})
+
+    class FlakySource:
+        failures = 0
+
+        def receive(self, topics: Sequence[str], max_messages: int) -> list[ConsumedEvent]:
+            if self.failures < 2:
+                self.failures += 1
+                raise TimeoutError("DeadlineExceeded")
+            return queue.receive(topics, max_messages)
+
+        def ack(self, message_ids: Sequence[str]) -> None:
+            queue.ack(message_ids)
+
+        def nack(self, message_ids: Sequence[str], *, delay_seconds: float = 0.0) -> None:
+            queue.nack(message_ids, delay_seconds=delay_seconds)
+
+    consumer = StageConsumer(
+        "flaky",
+        FlakySource(),
+        [EventTypes.DOCUMENT_RECEIVED],
+        lambda event: None,
+        settings=Settings(stage_worker_poll_interval_seconds=0.001),
+    )
+    assert consumer.run(drain=True)["acked"] == 1
+
+
+def test_stage_worker_purges_expired_dedupe_markers(
+    tmp_path: Path, session_factory: sessionmaker[Session]
+) -> None:
+    now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+    with session_factory() as db:
+        EventDedupeStore(clock=lambda: now - timedelta(days=8)).mark(db, "stage", "evt_old")
+        EventDedupeStore(clock=lambda: now).mark(db, "stage", "evt_new")
+        db.commit()
+    store = EventDedupeStore(ttl_seconds=7 * 86_400, clock=lambda: now)
+    consumer = StageConsumer(
+        "stage",
+        SQLiteEventQueue(str(tmp_path / "queue.db")),
+        [EventTypes.DOCUMENT_RECEIVED],
+        lambda event: None,
+        settings=Settings(stage_worker_poll_interval_seconds=0.01),
+        housekeeping=lambda: purge_processed_events(session_factory, store),
+    )
+    consumer.run(drain=True)
+    with session_factory() as db:
+        remaining = db.execute(select(ProcessedEvent.event_id)).scalars().all()
+    assert remaining == ["evt_new"]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+import pytest
+
+from libs.common.storage import LocalStorageProvider
+from libs.common.storage_cache import CachingStorageProvider, ChecksumMismatchError
+
+
+class CountingProvider(LocalStorageProvider):
+    def __init__(self, root_path: Path):
+        super().__init__(root_path)
+        self.reads = 0
+
+    def open_read(self, uri: str, **kwargs: Any) -> BinaryIO:
+        self.reads += 1
+        return super().open_read(uri, **kwargs)
+
+    def iter_range(
+        self,
+        uri: str,
+        start: int,
+        end: int,
+        *,
+        checksum: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        raise AssertionError("cached reads must not hit the remote provider")
+
+
+def _upload(remote: CountingProvider, content: bytes) -> tuple[str, str]:
+    result = remote.upload_stream("tenant_1", "raw/doc.pdf", content, "application/pdf")
+    return result.uri, result.sha256
+
+
+def test_repeat_reads_are_served_from_disk(tmp_path: Path) -> None:
+    remote = CountingProvider(tmp_path / "remote")
+    cache = CachingStorageProvider(remote, tmp_path / "cache")
+    uri, checksum = _upload(remote, b"0123456789" * 100)
+
+    with cache.open_read(uri, checksum=checksum) as handle:
+        assert handle.read(10) == b"0123456789"
+    assert b"".join(cache.iter_range(uri, 5, 14, checksum=checksum)) == b"5678901234"
+    assert cache.object_size(uri, checksum=checksum) == 1000
+
+    assert remote.reads == 1
+    disk_cache = cache.metrics()["disk_cache"]
+    assert disk_cache["hits"] == 1
+    assert disk_cache["misses"] == 1
+    assert disk_cache["bytes_cached"] == 1000
+
+
+def test_concurrent_misses_download_once(tmp_path: Path) -> None:
+    remote = CountingProvider(tmp_path / "remote")
+    cache = CachingStorageProvider(remote, tmp_path / "cache")
+    uri, checksum = _upload(remote, os.urandom(256 * 1024))
+
+    def read() -> str:
+        with cache.open_read(uri, checksum=checksum) as handle:
+            return hashlib.sha256(handle.read()).hexdigest()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        digests = set(executor.map(lambda _: read(), range(16)))
+
+    assert digests == {checksum}
+    assert remote.reads == 1
+
+
+def test_checksum_mismatch_is_not_cached(tmp_path: Path) -> None:
+    remote = CountingProvider(tmp_path / "remote")
+    cache = CachingStorageProvider(remote, tmp_path / "cache")
+    uri, _ = _upload(remote, b"payload")
+
+    with pytest.raises(ChecksumMismatchError):
+        cache.open_read(uri, checksum="0" * 64)
+    assert cache.metrics()["disk_cache"]["bytes_cached"] == 0
+    assert list((tmp_path / "cache" / "tmp").iterdir()) == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    remote = CountingProvider(tmp_path / "remote")
+    cache = CachingStorageProvider(remote, tmp_path / "cache", max_bytes=250)
+    uploads = [
+        remote.upload_stream("tenant_1", f"raw/{index}", bytes([index]) * 100, "text/plain")
+        for index in range(3)
+    ]
+
+    for index, upload in enumerate(uploads[:2]):
+        cache.open_read(upload.uri, checksum=upload.sha256).close()
+        os.utime(cache._entry_path(upload.uri, upload.sha256), (index, index))
+    cache.open_read(uploads[0].uri, checksum=uploads[0].sha256).close()
+    cache.open_read(uploads[2].uri, checksum=uploads[2].sha256).close()
+
+    disk_cache = cache.metrics()["disk_cache"]
+    assert disk_cache["evictions"] == 1
+    assert disk_cache["bytes_cached"] == 200
+    assert not cache._entry_path(uploads[1].uri, uploads[1].sha256).exists()
+    assert len(list((tmp_path / "cache" / "locks").iterdir())) == 3
+
+    oversized = CachingStorageProvider(remote, tmp_path / "small", max_bytes=50)
+    with oversized.open_read(uploads[0].uri, checksum=uploads[0].sha256) as handle:
+        assert handle.read() == bytes([0]) * 100
+    assert oversized.metrics()["disk_cache"]["bypassed"] == 1
+
+
+def test_eviction_skips_locked_entries_and_open_handles_survive(tmp_path: Path) -> None:
+    remote = CountingProvider(tmp_path / "remote")
+    cache = CachingStorageProvider(remote, tmp_path / "cache", max_bytes=150)
+    first = remote.upload_stream("tenant_1", "raw/a", b"a" * 100, "text/plain")
+    second = remote.upload_stream("tenant_1", "raw/b", b"b" * 100, "text/plain")
+    first_path = cache._entry_path(first.uri, first.sha256)
+
+    handle = cache.open_read(first.uri, checksum=first.sha256)
+    os.utime(first_path, (0, 0))
+    with cache._entry_lock(first_path.name):
+        cache.open_read(second.uri, checksum=second.sha256).close()
+    # The older entry was locked, so the newer one went instead.
+    assert first_path.exists()
+    assert not cache._entry_path(second.uri, second.sha256).exists()
+    assert cache.metrics()["disk_cache"]["bytes_cached"] == 100
+
+    cache._max_bytes = 50
+    cache._evict()
+    assert not first_path.exists()
+    assert handle.read() == b"a" * 100
+    handle.close()
+    assert cache.metrics()["disk_cache"]["bytes_cached"] == 0
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from libs.common.storage import LocalStorageProvider, _local_path
+from libs.common.storage_compression import HEADER, MAGIC, TRAILER, CompressingStorageProvider
+
+JSON_BODY = json.dumps(
+    [{"awb": f"176-{index:08d}", "pieces": index % 7, "shipper": "ACME"} for index in range(2000)]
+).encode()
+
+
+def _provider(
+    tmp_path: Path, **kwargs: object
+) -> tuple[LocalStorageProvider, CompressingStorageProvider]:
+    inner = LocalStorageProvider(tmp_path, chunk_size=4096)
+    kwargs.setdefault("codec", "gzip")
+    return inner, CompressingStorageProvider(
+        inner, content_types=["application/json"], chunk_size=4096, **kwargs  # type: ignore[arg-type]
+    )
+
+
+def test_compressed_roundtrip_reports_original_size_and_checksum(tmp_path: Path) -> None:
+    _, provider = _provider(tmp_path)
+    result = provider.upload_stream("tenant_1", "raw/extract.json", JSON_BODY, "application/json")
+
+    stored = _local_path(result.uri).read_bytes()
+    assert stored.startswith(MAGIC)
+    assert len(stored) < len(JSON_BODY) // 4
+    assert result.size_bytes == len(JSON_BODY)
+    assert result.sha256 == hashlib.sha256(JSON_BODY).hexdigest()
+    assert result.storage_encoding == "gzip"
+
+    encoding = result.storage_encoding
+    with provider.open_read(result.uri, encoding=encoding) as handle:
+        assert handle.read() == JSON_BODY
+    assert provider.object_size(result.uri, encoding=encoding) == len(JSON_BODY)
+    assert (
+        b"".join(provider.iter_range(result.uri, 5000, 9999, encoding=encoding))
+        == JSON_BODY[5000:10000]
+    )
+
+    metrics = provider.metrics()["compression"]
+    assert metrics["compressed"] == 1
+    assert metrics["ratio"] > 4
+
+
+def test_other_content_types_and_legacy_objects_pass_through(tmp_path: Path) -> None:
+    inner, provider = _provider(tmp_path)
+    pdf = b"%PDF-1.7 " + bytes(range(256)) * 8
+    result = provider.upload_stream("tenant_1", "raw/doc.pdf", pdf, "application/pdf")
+    assert _local_path(result.uri).read_bytes() == pdf
+    assert result.storage_encoding is None
+
+    legacy = inner.upload_stream("tenant_1", "raw/old.json", JSON_BODY, "application/json")
+    assert provider.object_size(legacy.uri) == len(JSON_BODY)
+    assert b"".join(provider.iter_range(legacy.uri, 0, 9)) == JSON_BODY[:10]
+    with provider.open_read(result.uri) as handle:
+        assert handle.read() == pdf
+
+
+def test_zstd_dictionary_for_small_objects(tmp_path: Path) -> None:
+    pytest.importorskip("zstandard")
+    from libs.common.compression import train_zstd_dictionary
+
+    samples = [
+        json.dumps({"awb": f"176-{index:08d}", "pieces": index % 7, "origin": "SYD"}).encode()
+        for index in range(500)
+    ]
+    dictionary = train_zstd_dictionary(samples, size_bytes=2048)
+    _, provider = _provider(tmp_path, codec="zstd", dictionary=dictionary)
+    result = provider.upload_stream("tenant_1", "raw/one.json", samples[7], "application/json")
+    with provider.open_read(result.uri, encoding="zstd") as handle:
+        assert handle.read() == samples[7]
+
+    _, without = _provider(tmp_path / "other", codec="zstd")
+    with pytest.raises(ValueError):
+        without.object_size(result.uri, encoding="zstd")
+
+
+def test_framing_is_never_sniffed_from_content(tmp_path: Path) -> None:
+    inner, provider = _provider(tmp_path)
+    forged = HEADER.pack(MAGIC, 1, 0) + b"%PDF-1.7 payload" + TRAILER.pack(10**12, MAGIC)
+    result = inner.upload_stream("tenant_1", "raw/forged.pdf", forged, "application/pdf")
+    assert provider.object_size(result.uri) == len(forged)
+    assert b"".join(provider.iter_range(result.uri, 0, len(forged) - 1)) == forged
+
+
+def test_decompressed_length_must_match_trailer(tmp_path: Path) -> None:
+    inner, provider = _provider(tmp_path)
+    stored = provider.upload_stream("tenant_1", "raw/a.json", JSON_BODY, "application/json")
+    framed = _local_path(stored.uri).read_bytes()
+    lying = framed[: -TRAILER.size] + TRAILER.pack(len(JSON_BODY) - 1, MAGIC)
+    result = inner.upload_stream("tenant_1", "raw/b.json", lying, "application/json")
+    with pytest.raises(ValueError, match="trailer"):
+        with provider.open_read(result.uri, encoding="gzip") as handle:
+            handle.read()
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import hashlib
+import io
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from libs.common.config import Settings
+from libs.common.storage import GCS_CHUNK_ALIGNMENT, GCSStorageProvider, LocalStorageProvider
+
+
+class _FakeWriter(io.BytesIO):
+    def __init__(self, blob: FakeBlob):
+        super().__init__()
+        self._blob = blob
+        self.writes = 0
+
+    def write(self, data: Any) -> int:
+        self.writes += 1
+        return super().write(data)
+
+    def close(self) -> None:
+        self._blob.data = self.getvalue()
+        self._blob.writes = self.writes
+        self._blob.generation += 1
+        super().close()
+
+
+class FakeBlob:
+    def __init__(self, name: str, chunk_size: int | None = None):
+        self.name = name
+        self.chunk_size = chunk_size
+        self.data = b""
+        self.writes = 0
+        self.open_kwargs: dict[str, Any] = {}
+        self.ranged_reads: list[tuple[int, int]] = []
+        self.generation = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    def download_as_bytes(self, *, start: int, end: int, if_generation_match: int) -> bytes:
+        if if_generation_match != self.generation:
+            raise RuntimeError("412 Precondition Failed")
+        self.ranged_reads.append((start, end))
+        return self.data[start : end + 1]
+
+    def open(self, mode: str, **kwargs: Any) -> Any:
+        self.open_kwargs = kwargs
+        if mode == "wb":
+            return _FakeWriter(self)
+        return io.BytesIO(self.data)
+
+
+class FakeBucket:
+    def __init__(self) -> None:
+        self.blobs: dict[str, FakeBlob] = {}
+
+    def blob(self, name: str, chunk_size: int | None = None) -> FakeBlob:
+        return self.blobs.setdefault(name, FakeBlob(name, chunk_size))
+
+    def get_blob(self, name: str) -> FakeBlob | None:
+        return self.blobs.get(name)
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.buckets: dict[str, FakeBucket] = {}
+
+    def bucket(self, name: str) -> FakeBucket:
+        return self.buckets.setdefault(name, FakeBucket())
+
+
+def test_local_stream_upload_hashes_in_one_pass_and_reports_progress(tmp_path: Path) -> None:
+    payload = bytes(range(256)) * 1000
+    provider = LocalStorageProvider(tmp_path, chunk_size=64 * 1024)
+    progress: list[int] = []
+
+    result = provider.upload_stream(
+        "tenant_1", "raw/doc.pdf", io.BytesIO(payload), "application/pdf", progress=progress.append
+    )
+
+    assert result.sha256 == hashlib.sha256(payload).hexdigest()
+    assert result.size_bytes == len(payload)
+    assert progress[-1] == len(payload)
+    assert len(progress) == 4
+
+    read_progress: list[int] = []
+    with provider.open_read(result.uri, progress=read_progress.append) as handle:
+        chunks = list(iter(lambda: handle.read(100_000), b""))
+    assert b"".join(chunks) == payload
+    assert read_progress[-1] == len(payload)
+
+
+def test_local_stream_upload_accepts_chunk_iterators(tmp_path: Path) -> None:
+    provider = LocalStorageProvider(tmp_path)
+
+    result = provider.upload_stream(
+        "tenant_1", "raw/parts.txt", (part.encode() for part in ("a", "b", "c")), "text/plain"
+    )
+
+    assert Path(result.uri.removeprefix("file://")).read_bytes() == b"abc"
+    assert provider.upload_raw("tenant_1", "raw/raw.txt", b"abc", "text/plain") == result.uri
+
+
+def test_local_layout_is_sharded_and_dedupes_with_hardlinks(tmp_path: Path) -> None:
+    provider = LocalStorageProvider(tmp_path)
+    digest = hashlib.sha256(b"same bytes").hexdigest()
+
+    first = provider.upload_stream("tenant_1", "raw/a.pdf", b"same bytes", "application/pdf")
+    second = provider.upload_stream("tenant_2", "raw/b.pdf", b"same bytes", "application/pdf")
+
+    blob = tmp_path / "objects" / digest[:2] / digest[2:4] / digest
+    tenants = tmp_path / "tenants"
+    assert first.uri == f"file://{tenants / 'tenant_1' / digest[:2] / digest[2:4] / digest}"
+    assert second.uri.startswith(f"file://{tenants / 'tenant_2'}")
+    assert blob.stat().st_nlink == 3
+    assert list((tmp_path / ".tmp").iterdir()) == []
+
+    Path(first.uri.removeprefix("file://")).unlink()
+    Path(second.uri.removeprefix("file://")).unlink()
+    assert provider.collect_garbage() == 1
+    assert not blob.exists()
+
+
+def test_tenant_named_objects_does_not_collide_with_blob_store(tmp_path: Path) -> None:
+    provider = LocalStorageProvider(tmp_path)
+    provider.upload_stream("tenant_1", "raw/a.pdf", b"kept bytes", "application/pdf")
+    provider.upload_stream("objects", "raw/b.pdf", b"other bytes", "application/pdf")
+
+    assert provider.collect_garbage() == 0
+    assert {path.name for path in (tmp_path / "objects").iterdir()} == {
+        hashlib.sha256(content).hexdigest()[:2] for content in (b"kept bytes", b"other bytes")
+    }
+
+
+def test_gcs_stream_upload_uses_aligned_resumable_chunks() -> None:
+    client = FakeClient()
+    provider = GCSStorageProvider(
+        Settings(gcs_raw_bucket="raw-bucket", storage_chunk_size_bytes=600 * 1024), client=client
+    )
+    payload = b"x" * (GCS_CHUNK_ALIGNMENT * 5)
+
+    result = provider.upload_stream("tenant_1", "raw/big.bin", payload, "application/pdf")
+
+    blob = client.buckets["raw-bucket"].blobs["tenant_1/raw/big.bin"]
+    assert blob.chunk_size == 2 * GCS_CHUNK_ALIGNMENT
+    assert blob.open_kwargs == {"content_type": "application/pdf", "chunk_size": 2 * GCS_CHUNK_ALIGNMENT}
+    assert blob.writes == 3
+    assert blob.data == payload
+    assert result.uri == "gs://raw-bucket/tenant_1/raw/big.bin"
+    assert result.sha256 == hashlib.sha256(payload).hexdigest()
+    with provider.open_read(result.uri) as handle:
+        assert handle.read() == payload
+
+
+def test_ranges_are_read_in_chunks_from_both_backends(tmp_path: Path) -> None:
+    payload = bytes(range(256)) * 4096
+    local = LocalStorageProvider(tmp_path, chunk_size=100_000)
+    uri = local.upload_stream("tenant_1", "raw/doc.pdf", payload, "application/pdf").uri
+
+    assert local.object_size(uri) == len(payload)
+    local_chunks = list(local.iter_range(uri, 10, 250_009))
+    assert [len(chunk) for chunk in local_chunks] == [100_000, 100_000, 50_000]
+    assert b"".join(local_chunks) == payload[10:250_010]
+
+    client = FakeClient()
+    gcs = GCSStorageProvider(
+        Settings(gcs_raw_bucket="raw-bucket", storage_chunk_size_bytes=GCS_CHUNK_ALIGNMENT),
+        client=client,
+    )
+    gcs_uri = gcs.upload_stream("tenant_1", "raw/doc.pdf", payload, "application/pdf").uri
+    blob = client.buckets["raw-bucket"].blobs["tenant_1/raw/doc.pdf"]
+
+    assert gcs.object_size(gcs_uri) == len(payload)
+    assert b"".join(gcs.iter_range(gcs_uri, 5, 300_000)) == payload[5:300_001]
+    assert blob.ranged_reads == [(5, GCS_CHUNK_ALIGNMENT + 4), (GCS_CHUNK_ALIGNMENT + 5, 300_000)]
+
+    # An overwrite after object_size fails the stream instead of mixing generations.
+    chunks = gcs.iter_range(gcs_uri, 0, 300_000)
+    assert next(chunks) == payload[:GCS_CHUNK_ALIGNMENT]
+    gcs.upload_stream("tenant_1", "raw/doc.pdf", payload[::-1], "application/pdf")
+    with pytest.raises(RuntimeError, match="412"):
+        next(chunks)
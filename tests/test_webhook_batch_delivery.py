@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from libs.common.config import get_settings
+from libs.common.models import WebhookDelivery
+from libs.common.secrets import resolve_secret
+from services.webhooks.service import WebhookService
+
+
+def _dispatch_batch(service: WebhookService, db: Session, count: int) -> None:
+    service.create_subscription(
+        db,
+        tenant_id="tenant_1",
+        actor_id="user_1",
+        target_url="https://batch.example.test/hook",
+        event_filter="document.received",
+        batch_enabled=True,
+        batch_max_events=2,
+        batch_linger_seconds=30,
+        batch_compression="gzip",
+    )
+    db.commit()
+    for index in range(count):
+        service.dispatch_event(
+            db,
+            tenant_id="tenant_1",
+            event_type="document.received",
+            payload={"document_id": f"doc_{index}"},
+        )
+    db.commit()
+
+
+def _release_linger_window(db: Session) -> None:
+    db.execute(
+        update(WebhookDelivery).values(
+            next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+        )
+    )
+    db.commit()
+
+
+def test_batched_subscription_posts_signed_compressed_arrays(db: Session) -> None:
+    get_settings.cache_clear()
+    requests: list[dict[str, Any]] = []
+
+    def capture_post(url: str, **kwargs: Any) -> httpx.Response:
+        requests.append(kwargs)
+        return httpx.Response(202, request=httpx.Request("POST", url))
+
+    service = WebhookService(http_post=capture_post)
+    _dispatch_batch(service, db, 3)
+
+    # Events wait for the linger window to close before they are deliverable.
+    assert service.process_delivery_queue(db, tenant_id="tenant_1")["processed"] == 0
+    _release_linger_window(db)
+
+    outcome = service.process_delivery_queue(db, tenant_id="tenant_1")
+    db.commit()
+    assert outcome["processed"] == 3
+    assert outcome["delivered"] == 3
+    assert len(requests) == 2
+
+    secret = resolve_secret("WEBHOOK_SIGNING_SECRET", "webhook-signing-secret")
+    sizes = []
+    for request in requests:
+        headers = request["headers"]
+        assert headers["Content-Encoding"] == "gzip"
+        raw = gzip.decompress(request["content"])
+        expected = hmac.new(secret.encode("utf-8"), raw, hashlib.sha256).hexdigest()
+        assert headers["X-Nexus-Signature"] == f"sha256={expected}"
+        events = json.loads(raw)
+        assert int(headers["X-Nexus-Batch-Size"]) == len(events)
+        assert {event["event_type"] for event in events} == {"document.received"}
+        sizes.append(len(events))
+    assert sorted(sizes) == [1, 2]
+
+    statuses = set(db.execute(select(WebhookDelivery.status)).scalars().all())
+    assert statuses == {"delivered"}
+    service.close()
+
+
+def test_failed_batch_schedules_retry_for_every_member(db: Session) -> None:
+    get_settings.cache_clear()
+
+    def failing_post(url: str, **_kwargs: Any) -> httpx.Response:
+        return httpx.Response(503, request=httpx.Request("POST", url))
+
+    service = WebhookService(http_post=failing_post)
+    _dispatch_batch(service, db, 2)
+    _release_linger_window(db)
+
+    outcome = service.process_delivery_queue(db, tenant_id="tenant_1")
+    db.commit()
+    assert outcome["retried"] == 2
+
+    deliveries = db.execute(select(WebhookDelivery)).scalars().all()
+    assert {delivery.status for delivery in deliveries} == {"retry_scheduled"}
+    assert {delivery.attempt_count for delivery in deliveries} == {1}
+    service.close()
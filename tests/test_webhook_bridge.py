@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.config import get_settings
+from libs.common.events import InMemoryEventBus
+from libs.common.models import Tenant, WebhookDelivery, WebhookEventPayload
+from libs.common.sqlite_queue import SQLiteEventQueue
+from libs.schemas.events import EventTypes
+from services.webhooks.bridge import BRIDGE_SUBSCRIPTION, WEBHOOK_TOPICS, WebhookEventBridge
+from services.webhooks.service import WebhookService
+
+
+@pytest.fixture
+def session_factory(session_factory: sessionmaker[Session]) -> sessionmaker[Session]:
+    with session_factory() as session:
+        session.add(Tenant(id="tenant_2", name="Tenant 2", status="active"))
+        session.commit()
+    return session_factory
+
+
+def _subscribe(factory: sessionmaker[Session], service: WebhookService, event_filter: str) -> None:
+    with factory() as db:
+        service.create_subscription(
+            db,
+            tenant_id="tenant_1",
+            actor_id="user_1",
+            target_url="https://example.test/hooks",
+            event_filter=event_filter,
+        )
+        db.commit()
+
+
+def test_bridge_dispatches_queued_events_in_tenant_groups(
+    tmp_path: Path, session_factory: sessionmaker[Session]
+) -> None:
+    get_settings.cache_clear()
+    service = WebhookService()
+    _subscribe(session_factory, service, "document.validated")
+    _subscribe(session_factory, service, "discrepancy.*")
+    queue_path = str(tmp_path / "queue.db")
+    bridge_source = SQLiteEventQueue(
+        queue_path, subscription=BRIDGE_SUBSCRIPTION, topics=WEBHOOK_TOPICS
+    )
+    publisher = SQLiteEventQueue(queue_path)
+
+    publisher.publish_many(
+        EventTypes.DOCUMENT_VALIDATED,
+        [{"tenant_id": "tenant_1", "document_id": f"doc_{index}"} for index in range(3)],
+    )
+    publisher.publish(EventTypes.DISCREPANCY_DETECTED, {"tenant_id": "tenant_1", "id": "d_1"})
+    publisher.publish(EventTypes.DOCUMENT_VALIDATED, {"tenant_id": "tenant_2", "document_id": "x"})
+    publisher.publish(EventTypes.DOCUMENT_RECEIVED, {"tenant_id": "tenant_1", "document_id": "y"})
+
+    bridge = WebhookEventBridge(service, session_factory, batch_size=100)
+    totals = bridge.run(bridge_source, drain=True)
+
+    assert totals == {"received": 6, "skipped": 2, "groups": 2, "enqueued": 4, "failed": 0}
+    # Stage workers on the default subscription still see their own copy.
+    assert len(publisher.receive([EventTypes.DOCUMENT_VALIDATED], 10)) == 4
+    assert bridge_source.receive(list(WEBHOOK_TOPICS), 10) == []
+    with session_factory() as db:
+        assert db.execute(select(func.count()).select_from(WebhookDelivery)).scalar_one() == 4
+        assert db.execute(select(func.count()).select_from(WebhookEventPayload)).scalar_one() == 4
+
+    # A redelivered batch maps onto the same idempotency keys.
+    publisher.publish(EventTypes.DOCUMENT_VALIDATED, {"tenant_id": "tenant_1", "document_id": "doc_0"})
+    assert bridge.run(bridge_source, drain=True)["enqueued"] == 4
+
+
+def test_events_without_subscribers_do_not_query_the_database(
+    session_factory: sessionmaker[Session]
+) -> None:
+    get_settings.cache_clear()
+    service = WebhookService()
+    _subscribe(session_factory, service, "document.validated")
+    bus = InMemoryEventBus()
+    bridge = WebhookEventBridge(service, session_factory)
+    bridge.attach(bus)
+    bus.publish(EventTypes.DOCUMENT_VALIDATED, {"tenant_id": "tenant_1", "document_id": "doc_1"})
+    assert bus.drain(timeout=5) == 0
+
+    statements: list[str] = []
+
+    def _count(*args: Any, **_kwargs: Any) -> None:
+        statements.append(str(args[2]))
+
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", _count)
+    for index in range(20):
+        bus.publish(EventTypes.DOCUMENT_RECEIVED, {"tenant_id": "tenant_1", "document_id": str(index)})
+    assert bus.drain(timeout=5) == 0
+    event.remove(engine, "before_cursor_execute", _count)
+    bus.close(timeout=5)
+
+    assert statements == []
+    assert bridge.metrics()["enqueued"] == 1
+    assert bridge.metrics()["skipped"] == 20
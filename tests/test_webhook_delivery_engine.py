@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from libs.common.config import Settings
+from services.webhooks.delivery import AsyncWebhookDeliveryEngine, DeliveryRequest
+from services.webhooks.health import TargetHealthRegistry
+
+
+def _request(delivery_id: str, url: str) -> DeliveryRequest:
+    return DeliveryRequest(
+        delivery_id=delivery_id,
+        target_url=url,
+        body=b"{}",
+        headers={"Content-Type": "application/json"},
+    )
+
+
+def test_slow_host_does_not_stall_other_hosts() -> None:
+    in_flight: dict[str, int] = {"slow.test": 0, "fast.test": 0}
+    peak: dict[str, int] = {"slow.test": 0, "fast.test": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.2 if host == "slow.test" else 0.01)
+        in_flight[host] -= 1
+        return httpx.Response(200 if host == "fast.test" else 503, request=request)
+
+    engine = AsyncWebhookDeliveryEngine(
+        Settings(webhook_delivery_concurrency=16, webhook_per_host_concurrency=2),
+        transport=httpx.MockTransport(handler),
+    )
+    requests = [_request(f"slow_{index}", "https://slow.test/hook") for index in range(4)]
+    requests += [_request(f"fast_{index}", "https://fast.test/hook") for index in range(8)]
+
+    started = time.perf_counter()
+    outcomes = engine.run_batch(requests)
+    elapsed = time.perf_counter() - started
+    engine.close()
+
+    assert [outcome.delivery_id for outcome in outcomes] == [
+        request.delivery_id for request in requests
+    ]
+    assert all(outcome.delivered for outcome in outcomes if outcome.delivery_id.startswith("fast"))
+    slow_outcomes = [outcome for outcome in outcomes if outcome.delivery_id.startswith("slow")]
+    assert all(outcome.status_code == 503 and outcome.error for outcome in slow_outcomes)
+    assert peak == {"slow.test": 2, "fast.test": 2}
+    # 4 slow requests at 2 per host take two 0.2s rounds; serial delivery would take 0.8s+.
+    assert elapsed < 0.7
+
+
+def test_circuit_opens_for_failing_host_and_recovers_through_probe() -> None:
+    now = [100.0]
+    registry = TargetHealthRegistry(
+        Settings(
+            webhook_per_host_concurrency=8,
+            webhook_circuit_failure_threshold=3,
+            webhook_circuit_open_seconds=30,
+        ),
+        clock=lambda: now[0],
+    )
+    for _ in range(3):
+        assert registry.admit("down.test") is None
+        registry.record_failure("down.test")
+
+    assert registry.concurrency_limit("down.test") == 1
+    assert registry.admit("down.test") == 30
+    now[0] += 31
+    assert registry.admit("down.test") is None
+    assert registry.admit("down.test") is not None
+    registry.record_success("down.test", latency_ms=12.0)
+
+    snapshot = registry.snapshot()["down.test"]
+    assert snapshot["state"] == "closed"
+    assert snapshot["short_circuited"] == 2
+    assert registry.concurrency_limit("up.test") == 8
+
+
+def test_open_circuit_short_circuits_without_sending() -> None:
+    sent_hosts: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent_hosts.append(request.url.host)
+        if request.url.host == "down.test":
+            raise httpx.ConnectTimeout("timed out", request=request)
+        return httpx.Response(200, request=request)
+
+    engine = AsyncWebhookDeliveryEngine(
+        Settings(
+            webhook_per_host_concurrency=1,
+            webhook_circuit_failure_threshold=2,
+            webhook_circuit_open_seconds=60,
+        ),
+        transport=httpx.MockTransport(handler),
+    )
+    requests = [_request(f"down_{index}", "https://down.test/hook") for index in range(5)]
+    requests += [_request(f"up_{index}", "https://up.test/hook") for index in range(5)]
+    outcomes = {outcome.delivery_id: outcome for outcome in engine.run_batch(requests)}
+    engine.close()
+
+    assert sent_hosts.count("down.test") == 2
+    assert sent_hosts.count("up.test") == 5
+    assert all(outcomes[f"up_{index}"].delivered for index in range(5))
+    deferred = [outcomes[f"down_{index}"] for index in range(2, 5)]
+    assert all(outcome.error == "circuit_open" for outcome in deferred)
+    assert all((outcome.retry_after_seconds or 0) > 0 for outcome in deferred)
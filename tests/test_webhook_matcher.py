@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from libs.common.config import get_settings
+from libs.common.models import WebhookDelivery
+from services.webhooks.matcher import TopicTrie, validate_topic_filter
+from services.webhooks.service import WebhookService
+
+
+def test_topic_trie_matches_wildcard_segments() -> None:
+    trie: TopicTrie[str] = TopicTrie()
+    trie.insert("document.received", "exact")
+    trie.insert("document.*", "single")
+    trie.insert("document.#", "multi")
+    trie.insert("#", "all")
+    trie.insert("*.validated", "suffix")
+
+    assert sorted(trie.match("document.received")) == ["all", "exact", "multi", "single"]
+    assert sorted(trie.match("document.validated")) == ["all", "multi", "single", "suffix"]
+    assert sorted(trie.match("document.review.completed")) == ["all", "multi"]
+    assert sorted(trie.match("document")) == ["all", "multi"]
+    assert trie.match("awb.submitted") == ["all"]
+
+
+@pytest.mark.parametrize("pattern", ["", "document.", "doc*.received", "document..x"])
+def test_invalid_topic_filters_are_rejected(pattern: str) -> None:
+    with pytest.raises(ValueError):
+        validate_topic_filter(pattern)
+
+
+def test_wildcard_dispatch_uses_cached_index_until_subscriptions_change(db: Session) -> None:
+    get_settings.cache_clear()
+    service = WebhookService()
+    wildcard = service.create_subscription(
+        db,
+        tenant_id="tenant_1",
+        actor_id="user_1",
+        target_url="https://example.test/documents",
+        event_filter="document.*",
+    )
+    db.commit()
+
+    assert service.dispatch_event(
+        db, tenant_id="tenant_1", event_type="document.received", payload={"id": "doc_1"}
+    ) == 1
+
+    statements: list[str] = []
+
+    def _count(*args: Any, **_kwargs: Any) -> None:
+        statements.append(str(args[2]))
+
+    event.listen(db.get_bind(), "before_cursor_execute", _count)
+    service.dispatch_event(
+        db, tenant_id="tenant_1", event_type="document.validated", payload={"id": "doc_1"}
+    )
+    event.remove(db.get_bind(), "before_cursor_execute", _count)
+    assert not any("FROM webhook_subscriptions" in sql for sql in statements)
+
+    exact = service.create_subscription(
+        db,
+        tenant_id="tenant_1",
+        actor_id="user_1",
+        target_url="https://example.test/validated",
+        event_filter="document.validated",
+    )
+    db.commit()
+    assert service.dispatch_event(
+        db, tenant_id="tenant_1", event_type="document.validated", payload={"id": "doc_2"}
+    ) == 2
+    db.commit()
+
+    subscriptions = db.execute(
+        select(WebhookDelivery.subscription_id).where(
+            WebhookDelivery.event_type == "document.validated"
+        )
+    ).scalars().all()
+    assert sorted(subscriptions) == sorted([wildcard.id, wildcard.id, exact.id])
+    service.close()
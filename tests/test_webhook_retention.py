@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.config import Settings
+from libs.common.models import (
+    WebhookDelivery,
+    WebhookDeliveryArchive,
+    WebhookEventPayload,
+    WebhookSubscription,
+)
+from services.webhooks.retention import WebhookRetentionJob
+from services.webhooks.service import WebhookService
+
+
+@pytest.fixture
+def session_factory(session_factory: sessionmaker[Session]) -> sessionmaker[Session]:
+    with session_factory() as session:
+        session.add(
+            WebhookSubscription(
+                id="whs_1",
+                tenant_id="tenant_1",
+                target_url="https://example.test/webhook",
+                secret_ref="secret-manager://webhook-signing-secret",
+                event_filter="document.received",
+                active=True,
+            )
+        )
+        session.commit()
+    return session_factory
+
+
+def _delivery(delivery_id: str, status: str, finished_at: datetime) -> WebhookDelivery:
+    return WebhookDelivery(
+        id=delivery_id,
+        tenant_id="tenant_1",
+        subscription_id="whs_1",
+        event_type="document.received",
+        payload={"document_id": delivery_id},
+        status=status,
+        attempt_count=1,
+        idempotency_key=f"key-{delivery_id}",
+        next_attempt_at=finished_at,
+        delivered_at=finished_at if status == "delivered" else None,
+        dead_lettered_at=finished_at if status == "dead_lettered" else None,
+    )
+
+
+def test_retention_job_archives_old_finished_deliveries_in_chunks(
+    session_factory: sessionmaker[Session]
+) -> None:
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=45)
+    with session_factory() as db:
+        db.add_all(
+            [
+                _delivery("whd_old_1", "delivered", old),
+                _delivery("whd_old_2", "delivered", old),
+                _delivery("whd_old_dead", "dead_lettered", old),
+                _delivery("whd_recent", "delivered", now - timedelta(days=1)),
+                _delivery("whd_pending", "pending", old),
+            ]
+        )
+        db.commit()
+
+    job = WebhookRetentionJob(
+        WebhookService(),
+        session_factory,
+        settings=Settings(webhook_retention_days=30, webhook_retention_chunk_size=2),
+    )
+    totals = job.run()
+
+    assert totals == {"chunks": 2, "archived": 3}
+    with session_factory() as db:
+        remaining = set(db.execute(select(WebhookDelivery.id)).scalars().all())
+        archived = {
+            row.id: row.status
+            for row in db.execute(select(WebhookDeliveryArchive)).scalars().all()
+        }
+    assert remaining == {"whd_recent", "whd_pending"}
+    assert archived == {
+        "whd_old_1": "delivered",
+        "whd_old_2": "delivered",
+        "whd_old_dead": "dead_lettered",
+    }
+
+
+def test_archiving_prunes_payloads_without_remaining_deliveries(
+    session_factory: sessionmaker[Session]
+) -> None:
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=45)
+    with session_factory() as db:
+        for payload_id in ("whp_orphaned", "whp_shared"):
+            db.add(
+                WebhookEventPayload(
+                    id=payload_id,
+                    tenant_id="tenant_1",
+                    event_type="document.received",
+                    payload_hash=payload_id,
+                    body=f'{{"payload": "{payload_id}"}}',
+                )
+            )
+        db.flush()
+        deliveries = [
+            _delivery("whd_old_orphaned", "delivered", old),
+            _delivery("whd_old_shared", "dead_lettered", old),
+            _delivery("whd_recent_shared", "delivered", now),
+        ]
+        for delivery, payload_id in zip(deliveries, ("whp_orphaned", "whp_shared", "whp_shared")):
+            delivery.payload = None
+            delivery.payload_id = payload_id
+        db.add_all(deliveries)
+        db.commit()
+
+    WebhookRetentionJob(
+        WebhookService(), session_factory, settings=Settings(webhook_retention_days=30)
+    ).run()
+
+    with session_factory() as db:
+        payload_ids = set(db.execute(select(WebhookEventPayload.id)).scalars().all())
+        archived_bodies = {
+            row.id: row.payload_body
+            for row in db.execute(select(WebhookDeliveryArchive)).scalars().all()
+        }
+    assert payload_ids == {"whp_shared"}
+    # The archived copy outlives the pruned payload row.
+    assert archived_bodies == {
+        "whd_old_orphaned": '{"payload": "whp_orphaned"}',
+        "whd_old_shared": '{"payload": "whp_shared"}',
+    }
+
+
+def test_finished_delivery_scans_use_partial_indexes(
+    session_factory: sessionmaker[Session]
+) -> None:
+    with session_factory() as db:
+        for status, column, index in (
+            ("delivered", "delivered_at", "ix_webhook_deliveries_delivered"),
+            ("dead_lettered", "dead_lettered_at", "ix_webhook_deliveries_dead_lettered"),
+        ):
+            plan = db.execute(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT id FROM webhook_deliveries "
+                    f"WHERE status = '{status}' AND {column} < :cutoff LIMIT 10"
+                ),
+                {"cutoff": datetime.now(timezone.utc)},
+            ).all()
+            assert any(index in str(row) for row in plan)
+
+
+def test_poll_query_uses_partial_deliverable_index(session_factory: sessionmaker[Session]) -> None:
+    with session_factory() as db:
+        plan = db.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT id FROM webhook_deliveries "
+                "WHERE status IN ('pending', 'retry_scheduled') AND next_attempt_at <= :now "
+                "ORDER BY next_attempt_at"
+            ),
+            {"now": datetime.now(timezone.utc)},
+        ).all()
+    assert any("ix_webhook_deliveries_deliverable" in str(row) for row in plan)
@@ -1,30 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import hmac
 from datetime import datetime, timezone
+from typing import Any
 
 import httpx
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session, sessionmaker
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
 
 from libs.common.config import get_settings
-from libs.common.models import Base, Tenant, User, WebhookDelivery
+from libs.common.models import WebhookDelivery, WebhookEventPayload
+from libs.common.secrets import resolve_secret
 from services.webhooks.service import WebhookService
 
 
-def _make_session() -> Session:
-    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
-    Base.metadata.create_all(bind=engine)
-    factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
-    session = factory()
-    session.add(Tenant(id="tenant_1", name="Tenant 1", status="active"))
-    session.add(User(id="user_1", email="user1@example.com", display_name="User 1"))
-    session.commit()
-    return session
-
-
-def test_webhook_queue_worker_success_path() -> None:
+def test_webhook_queue_worker_success_path(db: Session) -> None:
     get_settings.cache_clear()
-    db = _make_session()
 
     def success_post(*_args: object, **_kwargs: object) -> httpx.Response:
         request = httpx.Request("POST", "https://example.test/webhook")
@@ -67,9 +60,8 @@ def test_webhook_queue_worker_success_path() -> None:
     assert delivered.delivered_at is not None
 
 
-def test_webhook_dlq_and_replay_path() -> None:
+def test_webhook_dlq_and_replay_path(db: Session) -> None:
     get_settings.cache_clear()
-    db = _make_session()
 
     def failing_post(*_args: object, **_kwargs: object) -> httpx.Response:
         request = httpx.Request("POST", "https://example.test/webhook")
@@ -114,3 +106,237 @@ def test_webhook_dlq_and_replay_path() -> None:
     replayed = db.execute(select(WebhookDelivery)).scalar_one()
     assert replayed.status == "pending"
     assert replayed.attempt_count == 0
+
+
+def test_dispatch_and_delivery_query_count_is_constant(db: Session) -> None:
+    get_settings.cache_clear()
+
+    def success_post(*_args: object, **_kwargs: object) -> httpx.Response:
+        request = httpx.Request("POST", "https://example.test/webhook")
+        return httpx.Response(200, request=request)
+
+    service = WebhookService(http_post=success_post)
+    for index in range(5):
+        service.create_subscription(
+            db,
+            tenant_id="tenant_1",
+            actor_id="user_1",
+            target_url=f"https://example.test/webhook/{index}",
+            event_filter="document.classified",
+        )
+    db.commit()
+
+    statements: list[str] = []
+
+    def _count(*args: Any, **_kwargs: Any) -> None:
+        statements.append(str(args[2]))
+
+    event.listen(db.get_bind(), "before_cursor_execute", _count)
+    enqueued = service.dispatch_event(
+        db,
+        tenant_id="tenant_1",
+        event_type="document.classified",
+        payload={"document_id": "doc_3"},
+    )
+    assert enqueued == 5
+    assert len(statements) == 4
+
+    duplicate = service.dispatch_event(
+        db,
+        tenant_id="tenant_1",
+        event_type="document.classified",
+        payload={"document_id": "doc_3"},
+    )
+    db.commit()
+    assert duplicate == 0
+
+    statements.clear()
+    outcome = service.process_delivery_queue(db, tenant_id="tenant_1", batch_size=10)
+    db.commit()
+    event.remove(db.get_bind(), "before_cursor_execute", _count)
+
+    assert outcome["delivered"] == 5
+    assert len([sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]) == 2
+
+
+def test_fanout_stores_one_payload_signed_once(db: Session) -> None:
+    get_settings.cache_clear()
+    sent: list[tuple[bytes, str]] = []
+
+    def capture_post(*_args: object, **kwargs: object) -> httpx.Response:
+        body = kwargs["content"]
+        headers = kwargs["headers"]
+        assert isinstance(body, bytes) and isinstance(headers, dict)
+        sent.append((body, headers["X-Nexus-Signature"]))
+        return httpx.Response(200, request=httpx.Request("POST", "https://example.test"))
+
+    service = WebhookService(http_post=capture_post)
+    for index in range(3):
+        service.create_subscription(
+            db,
+            tenant_id="tenant_1",
+            actor_id="user_1",
+            target_url=f"https://example.test/fanout/{index}",
+            event_filter="document.extracted",
+        )
+    db.commit()
+    service.dispatch_event(
+        db,
+        tenant_id="tenant_1",
+        event_type="document.extracted",
+        payload={"document_id": "doc_4", "fields": {"awb_number": "123-12345678"}},
+    )
+    db.commit()
+
+    assert db.scalar(select(func.count()).select_from(WebhookEventPayload)) == 1
+    deliveries = list(db.execute(select(WebhookDelivery)).scalars().all())
+    assert len({delivery.payload_id for delivery in deliveries}) == 1
+    assert all(delivery.payload is None for delivery in deliveries)
+
+    service.process_delivery_queue(db, tenant_id="tenant_1", batch_size=10)
+    db.commit()
+
+    secret = resolve_secret("WEBHOOK_SIGNING_SECRET", "webhook-signing-secret")
+    expected = hmac.new(secret.encode("utf-8"), sent[0][0], hashlib.sha256).hexdigest()
+    assert len(sent) == 3
+    assert len(set(sent)) == 1
+    assert sent[0][1] == f"sha256={expected}"
+
+
+def test_payloads_are_signed_with_the_secret_current_at_send_time(
+    monkeypatch: pytest.MonkeyPatch, db: Session
+) -> None:
+    get_settings.cache_clear()
+    sent: list[str] = []
+
+    def capture_post(*_args: object, **kwargs: object) -> httpx.Response:
+        headers = kwargs["headers"]
+        assert isinstance(headers, dict)
+        sent.append(headers["X-Nexus-Signature"])
+        return httpx.Response(200, request=httpx.Request("POST", "https://example.test"))
+
+    monkeypatch.setenv("WEBHOOK_SIGNING_SECRET", "secret-before-rotation")
+    service = WebhookService(http_post=capture_post)
+    service.create_subscription(
+        db,
+        tenant_id="tenant_1",
+        actor_id="user_1",
+        target_url="https://example.test/rotated",
+        event_filter="document.received",
+    )
+    db.commit()
+    service.dispatch_event(
+        db,
+        tenant_id="tenant_1",
+        event_type="document.received",
+        payload={"document_id": "doc_rotated"},
+    )
+    db.commit()
+
+    monkeypatch.setenv("WEBHOOK_SIGNING_SECRET", "secret-after-rotation")
+    service.process_delivery_queue(db, tenant_id="tenant_1", batch_size=10)
+    db.commit()
+
+    body = db.execute(select(WebhookEventPayload.body)).scalar_one().encode("utf-8")
+    expected = hmac.new(b"secret-after-rotation", body, hashlib.sha256).hexdigest()
+    assert sent == [f"sha256={expected}"]
+
+
+def test_paced_dead_letter_replay_spreads_and_resumes(db: Session) -> None:
+    get_settings.cache_clear()
+    service = WebhookService()
+    subscription = service.create_subscription(
+        db,
+        tenant_id="tenant_1",
+        actor_id="user_1",
+        target_url="https://example.test/webhook",
+        event_filter="document.received",
+    )
+    dead_lettered_at = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    for index in range(5):
+        db.add(
+            WebhookDelivery(
+                id=f"whd_dlq_{index}",
+                tenant_id="tenant_1",
+                subscription_id=subscription.id,
+                event_type="document.received",
+                payload={"document_id": f"doc_{index}"},
+                status="dead_lettered",
+                attempt_count=5,
+                idempotency_key=f"dlq-{index}",
+                next_attempt_at=dead_lettered_at,
+                dead_lettered_at=dead_lettered_at,
+            )
+        )
+    db.commit()
+
+    first = service.replay_dead_letter_page(
+        db, tenant_id="tenant_1", limit=3, rate_per_second=2, burst=2
+    )
+    db.commit()
+    assert (first.requeued, first.remaining) == (3, 2)
+    assert first.next_cursor is not None
+
+    second = service.replay_dead_letter_page(
+        db, tenant_id="tenant_1", limit=3, rate_per_second=2, burst=2, cursor=first.next_cursor
+    )
+    db.commit()
+    assert (second.requeued, second.remaining, second.next_cursor) == (2, 0, None)
+
+    schedule = [
+        row.next_attempt_at.replace(tzinfo=timezone.utc)
+        for row in db.execute(
+            select(WebhookDelivery).order_by(WebhookDelivery.id.asc())
+        ).scalars()
+    ]
+    offsets = [round((moment - schedule[0]).total_seconds(), 1) for moment in schedule]
+    assert offsets == [0.0, 0.0, 0.5, 1.0, 1.5]
+
+
+def test_dead_letter_replay_reaches_rows_without_timestamp_and_legacy_is_newest_first(
+    db: Session,
+) -> None:
+    get_settings.cache_clear()
+    service = WebhookService()
+    subscription = service.create_subscription(
+        db,
+        tenant_id="tenant_1",
+        actor_id="user_1",
+        target_url="https://example.test/webhook",
+        event_filter="document.received",
+    )
+    moments = [None, None, datetime(2026, 10, 1, tzinfo=timezone.utc)]
+    moments.append(datetime(2026, 10, 2, tzinfo=timezone.utc))
+    for index, dead_lettered_at in enumerate(moments):
+        db.add(
+            WebhookDelivery(
+                id=f"whd_null_{index}",
+                tenant_id="tenant_1",
+                subscription_id=subscription.id,
+                event_type="document.received",
+                payload={"document_id": f"doc_{index}"},
+                status="dead_lettered",
+                attempt_count=5,
+                idempotency_key=f"null-{index}",
+                dead_lettered_at=dead_lettered_at,
+            )
+        )
+    db.commit()
+
+    assert service.replay_dead_lettered(db, tenant_id="tenant_1", limit=1) == 1
+    db.commit()
+    newest = db.get(WebhookDelivery, "whd_null_3")
+    assert newest is not None and newest.status == "pending"
+
+    first = service.replay_dead_letter_page(db, tenant_id="tenant_1", limit=1)
+    assert (first.requeued, first.remaining) == (1, 2)
+    cursor = first.next_cursor
+    replayed = 1
+    while cursor:
+        page = service.replay_dead_letter_page(db, tenant_id="tenant_1", limit=1, cursor=cursor)
+        replayed += page.requeued
+        cursor = page.next_cursor
+    db.commit()
+    assert replayed == 3
+    statuses = db.execute(select(WebhookDelivery.status)).scalars().all()
+    assert set(statuses) == {"pending"}
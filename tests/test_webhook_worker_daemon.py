@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from libs.common.config import Settings, get_settings
+from libs.common.models import WebhookDelivery, WebhookEventPayload
+from services.webhooks.service import WebhookService
+from services.webhooks.worker import WebhookWorker
+
+
+@pytest.fixture
+def session_factory(session_factory: sessionmaker[Session]) -> sessionmaker[Session]:
+    session_factory.configure(expire_on_commit=False)
+    return session_factory
+
+
+def _seed_deliveries(factory: sessionmaker[Session], service: WebhookService, count: int) -> None:
+    with factory() as db:
+        service.create_subscription(
+            db,
+            tenant_id="tenant_1",
+            actor_id="user_1",
+            target_url="https://example.test/webhook",
+            event_filter="document.received",
+        )
+        db.commit()
+        for index in range(count):
+            service.dispatch_event(
+                db,
+                tenant_id="tenant_1",
+                event_type="document.received",
+                payload={"document_id": f"doc_{index}"},
+            )
+        db.commit()
+
+
+def test_leases_prevent_double_claim_and_expire_for_recovery(
+    session_factory: sessionmaker[Session]
+) -> None:
+    get_settings.cache_clear()
+    service = WebhookService()
+    _seed_deliveries(session_factory, service, 4)
+
+    with session_factory() as db_a, session_factory() as db_b:
+        claimed_a = service.claim_deliveries(db_a, worker_id="worker_a", batch_size=3)
+        db_a.commit()
+        claimed_b = service.claim_deliveries(db_b, worker_id="worker_b", batch_size=10)
+        db_b.commit()
+        assert len(claimed_a) == 3
+        assert len(claimed_b) == 1
+        assert not {item.id for item in claimed_a} & {item.id for item in claimed_b}
+
+        assert service.extend_leases(
+            db_a, worker_id="worker_b", delivery_ids=[item.id for item in claimed_a]
+        ) == 0
+
+        expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+        for delivery in claimed_a:
+            delivery.lease_expires_at = expired
+        db_a.commit()
+
+        assert service.recover_expired_leases(db_b) == 3
+        db_b.commit()
+        reclaimed = service.claim_deliveries(db_b, worker_id="worker_b", batch_size=10)
+        db_b.commit()
+        assert {item.id for item in reclaimed} == {item.id for item in claimed_a}
+    service.close()
+
+
+def test_multiple_workers_drain_queue_without_double_delivery(
+    session_factory: sessionmaker[Session]
+) -> None:
+    get_settings.cache_clear()
+    delivered_keys: list[str] = []
+
+    def success_post(*_args: object, **kwargs: object) -> httpx.Response:
+        headers = kwargs["headers"]
+        assert isinstance(headers, dict)
+        delivered_keys.append(headers["X-Idempotency-Key"])
+        return httpx.Response(200, request=httpx.Request("POST", "https://example.test"))
+
+    _seed_deliveries(session_factory, WebhookService(), 7)
+    settings = Settings(webhook_worker_batch_size=3)
+    workers = [
+        WebhookWorker(
+            WebhookService(http_post=success_post),
+            session_factory,
+            settings=settings,
+            worker_id=f"worker_{index}",
+        )
+        for index in range(2)
+    ]
+    totals = [worker.run(drain=True) for worker in workers]
+
+    assert sum(total["delivered"] for total in totals) == 7
+    assert len(delivered_keys) == len(set(delivered_keys)) == 7
+    with session_factory() as db:
+        rows = list(db.execute(select(WebhookDelivery)).scalars().all())
+    assert all(row.status == "delivered" and row.lease_owner is None for row in rows)
+
+
+def test_fast_outcomes_commit_before_the_slowest_target_finishes(
+    session_factory: sessionmaker[Session], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("WEBHOOK_OUTCOME_COMMIT_SIZE", "1")
+    get_settings.cache_clear()
+    service = WebhookService()
+    with session_factory() as db:
+        for host in ("fast", "slow"):
+            service.create_subscription(
+                db,
+                tenant_id="tenant_1",
+                actor_id="user_1",
+                target_url=f"https://{host}.example.test/webhook",
+                event_filter="document.received",
+            )
+        db.commit()
+        service.dispatch_event(
+            db, tenant_id="tenant_1", event_type="document.received", payload={"id": "doc_1"}
+        )
+        db.commit()
+    seen_while_slow: list[str] = []
+
+    def post(url: str, **_kwargs: object) -> httpx.Response:
+        if url.startswith("https://slow."):
+            # Still inside the batch: the fast target's outcome must already be committed.
+            deadline = time.monotonic() + 5
+            while not seen_while_slow and time.monotonic() < deadline:
+                with session_factory() as db:
+                    seen_while_slow.extend(
+                        db.execute(
+                            select(WebhookDelivery.status).where(
+                                WebhookDelivery.status == "delivered"
+                            )
+                        ).scalars()
+                    )
+                time.sleep(0.01)
+        return httpx.Response(200, request=httpx.Request("POST", url))
+
+    worker = WebhookWorker(WebhookService(http_post=post), session_factory, worker_id="worker_1")
+    assert worker.run(drain=True)["delivered"] == 2
+    assert seen_while_slow == ["delivered"]
+    get_settings.cache_clear()
+
+
+def test_concurrent_dispatchers_skip_keys_enqueued_by_each_other(
+    session_factory: sessionmaker[Session]
+) -> None:
+    get_settings.cache_clear()
+    first, second = WebhookService(), WebhookService()
+    _seed_deliveries(session_factory, first, 0)
+    raced: list[int] = []
+    racing = threading.Event()
+
+    with session_factory() as db_a, session_factory() as db_b:
+
+        def _dispatch_in_between(
+            _conn: object, _cursor: object, statement: str, *_args: object
+        ) -> None:
+            # The other dispatcher commits the same event after this one's lookups ran.
+            if racing.is_set() or not statement.startswith("INSERT INTO webhook_event_payloads"):
+                return
+            racing.set()
+            raced.append(
+                second.dispatch_event(
+                    db_b, tenant_id="tenant_1", event_type="document.received", payload={"n": 1}
+                )
+            )
+            db_b.commit()
+
+        event.listen(db_a.get_bind(), "before_cursor_execute", _dispatch_in_between)
+        try:
+            enqueued = first.dispatch_event(
+                db_a, tenant_id="tenant_1", event_type="document.received", payload={"n": 1}
+            )
+            db_a.commit()
+        finally:
+            event.remove(db_a.get_bind(), "before_cursor_execute", _dispatch_in_between)
+
+    assert raced == [1]
+    assert enqueued == 0
+    with session_factory() as db:
+        assert len(db.execute(select(WebhookEventPayload)).all()) == 1
+        assert len(db.execute(select(WebhookDelivery)).all()) == 1